@@ -1,18 +1,95 @@
 import os
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, Response, g, render_template, request, jsonify
 from flask_cors import CORS
-import speech_recognition as sr
-from PIL import Image
-import pytesseract
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from pydub import AudioSegment
+import numpy as np
 import tempfile
 import time
 import logging
 from datetime import datetime
 import ipaddress
 import ssl
+import io
+import zlib
+import uuid
+import base64
+import bisect
+import hashlib
+import importlib
+import itertools
+import json
+import math
+import mmap
+import re
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import wave
+import zipfile
+import multiprocessing
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+import audio_dsp
+import flac_encoder
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: resumable upload parts are only serialized within one process
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+    
+    Importing app (which every OCR worker process does too) stays cheap, and
+    each process only loads the engines it actually uses. warm_up() imports
+    them all ahead of time.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._import_error = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Import the module (once) and return it; raises ImportError if it is not installed"""
+        if self._module is None:
+            with self._lock:
+                if self._import_error is not None:
+                    raise self._import_error
+                if self._module is None:
+                    started = time.perf_counter()
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    except ImportError as e:
+                        self._import_error = e
+                        raise
+                    logger.debug(f"Loaded {self._name} in {time.perf_counter() - started:.2f}s")
+        return self._module
+
+    def available(self):
+        """Whether the module can be imported (importing it if that hasn't happened yet)"""
+        try:
+            self.load()
+            return True
+        except ImportError:
+            return False
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+sr = LazyModule('speech_recognition')
+pydub = LazyModule('pydub')
+Image = LazyModule('PIL.Image')
+ImageSequence = LazyModule('PIL.ImageSequence')
+pytesseract = LazyModule('pytesseract')
+cv2 = LazyModule('cv2')  # Optional: OCR falls back to PIL for decoding and resizing
+tesserocr = LazyModule('tesserocr')  # Optional: without it every OCR call starts a tesseract binary
+LAZY_MODULES = [sr, pydub, Image, ImageSequence, pytesseract, cv2, tesserocr]
 
 
 app = Flask(__name__)
@@ -28,6 +105,17 @@ ALLOWED_EXTENSIONS = {'mp3', 'wav', 'png', 'jpg', 'jpeg', 'webm', 'ogg', 'm4a',
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
+# Per-endpoint upload limits: endpoint -> (max MB per file, what the file is called in errors)
+UPLOAD_LIMITS = {
+    'voice_to_text': (25, 'Audio file'),
+    'audio_to_text': (50, 'Audio file'),
+    'create_job': (50, 'Audio file'),
+    'upload_part': (8, 'Upload part'),  # One PATCH of a resumable upload (the whole file is capped at 50MB)
+    'image_to_text': (50, 'Image file')
+}
+UPLOAD_MEMORY_ENDPOINTS = {'image_to_text', 'image_to_text_batch'}  # Decoded in memory, never spooled to disk
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024  # Multipart headers and form fields on top of the file itself
+
 # Language support mapping
 SUPPORTED_LANGUAGES = {
     'en-US': 'English (US)',
@@ -47,165 +135,2852 @@ SUPPORTED_LANGUAGES = {
     'th-TH': 'Thai'
 }
 
-# Create uploads directory if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Chunk recognition settings (shared by every request in this process)
+CHUNK_RECOGNITION_WORKERS = 4  # Concurrent requests to the recognition service
+RECOGNITION_RATE_PER_SECOND = 2.0  # Sustained request rate towards the recognition service
+RECOGNITION_BURST = 4  # Requests allowed back-to-back before pacing kicks in
+RECOGNITION_MAX_CHUNK_MS = 55000  # Keep every chunk under the recognition service limit
+
+# Recognition backends, primary first (e.g. RECOGNITION_BACKENDS=local for offline load tests)
+RECOGNITION_BACKENDS = os.environ.get('RECOGNITION_BACKENDS', 'google').split(',')
+RECOGNITION_TIMEOUT_SECONDS = 30  # Per-backend request timeout
+RECOGNITION_HEDGE_PERCENTILE = 95  # Hedge to the next backend once the primary is slower than this
+RECOGNITION_HEDGE_DEFAULT_DELAY = 5.0  # Used until enough latencies have been observed
+RECOGNITION_HEDGE_MIN_SAMPLES = 20
+LOCAL_RECOGNIZER_LATENCY = float(os.environ.get('LOCAL_RECOGNIZER_LATENCY', '0.2'))  # Seconds per request
+
+# Streaming decode settings (ffmpeg pipes 16kHz mono PCM straight into the chunker)
+STREAM_SAMPLE_RATE = 16000
+# No lowpass in either chain: the 16kHz resample already band-limits, and lowpass=f=8000 is
+# unstable on 16kHz sources
+SPEECH_FILTER_CHAIN = 'highpass=f=80,loudnorm=I=-16:LRA=11:TP=-1.5'
+# No loudnorm (it lifts pauses and blinds the VAD)
+STREAM_FILTER_CHAIN = 'highpass=f=80'
+
+# Routing by what the file header says (see probe_audio)
+AUDIO_SINGLE_SHOT_MAX_SECONDS = RECOGNITION_MAX_CHUNK_MS / 1000  # Longer recordings are split into chunks
+AUDIO_UNKNOWN_DURATION_CHUNK_MB = 10  # Without a duration in the header, files above this size are chunked
+AUDIO_PROBE_TIMEOUT_SECONDS = 10
+
+# Voice activity detection settings used to split long audio on silence
+VAD_FRAME_MS = 30  # Analysis frame length
+VAD_THRESHOLD_RATIO = 3.0  # Speech must be ~10dB above the noise floor
+VAD_MIN_ENERGY = 60  # Absolute RMS floor so digital silence never counts as speech
+VAD_MIN_SILENCE_MS = 500  # Pauses shorter than this stay inside a chunk
+VAD_SPEECH_PAD_MS = 200  # Audio kept around each speech region
+VAD_MIN_SPEECH_MS = 250  # Regions with less speech than this are skipped
+
+# Transcript cache settings (the disk tier is enabled by setting TRANSCRIPT_CACHE_DIR)
+TRANSCRIPT_CACHE_VERSION = 1  # Bump when recognition output changes so old entries miss
+TRANSCRIPT_CACHE_MEMORY_ENTRIES = 256
+TRANSCRIPT_CACHE_DIR = os.environ.get('TRANSCRIPT_CACHE_DIR')
+TRANSCRIPT_CACHE_DISK_MAX_MB = 200
+TRANSCRIPT_CACHE_TTL_SECONDS = 7 * 24 * 3600  # One week
+TRANSCRIPT_CACHE_DISK_SCAN_SECONDS = 3600  # Expired disk entries are swept at least this often
+TRANSCRIPT_CACHE_DISK_LOW_WATER = 0.9  # Eviction frees space down to this fraction of the size limit
+
+# OCR settings
+OCR_CONFIGS = [
+    r'--oem 3 --psm 6',  # Default config
+    r'--oem 3 --psm 3',  # Fully automatic page segmentation
+    r'--oem 3 --psm 7',  # Single text line
+    r'--oem 3 --psm 8',  # Single word
+    r'--oem 3 --psm 11', # Sparse text
+    r'--oem 3 --psm 13'  # Raw line
+]
+OCR_PREPROCESSING = ['otsu_threshold', 'median_blur', 'gaussian_blur']  # Run with --psm 6 on grayscale
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 1))  # Processes in the OCR pool
+OCR_ACCEPT_CONFIDENCE = 80  # Mean word confidence that ends the search early
+OCR_ACCEPT_MIN_CHARS = 20  # ...as long as the candidate found this much text
+OCR_MAX_SOURCE_PIXELS = 50_000_000  # Larger images are rejected before decoding (decompression bombs)
+OCR_MAX_PIXELS = 12_000_000  # Decoded images are downscaled to at most this many pixels
+OCR_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'tif', 'tiff'}
+OCR_BATCH_MAX_PAGES = 200  # Pages per batch request, counting every TIFF frame and ZIP entry
+OCR_BATCH_MAX_ENTRY_MB = 25  # Largest single image accepted inside a ZIP
+
+# Live transcription settings (MediaRecorder timeslices streamed while recording)
+LIVE_MAX_SESSIONS = 20  # Concurrent live recordings (each holds one ffmpeg process)
+LIVE_SESSION_IDLE_SECONDS = 60  # Sessions without new segments are closed after this
+LIVE_FINISH_TIMEOUT_SECONDS = 30  # Longest wait for outstanding chunks when recording stops
+LIVE_MAX_SEGMENT_MB = 2  # A single 1s timeslice is far below this
+LIVE_INPUT_FORMATS = {'webm': 'matroska', 'ogg': 'ogg'}  # MIME subtype -> ffmpeg demuxer
+
+# Background transcription job settings
+JOB_WORKERS = 2  # Jobs transcribed at the same time (chunks still share the recognition pool)
+JOB_RETENTION_SECONDS = 3600  # Finished jobs are kept this long for polling
+JOB_MAX_FINISHED = 100  # Oldest finished jobs are dropped beyond this count
+JOB_STATE_DIR = os.environ.get('JOB_STATE_DIR')  # Shared job snapshots when several server processes run (see gunicorn.conf.py)
+
+# Metrics settings (/api/metrics, Prometheus text format)
+METRICS_DIR = os.environ.get('METRICS_DIR')  # Shared by server processes so one scrape covers all of them
+METRICS_FLUSH_SECONDS = 5  # How often each process publishes its metrics to METRICS_DIR
+METRICS_STALE_SECONDS = 86400  # Metrics files of processes gone this long are dropped
+METRICS_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Batch audio settings
+AUDIO_BATCH_MAX_FILES = 50  # Files per batch request
+AUDIO_BATCH_CONCURRENT_FILES = 4  # Files decoded at the same time across all batches
+
+# Resumable upload settings (see /api/uploads)
+RESUMABLE_UPLOAD_DIR = os.environ.get('RESUMABLE_UPLOAD_DIR') or os.path.join(tempfile.gettempdir(), 'englishpro-uploads')
+RESUMABLE_MAX_UPLOAD_MB = 50  # Same limit as /api/audio-to-text
+RESUMABLE_MAX_PART_MB = UPLOAD_LIMITS['upload_part'][0]
+RESUMABLE_UPLOAD_TTL_SECONDS = 24 * 3600  # Uploads that receive no part for this long are removed
+RESUMABLE_EARLY_DECODE_FORMATS = {'wav', 'mp3', 'ogg', 'webm', 'flac'}  # Decodable from the first bytes (not m4a)
+RESUMABLE_EARLY_DECODE_MIN_MB = 10  # Smaller uploads take the standard path once complete
+RESUMABLE_EARLY_DECODE_MAX = 4  # Uploads decoded while still arriving, per process
+RESUMABLE_EARLY_DECODE_STALL_SECONDS = 120  # An early decode gives up when no part arrives for this long
+RESUMABLE_EARLY_DECODE_FINALIZE_WAIT_SECONDS = 300  # Finalize stops waiting for the tail and decodes the file itself
+
+# Admission control for CPU-heavy endpoints (see gunicorn.conf.py for the per-worker share of cores)
+ADMISSION_CORES = int(os.environ.get('ADMISSION_CORES', os.cpu_count() or 1))
+ADMISSION_LIMITS = {  # Endpoint -> (requests running at once, requests allowed to wait for a slot)
+    'voice_to_text': (ADMISSION_CORES * 2, ADMISSION_CORES * 4),  # Short clips, mostly waiting on recognition
+    'audio_to_text': (ADMISSION_CORES, ADMISSION_CORES * 2),
+    'finalize_upload': (ADMISSION_CORES, ADMISSION_CORES * 2),
+    'audio_to_text_batch': (max(1, ADMISSION_CORES // 2), ADMISSION_CORES),
+    'image_to_text': (ADMISSION_CORES, ADMISSION_CORES * 2),
+    'image_to_text_batch': (max(1, ADMISSION_CORES // 2), ADMISSION_CORES),
+}
+ADMISSION_MAX_WAIT_SECONDS = 30  # Queued requests give up with 429 after this long
+ADMISSION_DEFAULT_SECONDS = 10.0  # Assumed request duration until one has been measured
+ADMISSION_MAX_RETRY_AFTER = 120  # Upper bound on the Retry-After hint
+
+# Create uploads directory if it doesn't exist
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+class Metric:
+    """Base class for in-process metrics; values are kept per tuple of label values"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {(): 0.0} if not labelnames and self.type != 'histogram' else {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """[[label values, value], ...] in a JSON-friendly form"""
+        with self._lock:
+            return [[list(labels), json.loads(json.dumps(value))] for labels, value in self._values.items()]
+
+    @staticmethod
+    def merge_values(a, b):
+        return a + b
+
+    def format_labels(self, labels, extra=()):
+        pairs = list(zip(self.labelnames, labels)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    def render_samples(self, values):
+        return [f"{self.name}{self.format_labels(labels)} {value}" for labels, value in values.items()]
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+class Gauge(Metric):
+    """Gauge that is either set directly or read from a callback at scrape time"""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect  # Returns {label tuple: value}
+
+    def inc(self, *labels, amount=1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount=1.0):
+        self.inc(*labels, amount=-amount)
+
+    def snapshot(self):
+        if self.collect is not None:
+            try:
+                with self._lock:
+                    self._values = {tuple(labels): float(value) for labels, value in self.collect().items()}
+            except Exception as e:
+                logger.warning(f"Could not collect {self.name}: {str(e)}")
+        return super().snapshot()
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=METRICS_DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe how long the with-block took"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    @staticmethod
+    def merge_values(a, b):
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+
+    def render_samples(self, values):
+        lines = []
+        for labels, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f"{self.name}_bucket{self.format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collects this process's metrics and renders them, merged with other processes', for /api/metrics.
+    
+    With a shared directory, each process publishes a snapshot every few
+    seconds; the process answering the scrape adds up everyone's counters and
+    histograms (gauges only from processes that published recently).
+    """
+
+    def __init__(self, shared_dir=None, flush_seconds=METRICS_FLUSH_SECONDS):
+        self.shared_dir = shared_dir
+        self.flush_seconds = flush_seconds
+        self._metrics = OrderedDict()
+        self._publisher_pid = None
+        self._publisher_lock = threading.Lock()
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def ensure_publisher(self):
+        """Start this process's publishing thread (again after a fork)"""
+        if not self.shared_dir or self._publisher_pid == os.getpid():
+            return
+        with self._publisher_lock:
+            if self._publisher_pid != os.getpid():
+                self._publisher_pid = os.getpid()
+                threading.Thread(target=self._publish_loop, name='metrics-publisher', daemon=True).start()
+
+    def _publish_loop(self):
+        path = os.path.join(self.shared_dir, f"{os.getpid()}.json")
+        while True:
+            try:
+                with open(f"{path}.tmp", 'w') as f:
+                    json.dump(self.snapshot(), f)
+                os.replace(f"{path}.tmp", path)
+            except OSError as e:
+                logger.warning(f"Could not publish metrics: {str(e)}")
+            time.sleep(self.flush_seconds)
+
+    def _other_snapshots(self):
+        """(snapshot, is_fresh) for every other process that published metrics"""
+        if not self.shared_dir:
+            return []
+        
+        snapshots = []
+        now = time.time()
+        own = f"{os.getpid()}.json"
+        for entry in os.scandir(self.shared_dir):
+            if entry.name == own or not entry.name.endswith('.json'):
+                continue
+            try:
+                age = now - entry.stat().st_mtime
+                if age > METRICS_STALE_SECONDS:
+                    os.remove(entry.path)
+                    continue
+                with open(entry.path) as f:
+                    snapshots.append((json.load(f), age < self.flush_seconds * 3))
+            except (OSError, ValueError):
+                continue  # Being replaced or removed right now
+        return snapshots
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        snapshots = [(self.snapshot(), True)] + self._other_snapshots()
+        lines = []
+        for name, metric in self._metrics.items():
+            merged = {}
+            for snapshot, is_fresh in snapshots:
+                if metric.type == 'gauge' and not is_fresh:
+                    continue  # Process has exited; its gauges no longer mean anything
+                for labels, value in snapshot.get(name, []):
+                    labels = tuple(labels)
+                    merged[labels] = metric.merge_values(merged[labels], value) if labels in merged else value
+            
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render_samples(merged))
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry(METRICS_DIR)
+STAGE_SECONDS = metrics.register(Histogram(
+    'englishpro_stage_duration_seconds', 'Time spent in each processing stage', ['stage']))
+REQUEST_SECONDS = metrics.register(Histogram(
+    'englishpro_request_duration_seconds', 'Time to produce a response, by endpoint', ['endpoint']))
+REQUESTS_TOTAL = metrics.register(Counter(
+    'englishpro_requests_total', 'Responses sent, by endpoint and status code', ['endpoint', 'status']))
+REQUESTS_IN_FLIGHT = metrics.register(Gauge(
+    'englishpro_requests_in_flight', 'Requests being handled right now', ['endpoint']))
+BACKEND_SECONDS = metrics.register(Histogram(
+    'englishpro_recognition_backend_seconds', 'Round-trip time of recognition backend calls', ['backend', 'outcome']))
+OCR_CANDIDATE_SECONDS = metrics.register(Histogram(
+    'englishpro_ocr_candidate_seconds', 'Tesseract time per OCR configuration', ['config']))
+RECOGNITION_RETRIES = metrics.register(Counter(
+    'englishpro_recognition_retries_total', 'Chunk recognition attempts retried after a service error'))
+RECOGNITION_HEDGES = metrics.register(Counter(
+    'englishpro_recognition_hedges_total', 'Requests raced against the next backend because the primary was slow'))
+CHUNKS_TOTAL = metrics.register(Counter(
+    'englishpro_chunks_total', 'Audio chunks recognized, by outcome', ['outcome']))
+FLAC_PAYLOADS = metrics.register(Counter(
+    'englishpro_flac_payloads_total', 'Recognizer FLAC payloads, by how they were produced', ['source']))
+FLAC_AUDIO_SECONDS = metrics.register(Counter(
+    'englishpro_flac_encoded_audio_seconds_total', 'Seconds of audio encoded to FLAC in-process'))
+FLAC_CPU_SECONDS = metrics.register(Counter(
+    'englishpro_flac_encode_cpu_seconds_total', 'CPU time spent encoding FLAC in-process'))
+CONVERSION_FALLBACKS = metrics.register(Counter(
+    'englishpro_audio_conversion_fallbacks_total', 'Conversions that fell back from ffmpeg to pydub'))
+ADMISSION_REJECTIONS = metrics.register(Counter(
+    'englishpro_admission_rejections_total', 'Requests refused with 429 by admission control', ['endpoint']))
+metrics.register(Gauge(
+    'englishpro_recognition_queue_depth', 'Chunks waiting for a recognition worker',
+    collect=lambda: {(): _recognition_executor.queued() if _recognition_executor else 0}))
+metrics.register(Gauge(
+    'englishpro_admission_queue_depth', 'Requests waiting for an admission slot, by endpoint', ['endpoint'],
+    collect=lambda: {(endpoint,): limiter.queued() for endpoint, limiter in admission_limiters.items()}))
+metrics.register(Gauge(
+    'englishpro_live_sessions', 'Open live transcription sessions',
+    collect=lambda: {(): live_sessions.count()}))
+metrics.register(Gauge(
+    'englishpro_jobs', 'Background transcription jobs held by this process, by status', ['status'],
+    collect=lambda: {(status,): count for status, count in job_manager.stats().items()}))
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace calls to the recognition service"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event=None):
+        """Block until a token is available. Returns False if cancelled while waiting."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+    def try_acquire(self):
+        """Take a token if one is available right now, without waiting"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+# Process-wide limiter so concurrent requests share one recognition budget
+recognition_rate_limiter = TokenBucket(RECOGNITION_RATE_PER_SECOND, RECOGNITION_BURST)
+
+class PriorityThreadPool:
+    """Thread pool that always runs the queued task with the lowest priority value.
+    
+    Tasks with equal priority run in submission order. Recognition submits each
+    chunk with its index in the file as priority, so the pool round-robins
+    between files: a short file's chunks never queue behind the tail of a long one.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix):
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'{thread_name_prefix}_{i}', daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, priority=0, **kwargs):
+        """Queue fn(*args, **kwargs) and return a concurrent.futures.Future for it"""
+        future = Future()
+        self._queue.put((priority, next(self._sequence), future, fn, args, kwargs))
+        return future
+
+    def queued(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            _, _, future, fn, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+_recognition_executor = None
+_recognition_executor_lock = threading.Lock()
+
+def get_recognition_executor():
+    """Return the shared worker pool for chunk recognition (created on first use)"""
+    global _recognition_executor
+    with _recognition_executor_lock:
+        if _recognition_executor is None:
+            _recognition_executor = PriorityThreadPool(
+                max_workers=CHUNK_RECOGNITION_WORKERS,
+                thread_name_prefix='chunk-recognition'
+            )
+        return _recognition_executor
+
+class TranscriptCache:
+    """Two-tier transcript cache: in-memory LRU backed by an optional on-disk store.
+    
+    Disk reads and writes happen outside the lock that guards the memory tier.
+    The disk tier's size is tracked as entries are written; the directory is
+    only scanned (and least recently used entries removed) when that total goes
+    over the limit, or every TRANSCRIPT_CACHE_DISK_SCAN_SECONDS to sweep expired
+    entries. The scan also picks up entries written by other server processes.
+    """
+
+    def __init__(self, max_entries, cache_dir=None, max_disk_mb=200, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()  # Serializes directory scans and the size total
+        self._disk_bytes = None  # Tracked size of the disk tier; unknown until the first scan
+        self._last_disk_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash, language, mode, **params):
+        """Build a cache key from the upload hash and everything that affects the transcript"""
+        parts = [str(TRANSCRIPT_CACHE_VERSION), content_hash, language, mode]
+        parts.extend(f"{name}={params[name]}" for name in sorted(params))
+        return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+    def _is_expired(self, stored_at):
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached payload for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, stored_at = entry
+                if not self._is_expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+                self.evictions += 1
+        
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            
+            # Promote disk hits into the memory tier
+            self._store_memory(key, payload)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        """Store a payload in both tiers"""
+        with self._lock:
+            self._store_memory(key, payload)
+        self._write_disk(key, payload)
+
+    def _store_memory(self, key, payload):
+        self._entries[key] = (payload, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        
+        path = self._disk_path(key)
+        try:
+            if self._is_expired(os.path.getmtime(path)):
+                os.remove(path)
+                with self._lock:
+                    self.evictions += 1
+                return None
+            
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            
+            os.utime(path)  # Track recency for size-based eviction
+            return payload
+            
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Transcript cache read failed for {key}: {str(e)}")
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.cache_dir:
+            return
+        
+        try:
+            # Write atomically so readers never see a partial entry
+            data = json.dumps(payload).encode('utf-8')
+            temp_path = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._disk_path(key))
+            
+            with self._disk_lock:
+                if (self._disk_bytes is None
+                        or self._disk_bytes + len(data) > self.max_disk_bytes
+                        or time.time() - self._last_disk_scan > TRANSCRIPT_CACHE_DISK_SCAN_SECONDS):
+                    self._evict_disk()
+                else:
+                    self._disk_bytes += len(data)  # Overwrites count twice until the next scan
+            
+        except OSError as e:
+            logger.warning(f"Transcript cache write failed for {key}: {str(e)}")
+
+    def _evict_disk(self):
+        """Scan the directory: drop expired entries, then least recently used ones down to the low-water mark.
+        
+        Called with _disk_lock held; resets the tracked size to what is left.
+        """
+        entries = []
+        evicted = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                    if self._is_expired(stat.st_mtime):
+                        os.remove(entry.path)
+                        evicted += 1
+                    else:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+        
+        total_size = sum(size for _, size, _ in entries)
+        if total_size > self.max_disk_bytes:
+            target = self.max_disk_bytes * TRANSCRIPT_CACHE_DISK_LOW_WATER
+            for _, size, path in sorted(entries):
+                if total_size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                evicted += 1
+        
+        self._disk_bytes = total_size
+        self._last_disk_scan = time.time()
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def stats(self):
+        """Counters reported on /api/health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': f"{(self.hits / lookups * 100) if lookups else 0:.1f}%",
+                'memory_entries': len(self._entries),
+                'disk_enabled': bool(self.cache_dir)
+            }
+
+transcript_cache = TranscriptCache(
+    TRANSCRIPT_CACHE_MEMORY_ENTRIES,
+    cache_dir=TRANSCRIPT_CACHE_DIR,
+    max_disk_mb=TRANSCRIPT_CACHE_DISK_MAX_MB,
+    ttl_seconds=TRANSCRIPT_CACHE_TTL_SECONDS
+)
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 of a file, read in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class UploadSpool:
+    """Destination for one uploaded file while the form parser streams the body in.
+    
+    Werkzeug writes the file in fixed-size blocks; each block is counted and
+    hashed on the way through, so size and SHA-256 are known without a second
+    read, and an over-limit upload is refused as soon as it crosses the limit
+    (this also covers chunked uploads that send no Content-Length).
+    """
+
+    def __init__(self, max_bytes=None, in_memory=False):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        if in_memory:
+            self._file = io.BytesIO()
+            self.path = None
+        else:
+            self._file = tempfile.NamedTemporaryFile(prefix='upload-', delete=False)
+            self.path = self._file.name
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.close()  # The parser drops us without closing when it aborts
+            raise RequestEntityTooLarge()
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def move_to(self, dest_path):
+        """Hand the spooled file over to dest_path without copying it"""
+        self._file.close()
+        try:
+            os.replace(self.path, dest_path)
+        except OSError:
+            shutil.move(self.path, dest_path)  # Different filesystem
+        self.path = None
+
+    def close(self):
+        self._file.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+            self.path = None
+
+class IngestRequest(Request):
+    """Request that spools uploaded files through UploadSpool"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        limit = UPLOAD_LIMITS.get(self.endpoint)
+        max_bytes = limit[0] * 1024 * 1024 if limit else None
+        return UploadSpool(max_bytes, in_memory=self.endpoint in UPLOAD_MEMORY_ENDPOINTS)
+
+app.request_class = IngestRequest
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    REQUESTS_IN_FLIGHT.inc(g.metrics_endpoint)
+    metrics.ensure_publisher()
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, g.metrics_endpoint)
+        REQUESTS_TOTAL.inc(g.metrics_endpoint, str(response.status_code))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if 'metrics_endpoint' in g:
+        REQUESTS_IN_FLIGHT.dec(g.metrics_endpoint)
+
+@app.before_request
+def reject_oversized_uploads():
+    """Refuse an upload from its Content-Length before any of the body is read"""
+    limit = UPLOAD_LIMITS.get(request.endpoint)
+    if limit and request.content_length:
+        max_mb, label = limit
+        if request.content_length > max_mb * 1024 * 1024 + UPLOAD_FORM_OVERHEAD_BYTES:
+            logger.warning(f"Rejected {request.path} upload of {request.content_length / (1024 * 1024):.2f}MB from Content-Length")
+            return jsonify({'error': f'{label} too large. Maximum size is {max_mb}MB.'}), 413
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    """Uploads that turn out to be over the limit while streaming in"""
+    limit = UPLOAD_LIMITS.get(request.endpoint)
+    if limit:
+        return jsonify({'error': f'{limit[1]} too large. Maximum size is {limit[0]}MB.'}), 413
+    return jsonify({'error': f"Upload too large. Maximum size is {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)}MB."}), 413
+
+class AdmissionLimiter:
+    """Caps how many requests of one kind run at once, with a bounded wait queue.
+    
+    Requests over the limit wait for a slot; once max_queue are already waiting,
+    further requests are refused straight away so the server sheds load instead
+    of making every request slow.
+    """
+
+    def __init__(self, concurrency, max_queue, max_wait=ADMISSION_MAX_WAIT_SECONDS):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._running = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._average_seconds = None  # Moving average of how long admitted requests hold a slot
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, waiting up to max_wait. Returns False if the request must be refused."""
+        with self._condition:
+            if self._running < self.concurrency and self._waiting == 0:
+                self._running += 1
+                return True
+            
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                return False
+            
+            self._waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self._running < self.concurrency, self.max_wait)
+            finally:
+                self._waiting -= 1
+            
+            if admitted:
+                self._running += 1
+            else:
+                self._rejected += 1
+            return admitted
+
+    def release(self, held_seconds):
+        with self._condition:
+            self._running -= 1
+            if self._average_seconds is None:
+                self._average_seconds = held_seconds
+            else:
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * held_seconds
+            self._condition.notify()
+
+    def retry_after(self):
+        """Seconds until a refused request is likely to get a slot"""
+        with self._condition:
+            average = self._average_seconds or ADMISSION_DEFAULT_SECONDS
+            backlog = (self._waiting + self._running + 1) / self.concurrency
+        return max(1, min(ADMISSION_MAX_RETRY_AFTER, math.ceil(average * backlog)))
+
+    def queued(self):
+        return self._waiting
+
+    def stats(self):
+        with self._condition:
+            return {
+                'concurrency': self.concurrency,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queued': self._waiting,
+                'rejected': self._rejected
+            }
+
+admission_limiters = {
+    endpoint: AdmissionLimiter(concurrency, max_queue)
+    for endpoint, (concurrency, max_queue) in ADMISSION_LIMITS.items()
+}
+
+@app.before_request
+def admit_request():
+    """Hold CPU-heavy requests until their endpoint has a free slot, or refuse them with 429"""
+    limiter = admission_limiters.get(request.endpoint)
+    if limiter is None:
+        return
+    
+    if not limiter.acquire():
+        retry_after = limiter.retry_after()
+        ADMISSION_REJECTIONS.inc(request.endpoint)
+        logger.warning(f"Refused {request.path}: all {limiter.concurrency} slots busy, {limiter.queued()} waiting")
+        response = jsonify({'error': 'The server is busy. Please try again shortly.', 'retry_after': retry_after})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
+    
+    g.admission_slot = (limiter, time.perf_counter())
+
+@app.after_request
+def hand_over_admission_slot(response):
+    """Streamed responses do their work after the view returns: keep the slot until the stream closes"""
+    if response.is_streamed and 'admission_slot' in g:
+        slot = g.pop('admission_slot')
+        response.call_on_close(lambda: release_admission_slot(slot))
+    return response
+
+@app.teardown_request
+def release_request_admission_slot(error=None):
+    slot = g.pop('admission_slot', None)
+    if slot is not None:
+        release_admission_slot(slot)
+
+def release_admission_slot(slot):
+    limiter, admitted_at = slot
+    limiter.release(time.perf_counter() - admitted_at)
+
+def save_upload(file, dest_path):
+    """Put an uploaded file at dest_path and return (size_bytes, sha256)"""
+    spool = file.stream
+    if isinstance(spool, UploadSpool) and spool.path is not None:
+        spool.move_to(dest_path)
+        result = spool.size, spool.sha256
+    else:
+        file.save(dest_path)
+        result = os.path.getsize(dest_path), hash_file(dest_path)
+    
+    observe_upload_time()
+    return result
+
+def read_upload(file):
+    """Return an uploaded file's bytes (without touching disk for in-memory spools)"""
+    spool = file.stream
+    if isinstance(spool, UploadSpool) and spool.path is None:
+        data = spool.getvalue()
+        spool.close()  # Release the spool buffer; data is all we keep
+    else:
+        data = file.read()
+    
+    observe_upload_time()
+    return data
+
+def observe_upload_time():
+    """Upload stage: from the start of the request until the file is in place"""
+    if 'request_started' in g:
+        STAGE_SECONDS.observe(time.perf_counter() - g.request_started, 'upload')
+
+def cache_transcription_result(cache_key, result):
+    """Store a successful transcription and mark the response as a cache miss"""
+    response, status = result
+    if status != 200:
+        return result
+    
+    payload = response.get_json()
+    transcript_cache.put(cache_key, payload)
+    return jsonify({**payload, 'cached': False}), status
+
+_flac_audio_data_class = None
+_flac_audio_data_lock = threading.Lock()
+
+def flac_audio_data(pcm, sample_rate):
+    """AudioData for 16-bit mono PCM whose FLAC payload is encoded in-process, once.
+    
+    The Google recognizers ask for FLAC on every call, and the stock AudioData
+    starts the flac binary each time. This subclass encodes with flac_encoder
+    and keeps the bytes, so retries and hedged requests reuse them. It is
+    defined on first use because speech_recognition is imported lazily.
+    """
+    global _flac_audio_data_class
+    with _flac_audio_data_lock:
+        if _flac_audio_data_class is None:
+            class FlacAudioData(sr.AudioData):
+                def __init__(self, frame_data, sample_rate, sample_width):
+                    super().__init__(frame_data, sample_rate, sample_width)
+                    self._flac = None
+                    self._flac_lock = threading.Lock()
+
+                def get_flac_data(self, convert_rate=None, convert_width=None):
+                    if convert_rate not in (None, self.sample_rate) or convert_width not in (None, 2):
+                        FLAC_PAYLOADS.inc('flac_binary')
+                        return super().get_flac_data(convert_rate, convert_width)
+                    
+                    with self._flac_lock:
+                        if self._flac is not None:
+                            FLAC_PAYLOADS.inc('reused')
+                            return self._flac
+                        
+                        started = time.thread_time()
+                        with STAGE_SECONDS.time('encode'):
+                            self._flac = flac_encoder.encode(self.frame_data, self.sample_rate)
+                        FLAC_CPU_SECONDS.inc(amount=time.thread_time() - started)
+                        FLAC_AUDIO_SECONDS.inc(amount=len(self.frame_data) / (2 * self.sample_rate))
+                        FLAC_PAYLOADS.inc('encoded')
+                        return self._flac
+            
+            _flac_audio_data_class = FlacAudioData
+    return _flac_audio_data_class(pcm, sample_rate, 2)
+
+def flac_encoder_stats():
+    """Payloads encoded and reused, and encoding throughput per core (audio seconds per CPU second)"""
+    audio_seconds = FLAC_AUDIO_SECONDS.value()
+    cpu_seconds = FLAC_CPU_SECONDS.value()
+    return {
+        'encoded': int(FLAC_PAYLOADS.value('encoded')),
+        'reused': int(FLAC_PAYLOADS.value('reused')),
+        'flac_binary': int(FLAC_PAYLOADS.value('flac_binary')),
+        'audio_seconds': round(audio_seconds, 1),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'realtime_per_core': f"{audio_seconds / cpu_seconds:.0f}x" if cpu_seconds else None
+    }
+
+class RecognitionBackend:
+    """Base class for speech recognition backends (subclasses implement _recognize)"""
+
+    name = None
+
+    def __init__(self, timeout=RECOGNITION_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        return True
+
+    def recognize(self, audio_data, language):
+        """Recognize AudioData, recording the latency of successful calls"""
+        started = time.monotonic()
+        outcome = 'error'
+        try:
+            text = self._recognize(audio_data, language)
+            outcome = 'ok'
+        except sr.UnknownValueError:
+            outcome = 'no_speech'
+            raise
+        finally:
+            BACKEND_SECONDS.observe(time.monotonic() - started, self.name, outcome)
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+        return text
+
+    def _recognize(self, audio_data, language):
+        raise NotImplementedError
+
+    def latency_percentile(self, percentile):
+        """Observed latency percentile, or None until enough calls have been made"""
+        with self._lock:
+            if len(self._latencies) < RECOGNITION_HEDGE_MIN_SAMPLES:
+                return None
+            return float(np.percentile(self._latencies, percentile))
+
+    def hedge_delay(self):
+        delay = self.latency_percentile(RECOGNITION_HEDGE_PERCENTILE)
+        return RECOGNITION_HEDGE_DEFAULT_DELAY if delay is None else delay
+
+    def stats(self):
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            'available': self.is_available(),
+            'timeout': self.timeout,
+            'p50_latency': f"{p50:.2f}s" if p50 is not None else None,
+            'p95_latency': f"{p95:.2f}s" if p95 is not None else None
+        }
+
+class GoogleBackend(RecognitionBackend):
+    """Free Google Web Speech API (speech_recognition's recognize_google)"""
+
+    name = 'google'
+
+    def _recognize(self, audio_data, language):
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout
+        return recognizer.recognize_google(audio_data, language=language)
+
+class GoogleCloudBackend(RecognitionBackend):
+    """Google Cloud Speech-to-Text (needs GOOGLE_APPLICATION_CREDENTIALS)"""
+
+    name = 'google_cloud'
+
+    def is_available(self):
+        return hasattr(sr.Recognizer, 'recognize_google_cloud') and bool(os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+
+    def _recognize(self, audio_data, language):
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout
+        return recognizer.recognize_google_cloud(audio_data, language=language)
+
+class LocalBackend(RecognitionBackend):
+    """Deterministic offline stand-in returning canned transcripts after a configurable delay.
+    
+    The same audio always yields the same transcript and latency, so the whole
+    pipeline can be load-tested without network access. It builds the same FLAC
+    payload as the Google backends, so that cost is part of the test too.
+    """
+
+    name = 'local'
+    CANNED_TRANSCRIPTS = [
+        'the quick brown fox jumps over the lazy dog',
+        'today we are going to practice the present perfect tense',
+        'please repeat after me and pay attention to the pronunciation',
+        'can you describe what you did last weekend',
+        'listening carefully is the first step to speaking fluently',
+    ]
+    SILENCE_RMS = 50  # Quieter audio is reported as no speech
+
+    def __init__(self, latency=LOCAL_RECOGNIZER_LATENCY, timeout=RECOGNITION_TIMEOUT_SECONDS):
+        super().__init__(timeout)
+        self.latency = latency
+
+    def _recognize(self, audio_data, language):
+        audio_data.get_flac_data(convert_width=2)
+        raw = audio_data.get_raw_data(convert_width=2)
+        digest = zlib.crc32(raw)
+        
+        # Latency varies between 0.5x and 1.5x of the configured value, fixed per input
+        delay = self.latency * (0.5 + (digest % 1000) / 1000)
+        if delay > self.timeout:
+            time.sleep(self.timeout)
+            raise sr.RequestError('local recognizer timed out')
+        time.sleep(delay)
+        
+        samples = np.frombuffer(raw, dtype=np.int16)
+        if len(samples) == 0 or np.sqrt(np.mean(samples.astype(np.float32) ** 2)) < self.SILENCE_RMS:
+            raise sr.UnknownValueError()
+        return self.CANNED_TRANSCRIPTS[digest % len(self.CANNED_TRANSCRIPTS)]
+
+recognition_backends = {}
+
+def register_backend(backend):
+    """Make a backend selectable through RECOGNITION_BACKENDS"""
+    recognition_backends[backend.name] = backend
+
+register_backend(GoogleBackend())
+register_backend(GoogleCloudBackend())
+register_backend(LocalBackend())
+
+def get_active_backends():
+    """Configured backends that can be used right now, primary first"""
+    backends = [
+        recognition_backends[name.strip()] for name in RECOGNITION_BACKENDS
+        if name.strip() in recognition_backends
+    ]
+    return [backend for backend in backends if backend.is_available()] or [recognition_backends['google']]
+
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+def get_hedge_executor():
+    """Threads that carry backend calls when more than one backend is configured"""
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=CHUNK_RECOGNITION_WORKERS * 2 + 4,
+                thread_name_prefix='recognition-backend'
+            )
+        return _hedge_executor
+
+def recognize_with_hedging(audio_data, language):
+    """Recognize audio with the primary backend, hedging to the next one when it is slow.
+    
+    The next backend is started when the current one has not answered within its
+    p95 latency, or immediately when it fails. With a single backend the hedge is
+    a second request to that backend (failures are left to the caller's retries).
+    Every request after the first takes a token from the recognition rate limiter;
+    a hedge is skipped when none is available. The first transcript wins.
+    Returns (text, backend_name); raises TimeoutError when the deadline passes
+    with requests still in flight, sr.UnknownValueError when no backend heard
+    speech, otherwise the last backend error. Requests still queued on the
+    hedge pool when it returns are cancelled.
+    """
+    backends = get_active_backends()
+    single = len(backends) == 1
+    
+    executor = get_hedge_executor()
+    remaining = list(backends) + (backends if single else [])
+    pending = {}
+    errors = []
+    time_limit = max(backend.timeout for backend in backends)
+    deadline = time.monotonic() + time_limit
+    
+    def start_next():
+        backend = remaining.pop(0)
+        pending[executor.submit(backend.recognize, audio_data, language)] = backend
+        return backend
+    
+    try:
+        current = start_next()
+        while pending:
+            time_left = deadline - time.monotonic()
+            if time_left <= 0:
+                break
+            
+            timeout = min(current.hedge_delay(), time_left) if remaining else time_left
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            if not done:
+                if not remaining:
+                    continue  # Out of time, with nothing left to hedge with
+                if not recognition_rate_limiter.try_acquire():
+                    # No budget for an extra request: keep waiting for the ones in flight
+                    logger.info(f"{current.name} is slow, but the rate limit leaves no room to hedge")
+                    remaining.clear()
+                    continue
+                # Slower than usual - race it against the next backend (or a second request to it)
+                logger.info(f"{current.name} slower than its p{RECOGNITION_HEDGE_PERCENTILE}, hedging")
+                RECOGNITION_HEDGES.inc()
+                current = start_next()
+                continue
+            
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    text = future.result()
+                    if text and text.strip():
+                        return text, backend.name
+                    errors.append(sr.UnknownValueError())
+                except sr.UnknownValueError as e:
+                    errors.append(e)  # No speech heard: not a failure worth logging
+                except Exception as e:
+                    logger.warning(f"{backend.name} recognition failed: {type(e).__name__} {str(e)}")
+                    errors.append(e)
+            
+            # Fail over straight away when nothing is left in flight
+            if not pending and remaining and not single:
+                recognition_rate_limiter.acquire()
+                current = start_next()
+        
+        if pending:
+            raise TimeoutError(f"No backend answered within {time_limit}s")
+    finally:
+        # Requests that have not started would only hold a pool thread the caller no longer waits for
+        for future in pending:
+            future.cancel()
+    
+    for error in errors:
+        if isinstance(error, sr.UnknownValueError):
+            raise error
+    raise errors[-1]
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def log_request(endpoint, filename, file_size, duration=None):
+    """Log API requests for monitoring"""
+    timestamp = datetime.now().isoformat()
+    logger.info(f"[{timestamp}] {endpoint} - File: {filename}, Size: {file_size}MB" + 
+                (f", Duration: {duration}s" if duration else ""))
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/voice-to-text')
+def voice_to_text_page():
+    return render_template('voice_to_text.html')
+
+@app.route('/audio-to-text')
+def audio_to_text_page():
+    return render_template('audio_to_text.html')
+
+@app.route('/image-to-text')
+def image_to_text_page():
+    return render_template('image_to_text.html')
+
+@app.route('/api/voice-to-text', methods=['POST'])
+def voice_to_text():
+    """Enhanced voice-to-text API with multi-language support and better error handling"""
+    start_time = time.time()
+    
+    if 'audio' not in request.files:
+        return jsonify({'error': 'No audio file provided'}), 400
+    
+    file = request.files['audio']
+    if file.filename == '':
+        return jsonify({'error': 'No audio file selected'}), 400
+    
+    # Get language preference
+    language = request.form.get('language', 'en-US')
+    if language not in SUPPORTED_LANGUAGES:
+        language = 'en-US'  # Fallback to English
+    
+    # Create a temporary directory to store files
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            # Move the spooled upload into the temp directory (size and hash were taken while it streamed in;
+            # the 25MB limit is enforced by the ingest layer)
+            temp_file = os.path.join(temp_dir, secure_filename(file.filename))
+            file_bytes, content_hash = save_upload(file, temp_file)
+            file_size = file_bytes / (1024 * 1024)  # Convert to MB
+            
+            log_request('/api/voice-to-text', file.filename, file_size)
+            
+            # Validate audio file
+            if file_bytes < 1000:  # Less than 1KB
+                return jsonify({'error': 'Audio file is too small or corrupted'}), 400
+            
+            # Repeated uploads of the same recording are answered from the cache
+            cache_key = TranscriptCache.make_key(content_hash, language, 'voice-to-text')
+            cached = transcript_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {file.filename}")
+                return jsonify({**cached, 'cached': True}), 200
+            
+            logger.info(f"Processing voice file: {file.filename} ({file_size:.2f}MB) in {language}")
+            
+            # Generate a safe wav filename
+            wav_file = os.path.join(temp_dir, "converted_audio.wav")
+            
+            # Enhanced audio conversion with quality optimization
+            success = convert_audio_to_wav(temp_file, wav_file, optimize_for_speech=True)
+            if not success:
+                return jsonify({'error': 'Could not convert audio format'}), 500
+            
+            # Process with enhanced speech recognition
+            result = process_speech_recognition(wav_file, language)
+            
+            # Log processing time
+            processing_time = time.time() - start_time
+            logger.info(f"Voice processing completed in {processing_time:.2f}s")
+            
+            return cache_transcription_result(cache_key, result)
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in voice-to-text: {str(e)}")
+            return jsonify({'error': 'An unexpected error occurred during processing'}), 500
+
+class LiveTranscriptionSession:
+    """Transcribes a recording while it is uploaded in MediaRecorder timeslices.
+    
+    Segments are piped into a long-running ffmpeg process; a reader thread
+    feeds the decoded PCM to an eager SpeechSegmenter and every utterance is
+    sent for recognition as soon as a pause ends it.
+    """
+
+    def __init__(self, language, input_format=None):
+        self.id = uuid.uuid4().hex
+        self.language = language
+        self.created_at = time.time()
+        self.last_activity = self.created_at
+        self.next_segment_index = 0
+        self.bytes_received = 0
+        self.segmenter = SpeechSegmenter(STREAM_SAMPLE_RATE, eager=True)
+        self.chunks = []  # (start_sample, end_sample, future) in recording order
+        self.delivered = 0  # Chunks already returned as partial transcripts
+        self.stop_event = threading.Event()
+        self.decode_error = None
+        self._lock = threading.Lock()
+        self._stderr = tempfile.TemporaryFile()
+        
+        cmd = ['ffmpeg', '-loglevel', 'error', '-fflags', 'nobuffer', '-probesize', '32768', '-analyzeduration', '0']
+        if input_format:
+            cmd.extend(['-f', input_format])
+        cmd.extend([
+            '-i', 'pipe:0',
+            '-vn',
+            '-ac', '1',
+            '-ar', str(STREAM_SAMPLE_RATE),
+            '-af', STREAM_FILTER_CHAIN,
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            'pipe:1'
+        ])
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr)
+        self._reader = threading.Thread(target=self._read_pcm, name=f'live-decode-{self.id[:8]}', daemon=True)
+        self._reader.start()
+
+    def _read_pcm(self):
+        """Decode loop: hand ffmpeg output to the segmenter as soon as it is available"""
+        pending = b''
+        try:
+            while True:
+                data = self.process.stdout.read1(STREAM_SAMPLE_RATE)  # Up to 0.5s of PCM
+                if not data:
+                    break
+                
+                # Keep an odd trailing byte for the next read
+                data = pending + data
+                usable = len(data) - len(data) % 2
+                pending = data[usable:]
+                
+                with self._lock:
+                    self._submit(self.segmenter.feed(np.frombuffer(data[:usable], dtype=np.int16)))
+            
+            with self._lock:
+                self._submit(self.segmenter.flush())
+                
+        except Exception as e:
+            logger.error(f"Live session {self.id} decode error: {str(e)}")
+            self.decode_error = str(e)
+
+    def _submit(self, chunks):
+        executor = get_recognition_executor()
+        for start, end, pcm in chunks:
+            # Someone is waiting on the result while still talking: go ahead of batch work
+            future = executor.submit(
+                recognize_chunk, normalize_pcm_levels(pcm), STREAM_SAMPLE_RATE, self.language, self.stop_event,
+                priority=-1
+            )
+            self.chunks.append((start, end, future))
+
+    def add_segment(self, index, data):
+        """Pipe the next MediaRecorder timeslice into the decoder"""
+        if index is not None and index != self.next_segment_index:
+            raise ValueError(f"Expected segment {self.next_segment_index}, got {index}")
+        
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+        self.next_segment_index += 1
+        self.bytes_received += len(data)
+        self.last_activity = time.time()
+
+    def collect_partials(self):
+        """Transcripts of chunks finished since the last call, in recording order"""
+        partials = []
+        with self._lock:
+            while self.delivered < len(self.chunks):
+                start, end, future = self.chunks[self.delivered]
+                if not future.done():
+                    break
+                
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logger.warning(f"Live chunk {self.delivered + 1} failed: {str(e)}")
+                    text = None
+                
+                partials.append({
+                    'index': self.delivered,
+                    'start': round(start / STREAM_SAMPLE_RATE, 2),
+                    'end': round(end / STREAM_SAMPLE_RATE, 2),
+                    'text': text.strip() if text else ''
+                })
+                self.delivered += 1
+        return partials
+
+    @property
+    def pending_chunks(self):
+        return len(self.chunks) - self.delivered
+
+    def finish(self, timeout=LIVE_FINISH_TIMEOUT_SECONDS):
+        """Close the input, wait for the remaining chunks and return every chunk transcript"""
+        deadline = time.time() + timeout
+        self.process.stdin.close()
+        self._reader.join(timeout=max(0, deadline - time.time()))
+        
+        if self.process.wait(timeout=max(1, deadline - time.time())) != 0 and not self.chunks:
+            self._stderr.seek(0)
+            error_output = self._stderr.read().decode(errors='replace').strip()
+            raise RuntimeError(f"FFmpeg decode failed: {error_output or 'no audio decoded'}")
+        
+        with self._lock:
+            chunks = list(self.chunks)
+        
+        texts = []
+        for start, end, future in chunks:
+            try:
+                text = future.result(timeout=max(0, deadline - time.time()))
+            except Exception as e:
+                logger.warning(f"Live chunk failed: {str(e)}")
+                text = None
+            texts.append(text.strip() if text else '')
+        return texts
+
+    def close(self):
+        """Stop decoding and drop outstanding recognition work"""
+        self.stop_event.set()
+        with self._lock:
+            for _, _, future in self.chunks:
+                future.cancel()
+        
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                pipe.close()
+            except (OSError, ValueError):
+                pass
+        self._stderr.close()
+
+class LiveSessionManager:
+    """Keeps live transcription sessions and closes the ones left idle"""
+
+    def __init__(self, max_sessions, idle_seconds):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, language, input_format=None):
+        with self._lock:
+            self._prune()
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = LiveTranscriptionSession(language, input_format)
+            self._sessions[session.id] = session
+            return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._prune()
+            return self._sessions.get(session_id)
+
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _prune(self):
+        now = time.time()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_activity > self.idle_seconds:
+                logger.info(f"Closing idle live session {session_id}")
+                del self._sessions[session_id]
+                session.close()
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+live_sessions = LiveSessionManager(LIVE_MAX_SESSIONS, LIVE_SESSION_IDLE_SECONDS)
+
+@app.route('/api/voice-to-text/stream', methods=['POST'])
+def start_live_transcription():
+    """Open a live transcription session for a recording in progress"""
+    if not get_ffmpeg_status()['available']:
+        return jsonify({'error': 'Live transcription requires FFmpeg on the server'}), 503
+    
+    # Get language preference
+    language = request.form.get('language', 'en-US')
+    if language not in SUPPORTED_LANGUAGES:
+        language = 'en-US'  # Fallback to English
+    
+    # Tell ffmpeg the container up front so it does not wait to probe the stream
+    mime_type = request.form.get('mime_type', '')
+    subtype = mime_type.split(';')[0].split('/')[-1].strip().lower()
+    input_format = LIVE_INPUT_FORMATS.get(subtype)
+    
+    try:
+        session = live_sessions.create(language, input_format)
+    except Exception as e:
+        logger.error(f"Could not start live transcription: {str(e)}")
+        return jsonify({'error': 'Could not start live transcription'}), 500
+    
+    if session is None:
+        return jsonify({'error': 'Too many live recordings in progress. Please try again shortly.'}), 503
+    
+    logger.info(f"Live session {session.id} started ({language}, {mime_type or 'unknown format'})")
+    return jsonify({
+        'session_id': session.id,
+        'segments_url': f"/api/voice-to-text/stream/{session.id}/segments",
+        'finish_url': f"/api/voice-to-text/stream/{session.id}/finish"
+    }), 201
+
+@app.route('/api/voice-to-text/stream/<session_id>/segments', methods=['POST'])
+def add_live_segment(session_id):
+    """Accept the next recorder timeslice and return any new partial transcripts"""
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Live session not found or expired'}), 404
+    
+    data = request.get_data()
+    if len(data) > LIVE_MAX_SEGMENT_MB * 1024 * 1024:
+        return jsonify({'error': 'Audio segment too large'}), 413
+    if session.bytes_received + len(data) > 25 * 1024 * 1024:  # Same limit as /api/voice-to-text
+        return jsonify({'error': 'Audio file too large. Maximum size is 25MB.'}), 413
+    
+    index = request.headers.get('X-Segment-Index', type=int)
+    try:
+        session.add_segment(index, data)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'expected_index': session.next_segment_index}), 409
+    except (BrokenPipeError, OSError) as e:
+        logger.error(f"Live session {session_id} decoder stopped: {str(e)}")
+        live_sessions.remove(session_id)
+        session.close()
+        return jsonify({'error': 'Audio stream could not be decoded'}), 422
+    
+    return jsonify({
+        'partials': session.collect_partials(),
+        'pending_chunks': session.pending_chunks
+    }), 200
+
+@app.route('/api/voice-to-text/stream/<session_id>/finish', methods=['POST'])
+def finish_live_transcription(session_id):
+    """Finish a live session and return the full transcript"""
+    start_time = time.time()
+    session = live_sessions.remove(session_id)
+    if session is None:
+        return jsonify({'error': 'Live session not found or expired'}), 404
+    
+    try:
+        texts = session.finish()
+        partials = session.collect_partials()
+        
+        segments = [text for text in texts if text]
+        if not segments:
+            return jsonify({'error': 'No speech could be detected in this audio'}), 400
+        
+        combined_text = smart_combine_text_segments(segments, session.language)
+        processed_text = post_process_text(combined_text, session.language)
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Live session {session_id} finished {processing_time:.2f}s after recording stopped")
+        
+        return jsonify({
+            'text': processed_text,
+            'language': session.language,
+            'service': get_active_backends()[0].name,
+            'word_count': len(processed_text.split()),
+            'confidence': 'high',
+            'chunks_processed': len(segments),
+            'total_chunks': len(texts),
+            'partials': partials
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Live session {session_id} failed: {str(e)}")
+        return jsonify({'error': 'An unexpected error occurred during processing'}), 500
+    finally:
+        session.close()
+
+@app.route('/api/voice-to-text/stream/<session_id>', methods=['DELETE'])
+def cancel_live_transcription(session_id):
+    """Abandon a live session (e.g. the recording was discarded)"""
+    session = live_sessions.remove(session_id)
+    if session is None:
+        return jsonify({'error': 'Live session not found or expired'}), 404
+    session.close()
+    return jsonify({'session_id': session_id, 'status': 'cancelled'}), 200
+
+@app.route('/api/audio-to-text', methods=['POST'])
+def audio_to_text():
+    """Enhanced audio-to-text API with improved large file handling"""
+    start_time = time.time()
+    
+    if 'audio' not in request.files:
+        return jsonify({'error': 'No audio file provided'}), 400
+    
+    file = request.files['audio']
+    if file.filename == '':
+        return jsonify({'error': 'No audio file selected'}), 400
+    
+    # Get language preference  
+    language = request.form.get('language', 'en-US')
+    if language not in SUPPORTED_LANGUAGES:
+        language = 'en-US'
+    
+    # Opt-in: send each chunk's transcript as soon as it is recognized
+    stream_format = requested_stream_format()
+    if stream_format:
+        return stream_audio_transcription(file, language, stream_format)
+    
+    # Create temp directory to avoid file permission issues
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            # Move the spooled upload into the temp directory (50MB limit enforced while it streamed in)
+            filename = secure_filename(file.filename)
+            filepath = os.path.join(temp_dir, filename)
+            file_bytes, content_hash = save_upload(file, filepath)
+            
+            # Get file info
+            file_size_mb = file_bytes / (1024 * 1024)
+            log_request('/api/audio-to-text', filename, file_size_mb)
+            
+            # Repeated uploads of the same recording are answered from the cache
+            cache_key = TranscriptCache.make_key(content_hash, language, 'audio-to-text')
+            cached = transcript_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {filename}")
+                return jsonify({**cached, 'cached': True}), 200
+            
+            logger.info(f"Processing audio file: {filename} ({file_size_mb:.2f}MB) in {language}")
+            
+            result = transcribe_audio_file(filepath, language, file_size_mb, temp_dir)
+            
+            # Log processing time
+            processing_time = time.time() - start_time
+            logger.info(f"Audio processing completed in {processing_time:.2f}s")
+            
+            return cache_transcription_result(cache_key, result)
+                
+        except Exception as e:
+            logger.error(f"Unexpected error in audio-to-text: {str(e)}")
+            return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+
+def requested_stream_format():
+    """'ndjson' or 'sse' when the client asked for a streamed response, otherwise None"""
+    requested = (request.args.get('stream') or request.form.get('stream') or '').lower()
+    if requested in ('ndjson', 'sse'):
+        return requested
+    if requested in ('1', 'true'):
+        return 'ndjson'
+    
+    accept = request.headers.get('Accept', '')
+    if 'text/event-stream' in accept:
+        return 'sse'
+    if 'application/x-ndjson' in accept:
+        return 'ndjson'
+    return None
+
+def encode_stream_event(event, payload, stream_format):
+    """One event of a streamed transcription, as an NDJSON line or a Server-Sent Event"""
+    if stream_format == 'sse':
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({'event': event, **payload}) + '\n'
+
+def stream_audio_transcription(file, language, stream_format):
+    """Transcribe an upload in the background and stream its progress (see transcription_event_response)"""
+    # The upload stream is closed once the view returns, so save the file now.
+    # The transcription thread owns this directory and removes it when done.
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(temp_dir, filename)
+        file_bytes, content_hash = save_upload(file, filepath)
+        file_size_mb = file_bytes / (1024 * 1024)
+        log_request('/api/audio-to-text (streamed)', filename, file_size_mb)
+        
+        cache_key = TranscriptCache.make_key(content_hash, language, 'audio-to-text')
+        cached = transcript_cache.get(cache_key)
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.error(f"Could not prepare streamed transcription: {str(e)}")
+        return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+    
+    events = queue.Queue()
+    cancel_event = threading.Event()
+    if cached is not None:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.info(f"Transcript cache hit for {filename}")
+        events.put(('result', {'status': 200, **cached, 'cached': True}))
+    else:
+        start_streamed_transcription(events, cancel_event, filepath, language, file_size_mb, temp_dir, cache_key)
+    return transcription_event_response(events, stream_format, cancel_event)
+
+def transcription_event_callbacks(events):
+    """progress_callback and chunk_callback that post streamed-transcription events to a queue"""
+    def on_progress(done, failed, total, total_known):
+        events.put(('progress', {
+            'chunks_done': done,
+            'chunks_failed': failed,
+            'chunks_total': total,
+            'chunks_total_known': total_known
+        }))
+    
+    def on_chunk(index, start, end, text):
+        events.put(('chunk', {'index': index, 'start': round(start, 2), 'end': round(end, 2), 'text': text}))
+    
+    return on_progress, on_chunk
+
+def start_streamed_transcription(events, cancel_event, filepath, language, file_size_mb, temp_dir, cache_key):
+    """Run transcribe_audio_file on a thread that posts its events and finally the 'result'. Removes temp_dir."""
+    on_progress, on_chunk = transcription_event_callbacks(events)
+    filename = os.path.basename(filepath)
+    
+    def transcribe():
+        start_time = time.time()
+        try:
+            with app.app_context():
+                response, status = transcribe_audio_file(
+                    filepath, language, file_size_mb, temp_dir,
+                    progress_callback=on_progress, cancel_event=cancel_event, chunk_callback=on_chunk
+                )
+                payload = response.get_json()
+            if status == 200:
+                transcript_cache.put(cache_key, payload)
+                payload = {**payload, 'cached': False}
+            logger.info(f"Streamed transcription of {filename} finished in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.error(f"Streamed transcription of {filename} failed: {str(e)}")
+            payload, status = {'error': f'Error processing audio: {str(e)}'}, 500
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        events.put(('result', {'status': status, **payload}))
+    
+    threading.Thread(target=transcribe, name='streamed-transcription', daemon=True).start()
+
+def transcription_event_response(events, stream_format, cancel_event):
+    """Stream the (event, payload) pairs posted to events, up to and including 'result'.
+    
+    Events: 'progress' (chunk counts), 'chunk' (index, start and end in
+    seconds, text - or null for a chunk that failed) as each chunk is
+    recognized, in completion order, then one 'result' with the same fields
+    as the regular response plus its HTTP status. A client that disconnects
+    cancels the transcription.
+    """
+    def generate():
+        while True:
+            event, payload = events.get()
+            yield encode_stream_event(event, payload, stream_format)
+            if event == 'result':
+                return
+    
+    if stream_format == 'sse':
+        response = Response(generate(), mimetype='text/event-stream')
+    else:
+        response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Keep reverse proxies from holding events back
+    # Client went away (possibly before the first event): stop recognizing
+    response.call_on_close(cancel_event.set)
+    return response
+
+def transcribe_audio_file(filepath, language, file_size_mb, temp_dir, progress_callback=None, cancel_event=None,
+                          chunk_callback=None):
+    """Pick a processing strategy for an uploaded audio file and run it.
+    
+    chunk_callback, if given, is called as (chunk_index, start_seconds,
+    end_seconds, text) as each chunk of a large file is recognized (text is
+    None for a chunk that failed). Small files are recognized in one piece.
+    """
+    with STAGE_SECONDS.time('transcribe'):
+        return _transcribe_audio_file(
+            filepath, language, file_size_mb, temp_dir, progress_callback, cancel_event, chunk_callback
+        )
+
+def _transcribe_audio_file(filepath, language, file_size_mb, temp_dir, progress_callback, cancel_event, chunk_callback):
+    # Choose by real duration: a small compressed file can hold an hour of speech
+    info = probe_audio(filepath)
+    if info is not None and info['duration'] is not None:
+        logger.info(
+            f"Probed {info['codec']}, {info['sample_rate']}Hz, {info['channels']} channel(s), {info['duration']:.1f}s"
+        )
+        chunked = info['duration'] > AUDIO_SINGLE_SHOT_MAX_SECONDS
+    else:
+        chunked = file_size_mb > AUDIO_UNKNOWN_DURATION_CHUNK_MB
+    speech_ready = is_speech_ready_wav(info)
+    
+    # Long recordings are decoded straight into the chunk pipeline when ffmpeg is available
+    if chunked and not speech_ready and get_ffmpeg_status()['available']:
+        logger.info("Using streaming chunked processing for long audio")
+        return process_large_audio_streaming(filepath, language, progress_callback, cancel_event, chunk_callback)
+    
+    if speech_ready:
+        # Already what the recognizer wants: no transcode, no loudnorm
+        logger.info("Input is 16kHz mono PCM WAV, skipping conversion")
+        wav_path = filepath
+    else:
+        # Generate WAV path in temp directory
+        filename = os.path.basename(filepath)
+        wav_path = os.path.join(temp_dir, f"converted_{os.path.splitext(filename)[0]}.wav")
+        
+        # Enhanced audio conversion
+        success = convert_audio_to_wav(filepath, wav_path, optimize_for_speech=True)
+        if not success:
+            return jsonify({'error': 'Could not convert audio format'}), 500
+    
+    if chunked:
+        logger.info("Using chunked processing for long audio")
+        return process_large_audio_enhanced(wav_path, language, temp_dir, progress_callback, cancel_event, chunk_callback)
+    
+    logger.info("Using standard processing")
+    if progress_callback:
+        progress_callback(0, 0, 1, True)
+    
+    result = process_speech_recognition(wav_path, language)
+    
+    if progress_callback:
+        progress_callback(1 if result[1] == 200 else 0, 0 if result[1] == 200 else 1, 1, True)
+    return result
+
+class TranscriptionJob:
+    """State of one background transcription job"""
+
+    def __init__(self, filename, language):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.language = language
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.chunks_done = 0
+        self.chunks_failed = 0
+        self.chunks_total = 0
+        self.chunks_total_known = False
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.temp_dir = None  # Holds the upload; removed once the job is finished
+        self.on_change = None  # Called after progress updates
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def update_progress(self, chunks_done, chunks_failed, chunks_total, total_known):
+        self.chunks_done = chunks_done
+        self.chunks_failed = chunks_failed
+        self.chunks_total = chunks_total
+        self.chunks_total_known = total_known
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def to_dict(self):
+        progress = None
+        if self.chunks_total_known and self.chunks_total:
+            progress = round((self.chunks_done + self.chunks_failed) / self.chunks_total * 100, 1)
+        
+        job = {
+            'job_id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'language': self.language,
+            'progress': {
+                'chunks_done': self.chunks_done,
+                'chunks_failed': self.chunks_failed,
+                'chunks_total': self.chunks_total,
+                'chunks_total_known': self.chunks_total_known,
+                'percent': progress
+            },
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'elapsed': f"{(self.finished_at or time.time()) - (self.started_at or self.created_at):.1f}s"
+        }
+        if self.result is not None:
+            job['result'] = self.result
+        if self.error is not None:
+            job['error'] = self.error
+        return job
+
+class JobManager:
+    """Runs transcription jobs on a background pool and keeps finished jobs for a while.
+    
+    With a state_dir, every job's snapshot is also written there so that other
+    server processes can answer polls for it and pass cancellations on.
+    """
+
+    def __init__(self, max_workers, retention_seconds, max_finished, state_dir=None):
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self.state_dir = state_dir
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._last_state_sweep = 0
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='transcription-job')
+        return self._executor
+
+    def submit(self, filepath, filename, language, file_size_mb, temp_dir, cache_key=None):
+        """Queue a transcription. The job owns temp_dir and removes it when done."""
+        job = TranscriptionJob(filename, language)
+        job.on_change = self._publish
+        job.temp_dir = temp_dir
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self._publish(job)
+            job.future = self._get_executor().submit(
+                self._run, job, filepath, file_size_mb, temp_dir, cache_key
+            )
+        return job
+
+    def add_completed(self, filename, language, result):
+        """Record a job that was answered without running (e.g. from the cache)"""
+        job = TranscriptionJob(filename, language)
+        job.status = 'completed'
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        job.update_progress(1, 0, 1, True)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self._publish(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id):
+        """The job as reported by the API, whichever server process runs it. None if unknown."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._read_remote(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns its snapshot, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                remote = self._read_remote(job_id)
+                if remote is not None and remote['status'] in ('queued', 'running'):
+                    # Owned by another process: leave a marker it picks up on its next update
+                    self._write_state_file(f"{job_id}.cancel", '')
+                return remote
+            if job.finished:
+                return job.to_dict()
+            
+            job.cancel_event.set()
+            self._cancel_queued(job)
+            return job.to_dict()
+
+    def _cancel_queued(self, job):
+        """Cancel a job that has not started; its worker will never run, so clean up here"""
+        if job.future is None or not job.future.cancel():
+            return False
+        job.status = 'cancelled'
+        job.finished_at = time.time()
+        self._publish(job)
+        if job.temp_dir:
+            shutil.rmtree(job.temp_dir, ignore_errors=True)
+        return True
+
+    def drain(self, timeout):
+        """Wait for queued and running jobs to finish. Returns how many are still unfinished.
+        
+        Jobs still queued when the timeout runs out are cancelled and their uploads removed.
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.future is not None and not job.finished]
+        if not jobs:
+            return 0
+        _, not_done = wait([job.future for job in jobs], timeout=timeout)
+        
+        with self._lock:
+            for job in jobs:
+                if job.future in not_done and self._cancel_queued(job):
+                    not_done.discard(job.future)
+        return len(not_done)
+
+    def _state_path(self, name):
+        return os.path.join(self.state_dir, name)
+
+    def _write_state_file(self, name, content):
+        """Atomically write a file in the shared state directory"""
+        path = self._state_path(name)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write job state {name}: {str(e)}")
+
+    def _publish(self, job):
+        """Share the job's current snapshot with the other server processes"""
+        if not self.state_dir:
+            return
+        
+        self._write_state_file(f"{job.id}.json", json.dumps(job.to_dict()))
+        self._check_remote_cancel(job)
+
+    def _check_remote_cancel(self, job):
+        """Set the job's cancel event if a cancellation arrived through another process"""
+        if self.state_dir and not job.finished and os.path.exists(self._state_path(f"{job.id}.cancel")):
+            job.cancel_event.set()
+
+    def _read_remote(self, job_id):
+        """Snapshot published by another process, or None"""
+        if not self.state_dir or not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return None
+        try:
+            with open(self._state_path(f"{job_id}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_state(self, job_id):
+        if not self.state_dir:
+            return
+        for name in (f"{job_id}.json", f"{job_id}.cancel"):
+            try:
+                os.remove(self._state_path(name))
+            except OSError:
+                pass
+
+    def _run(self, job, filepath, file_size_mb, temp_dir, cache_key):
+        try:
+            # A DELETE may have reached another process while this job was queued
+            self._check_remote_cancel(job)
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+                return
+            
+            job.status = 'running'
+            job.started_at = time.time()
+            self._publish(job)
+            logger.info(f"Job {job.id} started: {job.filename} ({file_size_mb:.2f}MB) in {job.language}")
+            
+            with app.app_context():
+                response, status = transcribe_audio_file(
+                    filepath, job.language, file_size_mb, temp_dir,
+                    progress_callback=job.update_progress,
+                    cancel_event=job.cancel_event
+                )
+                payload = response.get_json()
+            
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+            elif status == 200:
+                if cache_key:
+                    transcript_cache.put(cache_key, payload)
+                job.result = {**payload, 'cached': False}
+                job.status = 'completed'
+            else:
+                job.error = payload.get('error', 'Transcription failed')
+                job.status = 'failed'
+                
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.error = f'Error processing audio: {str(e)}'
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            self._publish(job)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.info(f"Job {job.id} {job.status} in {job.finished_at - job.created_at:.2f}s")
+
+    def _prune(self):
+        """Drop expired finished jobs and keep at most max_finished of them"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        
+        expired = [job for job in finished if now - job.finished_at > self.retention_seconds]
+        overflow = finished[:max(0, len(finished) - len(expired) - self.max_finished)]
+        
+        for job in expired + overflow:
+            self._jobs.pop(job.id, None)
+            self._remove_state(job.id)
+        
+        # Snapshots left behind by processes that have since exited
+        if self.state_dir and now - self._last_state_sweep > 60:
+            self._last_state_sweep = now
+            try:
+                for entry in os.scandir(self.state_dir):
+                    if now - entry.stat().st_mtime > self.retention_seconds:
+                        os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+job_manager = JobManager(JOB_WORKERS, JOB_RETENTION_SECONDS, JOB_MAX_FINISHED, JOB_STATE_DIR)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Start a background transcription and return its job id right away"""
+    if 'audio' not in request.files:
+        return jsonify({'error': 'No audio file provided'}), 400
+    
+    file = request.files['audio']
+    if file.filename == '':
+        return jsonify({'error': 'No audio file selected'}), 400
+    
+    # Get language preference
+    language = request.form.get('language', 'en-US')
+    if language not in SUPPORTED_LANGUAGES:
+        language = 'en-US'
+    
+    # The job owns this directory and removes it when it finishes
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(temp_dir, filename)
+        file_bytes, content_hash = save_upload(file, filepath)
+        
+        file_size_mb = file_bytes / (1024 * 1024)
+        log_request('/api/jobs', filename, file_size_mb)
+        
+        cache_key = TranscriptCache.make_key(content_hash, language, 'audio-to-text')
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            job = job_manager.add_completed(filename, language, {**cached, 'cached': True})
+        else:
+            job = job_manager.submit(filepath, filename, language, file_size_mb, temp_dir, cache_key)
+        
+        response = job.to_dict()
+        response['status_url'] = f"/api/jobs/{job.id}"
+        return jsonify(response), 202
+        
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.error(f"Could not create transcription job: {str(e)}")
+        return jsonify({'error': f'Error creating job: {str(e)}'}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report progress and, once finished, the result of a transcription job"""
+    job = job_manager.snapshot(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running transcription job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job), 200
+
+class UploadOffsetError(ValueError):
+    """A part was sent for an offset other than the upload's current end"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+class EarlyDecode:
+    """Decodes and recognizes a resumable upload while its later parts are still arriving.
+    
+    ffmpeg is fed from the growing spool file, so speech chunks reach the
+    recognition pool during the upload and finalizing only waits for the tail.
+    """
+
+    def __init__(self, upload, data_path, on_done=None):
+        self.upload_id = upload['id']
+        self.size = upload['size']
+        self.language = upload['language']
+        self.data_path = data_path
+        self.on_done = on_done
+        self.appended = threading.Event()  # Set whenever a part lands in this process
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.result = None  # (outcome, audio_duration, speech_seconds) once the decode succeeds
+        self.events = queue.Queue()  # Progress and chunk events, replayed by a streamed finalize
+        self._thread = threading.Thread(target=self._run, name=f'early-decode-{self.upload_id[:8]}', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.appended.set()
+
+    def _read_parts(self):
+        """Yield the spool's bytes as they land, until the declared size has been read"""
+        position = 0
+        last_part_at = time.time()
+        with open(self.data_path, 'rb') as f:
+            while position < self.size:
+                if self.cancel_event.is_set():
+                    raise RuntimeError('Upload was abandoned')
+                
+                data = f.read(1024 * 1024)
+                if data:
+                    position += len(data)
+                    last_part_at = time.time()
+                    yield data
+                    continue
+                
+                if time.time() - last_part_at > RESUMABLE_EARLY_DECODE_STALL_SECONDS:
+                    raise TimeoutError('No new upload parts arrived')
+                if not os.path.exists(self.data_path):
+                    raise RuntimeError('Upload was finalized or removed by another process')
+                # Parts taken by another server process only show up on disk: poll as well
+                self.appended.wait(0.25)
+                self.appended.clear()
+
+    def _run(self):
+        started = time.time()
+        try:
+            decoder = StreamingDecoder(input_chunks=self._read_parts())
+            chunk_bounds = []
+            
+            def decoded_chunks():
+                for start, end, pcm in decoder:
+                    chunk_bounds.append((start, end))
+                    yield pcm, decoder.sample_rate
+            
+            on_progress, on_chunk = transcription_event_callbacks(self.events)
+            outcome = recognize_chunks(
+                decoded_chunks(), self.language, on_progress, self.cancel_event,
+                chunk_callback=with_chunk_offsets(on_chunk, chunk_bounds, decoder.sample_rate)
+            )
+            if not self.cancel_event.is_set():
+                self.result = (
+                    outcome,
+                    decoder.samples_decoded / decoder.sample_rate,
+                    decoder.speech_samples / decoder.sample_rate
+                )
+                logger.info(f"Early decode of upload {self.upload_id} finished in {time.time() - started:.2f}s")
+        except Exception as e:
+            logger.warning(f"Early decode of upload {self.upload_id} stopped: {str(e)}")
+        finally:
+            self.done.set()
+            if self.on_done:
+                self.on_done(self)
+
+class ResumableUploadStore:
+    """Uploads that arrive in parts at increasing offsets, spooled to a directory.
+    
+    Each upload is a data file plus a JSON description. The data file's size is
+    the received offset, so any server process sharing the directory can take
+    the next part, and a client whose connection dropped asks for the offset
+    and carries on from there. A part is checked against the offset and written
+    under an exclusive lock on the data file, so a retried part that reaches
+    two processes is appended once. Uploads in a streamable format are decoded
+    and recognized early, by the process that took the first part.
+    """
+
+    def __init__(self, directory, ttl_seconds, max_early_decodes):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._early_decodes = {}
+        self._early_decode_slots = threading.BoundedSemaphore(max_early_decodes)
+        self._last_sweep = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def data_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def create(self, filename, size, language):
+        self._sweep()
+        upload = {
+            'id': uuid.uuid4().hex,
+            'filename': filename,
+            'size': size,
+            'language': language,
+            'created_at': time.time()
+        }
+        open(self.data_path(upload['id']), 'wb').close()
+        temp_path = f"{self._meta_path(upload['id'])}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(upload, f)
+        os.replace(temp_path, self._meta_path(upload['id']))
+        return upload
+
+    def get(self, upload_id):
+        """The upload's description plus its current offset, or None if unknown"""
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+            return None
+        try:
+            with open(self._meta_path(upload_id)) as f:
+                upload = json.load(f)
+            upload['offset'] = os.path.getsize(self.data_path(upload_id))
+        except (OSError, ValueError):
+            return None
+        return upload
+
+    def append(self, upload, offset, data):
+        """Write a verified part at offset and return the new offset"""
+        path = self.data_path(upload['id'])
+        with self._lock, open(path, 'r+b') as f:
+            # Held until the file is closed, after the write is flushed
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetError(current)
+            f.seek(current)
+            f.write(data)
+        
+        new_offset = offset + len(data)
+        if offset == 0:
+            self._start_early_decode(upload)
+        with self._lock:
+            early = self._early_decodes.get(upload['id'])
+        if early is not None:
+            early.appended.set()
+        self._sweep()
+        return new_offset
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    def claim(self, upload_id, dest_path):
+        """Move a complete upload's data to dest_path and forget the upload. False if it is already gone."""
+        try:
+            os.replace(self.data_path(upload_id), dest_path)
+        except FileNotFoundError:
+            return False
+        self._remove_files(upload_id, data=False)
+        
+        # An early decode finalize did not take over is now working on a file nobody will ask for
+        early = self.take_early_decode(upload_id)
+        if early is not None:
+            early.cancel()
+        self._sweep()
+        return True
 
-def log_request(endpoint, filename, file_size, duration=None):
-    """Log API requests for monitoring"""
-    timestamp = datetime.now().isoformat()
-    logger.info(f"[{timestamp}] {endpoint} - File: {filename}, Size: {file_size}MB" + 
-                (f", Duration: {duration}s" if duration else ""))
+    def remove(self, upload_id):
+        """Abort an upload and drop its data"""
+        early = self.take_early_decode(upload_id)
+        if early is not None:
+            early.cancel()
+        self._remove_files(upload_id)
 
-@app.route('/')
-def index():
-    return render_template('index.html')
+    def _remove_files(self, upload_id, data=True):
+        paths = [self._meta_path(upload_id)] + ([self.data_path(upload_id)] if data else [])
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-@app.route('/voice-to-text')
-def voice_to_text_page():
-    return render_template('voice_to_text.html')
+    def _start_early_decode(self, upload):
+        extension = upload['filename'].rsplit('.', 1)[-1].lower()
+        if (extension not in RESUMABLE_EARLY_DECODE_FORMATS
+                or upload['size'] <= RESUMABLE_EARLY_DECODE_MIN_MB * 1024 * 1024
+                or not get_ffmpeg_status()['available']):
+            return
+        if not self._early_decode_slots.acquire(blocking=False):
+            logger.info(f"Upload {upload['id']} will be decoded at finalize: early decode slots are busy")
+            return
+        
+        early = EarlyDecode(upload, self.data_path(upload['id']), on_done=self._early_decode_done)
+        with self._lock:
+            self._early_decodes[upload['id']] = early
+        early.start()
+        logger.info(f"Decoding upload {upload['id']} ({upload['filename']}) while it arrives")
 
-@app.route('/audio-to-text')
-def audio_to_text_page():
-    return render_template('audio_to_text.html')
+    def _early_decode_done(self, early):
+        self._early_decode_slots.release()
+        if early.result is None:
+            with self._lock:
+                if self._early_decodes.get(early.upload_id) is early:
+                    del self._early_decodes[early.upload_id]
 
-@app.route('/image-to-text')
-def image_to_text_page():
-    return render_template('image_to_text.html')
+    def take_early_decode(self, upload_id):
+        """Hand over the upload's early decode, if this process runs one"""
+        with self._lock:
+            return self._early_decodes.pop(upload_id, None)
 
-@app.route('/api/voice-to-text', methods=['POST'])
-def voice_to_text():
-    """Enhanced voice-to-text API with multi-language support and better error handling"""
-    start_time = time.time()
-    
-    if 'audio' not in request.files:
-        return jsonify({'error': 'No audio file provided'}), 400
+    def _drop_orphaned_early_decodes(self):
+        """Cancel and forget early decodes whose data file is gone (finalized or removed by another process)"""
+        with self._lock:
+            orphaned = [
+                early for upload_id, early in self._early_decodes.items()
+                if not os.path.exists(self.data_path(upload_id))
+            ]
+            for early in orphaned:
+                del self._early_decodes[early.upload_id]
+        for early in orphaned:
+            logger.info(f"Dropping early decode of upload {early.upload_id}: its data is gone")
+            early.cancel()
+
+    def _sweep(self):
+        """Drop orphaned early decodes, and remove uploads that have not received a part for ttl_seconds"""
+        self._drop_orphaned_early_decodes()
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.part') and now - entry.stat().st_mtime > self.ttl_seconds:
+                    logger.info(f"Removing abandoned upload {entry.name[:-5]}")
+                    self.remove(entry.name[:-5])
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {'early_decodes': len(self._early_decodes)}
+
+resumable_uploads = ResumableUploadStore(RESUMABLE_UPLOAD_DIR, RESUMABLE_UPLOAD_TTL_SECONDS, RESUMABLE_EARLY_DECODE_MAX)
+
+def describe_upload(upload):
+    """API view of a resumable upload"""
+    return {
+        'upload_id': upload['id'],
+        'filename': upload['filename'],
+        'size': upload['size'],
+        'offset': upload['offset'],
+        'complete': upload['offset'] == upload['size'],
+        'max_part_bytes': RESUMABLE_MAX_PART_MB * 1024 * 1024,
+        'upload_url': f"/api/uploads/{upload['id']}",
+        'finalize_url': f"/api/uploads/{upload['id']}/finalize"
+    }
+
+def upload_offset_response(payload, status, upload):
+    response = jsonify(payload)
+    response.headers['Upload-Offset'] = str(upload['offset'])
+    response.headers['Upload-Length'] = str(upload['size'])
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable upload: the file is then sent in parts with PATCH"""
+    params = request.get_json(silent=True) or request.form
+    filename = secure_filename(params.get('filename') or '')
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Invalid or unsupported audio file name'}), 400
     
-    file = request.files['audio']
-    if file.filename == '':
-        return jsonify({'error': 'No audio file selected'}), 400
+    try:
+        size = int(params.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Upload size is required'}), 400
+    if size <= 0:
+        return jsonify({'error': 'Upload size must be positive'}), 400
+    if size > RESUMABLE_MAX_UPLOAD_MB * 1024 * 1024:
+        return jsonify({'error': f'Audio file too large. Maximum size is {RESUMABLE_MAX_UPLOAD_MB}MB.'}), 413
     
-    # Get language preference
-    language = request.form.get('language', 'en-US')
+    language = params.get('language', 'en-US')
     if language not in SUPPORTED_LANGUAGES:
-        language = 'en-US'  # Fallback to English
+        language = 'en-US'
     
-    # Get file size for logging
-    file_size = len(file.read()) / (1024 * 1024)  # Convert to MB
-    file.seek(0)  # Reset file pointer
+    try:
+        upload = resumable_uploads.create(filename, size, language)
+    except OSError as e:
+        logger.error(f"Could not create resumable upload: {str(e)}")
+        return jsonify({'error': 'Could not start the upload'}), 500
     
-    log_request('/api/voice-to-text', file.filename, file_size)
+    upload['offset'] = 0
+    logger.info(f"Resumable upload {upload['id']} created: {filename} ({size / (1024 * 1024):.2f}MB) in {language}")
+    response, status = upload_offset_response(describe_upload(upload), 201, upload)
+    response.headers['Location'] = f"/api/uploads/{upload['id']}"
+    return response, status
+
+@app.route('/api/uploads/<upload_id>', methods=['PATCH'])
+def upload_part(upload_id):
+    """Append one part at the offset given in Upload-Offset, verified against Upload-Checksum"""
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found or expired'}), 404
     
-    # Validate file size
-    if file_size > 25:  # 25MB limit for voice recordings
-        return jsonify({'error': 'Audio file too large. Maximum size is 25MB.'}), 413
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+    if offset != upload['offset']:
+        return upload_offset_response({'error': 'Offset does not match the upload', 'offset': upload['offset']}, 409, upload)
     
-    # Create a temporary directory to store files
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Save the file to temp directory
-            temp_file = os.path.join(temp_dir, secure_filename(file.filename))
-            file.save(temp_file)
-            
-            # Validate audio file
-            if os.path.getsize(temp_file) < 1000:  # Less than 1KB
-                return jsonify({'error': 'Audio file is too small or corrupted'}), 400
-            
-            logger.info(f"Processing voice file: {file.filename} ({file_size:.2f}MB) in {language}")
-            
-            # Generate a safe wav filename
-            wav_file = os.path.join(temp_dir, "converted_audio.wav")
-            
-            # Enhanced audio conversion with quality optimization
-            success = convert_audio_to_wav(temp_file, wav_file, optimize_for_speech=True)
-            if not success:
-                return jsonify({'error': 'Could not convert audio format'}), 500
-            
-            # Process with enhanced speech recognition
-            result = process_speech_recognition(wav_file, language, file_size)
-            
-            # Log processing time
-            processing_time = time.time() - start_time
-            logger.info(f"Voice processing completed in {processing_time:.2f}s")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Unexpected error in voice-to-text: {str(e)}")
-            return jsonify({'error': 'An unexpected error occurred during processing'}), 500
+    # "sha256 <base64 digest>" of this part, so a part damaged in transit is never appended
+    algorithm, _, expected = request.headers.get('Upload-Checksum', '').partition(' ')
+    if algorithm.lower() != 'sha256' or not expected:
+        return jsonify({'error': 'Upload-Checksum header with a sha256 digest is required'}), 400
+    
+    data = request.get_data(cache=False)
+    if len(data) > RESUMABLE_MAX_PART_MB * 1024 * 1024:
+        return jsonify({'error': f'Upload part too large. Maximum size is {RESUMABLE_MAX_PART_MB}MB.'}), 413
+    if offset + len(data) > upload['size']:
+        return jsonify({'error': 'Part extends past the declared upload size'}), 413
+    if base64.b64encode(hashlib.sha256(data).digest()).decode() != expected.strip():
+        return upload_offset_response({'error': 'Part checksum mismatch', 'offset': upload['offset']}, 422, upload)
+    
+    try:
+        upload['offset'] = resumable_uploads.append(upload, offset, data)
+    except UploadOffsetError as e:
+        upload['offset'] = e.offset
+        return upload_offset_response({'error': 'Offset does not match the upload', 'offset': e.offset}, 409, upload)
+    except OSError as e:
+        logger.error(f"Could not store part of upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'Could not store the upload part'}), 500
+    
+    return upload_offset_response(describe_upload(upload), 200, upload)
 
-@app.route('/api/audio-to-text', methods=['POST'])
-def audio_to_text():
-    """Enhanced audio-to-text API with improved large file handling"""
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Report how much of an upload has arrived (also answers HEAD, for resuming)"""
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found or expired'}), 404
+    return upload_offset_response(describe_upload(upload), 200, upload)
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abort a resumable upload"""
+    if resumable_uploads.get(upload_id) is None:
+        return jsonify({'error': 'Upload not found or expired'}), 404
+    resumable_uploads.remove(upload_id)
+    return jsonify({'upload_id': upload_id, 'status': 'deleted'}), 200
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Transcribe a completely received upload (same responses, streamed or not, as /api/audio-to-text)"""
     start_time = time.time()
+    upload = resumable_uploads.get(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found or expired'}), 404
+    if upload['offset'] != upload['size']:
+        return upload_offset_response({'error': 'Upload is incomplete', 'offset': upload['offset']}, 409, upload)
     
-    if 'audio' not in request.files:
-        return jsonify({'error': 'No audio file provided'}), 400
+    language = upload['language']
+    file_size_mb = upload['size'] / (1024 * 1024)
     
-    file = request.files['audio']
-    if file.filename == '':
-        return jsonify({'error': 'No audio file selected'}), 400
+    # Every byte is in, so an early decode only has the tail left to finish
+    early = resumable_uploads.take_early_decode(upload_id)
+    if early is not None and not early.done.wait(RESUMABLE_EARLY_DECODE_FINALIZE_WAIT_SECONDS):
+        logger.warning(f"Early decode of upload {upload_id} is still running, decoding the file again")
+        early.cancel()
+        early = None
     
-    # Get language preference  
+    stream_format = requested_stream_format()
+    temp_dir = tempfile.mkdtemp()  # Handed to the transcription thread when streaming
+    try:
+        filepath = os.path.join(temp_dir, upload['filename'])
+        if not resumable_uploads.claim(upload_id, filepath):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return jsonify({'error': 'Upload not found or already finalized'}), 404
+        log_request('/api/uploads/finalize', upload['filename'], file_size_mb)
+        
+        # Optional whole-file check on top of the per-part checksums
+        content_hash = hash_file(filepath)
+        expected_hash = (request.get_json(silent=True) or {}).get('sha256')
+        if expected_hash and expected_hash.lower() != content_hash:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return jsonify({'error': 'File checksum mismatch'}), 422
+        
+        cache_key = TranscriptCache.make_key(content_hash, language, 'audio-to-text')
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.info(f"Transcript cache hit for {upload['filename']}")
+            result = jsonify({**cached, 'cached': True}), 200
+        elif early is not None and early.result is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.info(f"Upload {upload_id} was decoded while it arrived")
+            outcome, audio_duration, speech_seconds = early.result
+            result = cache_transcription_result(
+                cache_key, build_chunked_response(outcome, language, audio_duration, speech_seconds)
+            )
+        elif stream_format:
+            events = queue.Queue()
+            cancel_event = threading.Event()
+            start_streamed_transcription(events, cancel_event, filepath, language, file_size_mb, temp_dir, cache_key)
+            return transcription_event_response(events, stream_format, cancel_event)
+        else:
+            try:
+                result = cache_transcription_result(
+                    cache_key, transcribe_audio_file(filepath, language, file_size_mb, temp_dir)
+                )
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Upload {upload_id} finalized in {processing_time:.2f}s")
+        if not stream_format:
+            return result
+        
+        # Already transcribed: replay the early decode's chunk events, then the result
+        events = early.events if early is not None else queue.Queue()
+        response, status = result
+        events.put(('result', {'status': status, **response.get_json()}))
+        return transcription_event_response(events, stream_format, threading.Event())
+        
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.error(f"Unexpected error finalizing upload {upload_id}: {str(e)}")
+        return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+
+_audio_batch_executor = None
+_audio_batch_executor_lock = threading.Lock()
+
+def get_audio_batch_executor():
+    """Shared pool that decodes batch files (their chunks go to the recognition pool)"""
+    global _audio_batch_executor
+    with _audio_batch_executor_lock:
+        if _audio_batch_executor is None:
+            _audio_batch_executor = ThreadPoolExecutor(
+                max_workers=AUDIO_BATCH_CONCURRENT_FILES,
+                thread_name_prefix='audio-batch'
+            )
+        return _audio_batch_executor
+
+def transcribe_batch_file(filepath, language, file_size_mb, temp_dir, cancel_event):
+    """Transcribe one batch file. Returns (payload, status, chunk progress)."""
+    progress = {'done': 0, 'failed': 0, 'total': 0}
+    
+    def track_progress(chunks_done, chunks_failed, chunks_total, total_known):
+        progress.update(done=chunks_done, failed=chunks_failed, total=chunks_total)
+    
+    if cancel_event.is_set():
+        return {'error': 'Transcription was cancelled'}, 409, progress
+    
+    with app.app_context():
+        response, status = transcribe_audio_file(
+            filepath, language, file_size_mb, temp_dir,
+            progress_callback=track_progress,
+            cancel_event=cancel_event
+        )
+        return response.get_json(), status, progress
+
+@app.route('/api/audio-to-text/batch', methods=['POST'])
+def audio_to_text_batch():
+    """Transcribe many audio files on the shared pools, streaming one NDJSON line per file"""
+    files = [file for file in request.files.getlist('audio') if file.filename]
+    if not files:
+        return jsonify({'error': 'No audio files provided'}), 400
+    if len(files) > AUDIO_BATCH_MAX_FILES:
+        return jsonify({'error': f'Too many files. Maximum is {AUDIO_BATCH_MAX_FILES} per batch.'}), 413
+    
+    # Get language preference
     language = request.form.get('language', 'en-US')
     if language not in SUPPORTED_LANGUAGES:
         language = 'en-US'
     
-    # Create temp directory to avoid file permission issues
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Save the uploaded file to temp directory
+    # Upload streams are closed once the view returns, so save everything now.
+    # The response generator owns this directory and removes it when done.
+    temp_root = tempfile.mkdtemp()
+    try:
+        entries = []
+        for index, file in enumerate(files, start=1):
             filename = secure_filename(file.filename)
-            filepath = os.path.join(temp_dir, filename)
-            file.save(filepath)
-            
-            # Get file info
-            file_size_mb = os.path.getsize(filepath) / (1024 * 1024)
-            log_request('/api/audio-to-text', filename, file_size_mb)
-            
-            # Validate file size (50MB limit)
-            if file_size_mb > 50:
-                return jsonify({'error': 'Audio file too large. Maximum size is 50MB.'}), 413
+            file_dir = os.path.join(temp_root, str(index))  # Same name twice must not collide
+            os.makedirs(file_dir)
+            filepath = os.path.join(file_dir, filename)
+            file_bytes, content_hash = save_upload(file, filepath)
             
-            logger.info(f"Processing audio file: {filename} ({file_size_mb:.2f}MB) in {language}")
+            file_size_mb = file_bytes / (1024 * 1024)
+            cache_key = TranscriptCache.make_key(content_hash, language, 'audio-to-text')
+            entries.append({
+                'index': index,
+                'filename': filename,
+                'filepath': filepath,
+                'file_dir': file_dir,
+                'file_size_mb': file_size_mb,
+                'cache_key': cache_key
+            })
+        
+        log_request('/api/audio-to-text/batch', ', '.join(entry['filename'] for entry in entries),
+                    sum(entry['file_size_mb'] for entry in entries))
+    except Exception as e:
+        shutil.rmtree(temp_root, ignore_errors=True)
+        logger.error(f"Could not prepare audio batch: {str(e)}")
+        return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+    
+    def generate():
+        start_time = time.time()
+        cancel_event = threading.Event()
+        futures = {}
+        summary = {
+            'files': len(entries),
+            'succeeded': 0,
+            'failed': 0,
+            'cached': 0,
+            'total_duration_seconds': 0.0,
+            'total_chunks': 0,
+            'failed_chunks': 0
+        }
+        
+        def line(entry, payload, status, progress):
+            if status == 200:
+                summary['succeeded'] += 1
+                try:
+                    summary['total_duration_seconds'] += float(payload.get('duration', '0s').rstrip('s'))
+                except ValueError:
+                    pass
+            else:
+                summary['failed'] += 1
+            summary['total_chunks'] += progress['total']
+            summary['failed_chunks'] += progress['failed']
             
-            # Generate WAV path in temp directory
-            wav_path = os.path.join(temp_dir, f"converted_{os.path.splitext(filename)[0]}.wav")
+            return json.dumps({
+                'file': entry['index'],
+                'filename': entry['filename'],
+                'status': status,
+                **payload
+            }) + '\n'
+        
+        try:
+            executor = get_audio_batch_executor()
             
-            # Enhanced audio conversion
-            success = convert_audio_to_wav(filepath, wav_path, optimize_for_speech=True)
-            if not success:
-                return jsonify({'error': 'Could not convert audio format'}), 500
+            # Smallest files first so quick results stream back early
+            for entry in sorted(entries, key=lambda entry: entry['file_size_mb']):
+                cached = transcript_cache.get(entry['cache_key'])
+                if cached is not None:
+                    summary['cached'] += 1
+                    yield line(entry, {**cached, 'cached': True}, 200, {'done': 1, 'failed': 0, 'total': 1})
+                    continue
+                
+                future = executor.submit(
+                    transcribe_batch_file, entry['filepath'], language,
+                    entry['file_size_mb'], entry['file_dir'], cancel_event
+                )
+                futures[future] = entry
             
-            # Determine processing strategy based on file size
-            if file_size_mb > 10:
-                logger.info("Using chunked processing for large file")
-                result = process_large_audio_enhanced(wav_path, language, temp_dir)
-            else:
-                logger.info("Using standard processing")
-                result = process_speech_recognition(wav_path, language, file_size_mb)
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    payload, status, progress = future.result()
+                except Exception as e:
+                    logger.error(f"Batch transcription of {entry['filename']} failed: {str(e)}")
+                    payload, status, progress = {'error': f'Error processing audio: {str(e)}'}, 500, {'done': 0, 'failed': 0, 'total': 0}
+                
+                if status == 200:
+                    transcript_cache.put(entry['cache_key'], payload)
+                    payload = {**payload, 'cached': False}
+                yield line(entry, payload, status, progress)
             
-            # Log processing time
-            processing_time = time.time() - start_time
-            logger.info(f"Audio processing completed in {processing_time:.2f}s")
+            summary['total_duration_seconds'] = round(summary['total_duration_seconds'], 1)
+            summary['processing_time'] = round(time.time() - start_time, 2)
+            logger.info(f"Audio batch finished: {summary['succeeded']}/{summary['files']} files in {summary['processing_time']:.2f}s")
+            yield json.dumps({'summary': summary}) + '\n'
             
-            return result
-                
-        except Exception as e:
-            logger.error(f"Unexpected error in audio-to-text: {str(e)}")
-            return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+        finally:
+            # Client went away or we are done: stop leftover work and clean up
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    try:
+                        future.result()
+                    except Exception:
+                        pass
+            shutil.rmtree(temp_root, ignore_errors=True)
+    
+    response = Response(generate(), mimetype='application/x-ndjson')
+    # Also covers a client that disconnects before the first line is produced
+    response.call_on_close(lambda: shutil.rmtree(temp_root, ignore_errors=True))
+    return response
+
+def probe_audio(path):
+    """Codec, sample rate, channel count and duration from the file header, without decoding.
+    
+    WAV headers are read directly; other formats are asked of ffprobe, or of
+    ffmpeg's input banner when ffprobe is missing. Returns a dict (duration is
+    None when the container does not record one) or None if nothing could
+    read the file.
+    """
+    with STAGE_SECONDS.time('probe'):
+        return _probe_wav_header(path) or _probe_with_ffprobe(path) or _probe_with_ffmpeg(path)
+
+def _probe_wav_header(path):
+    try:
+        with wave.open(path, 'rb') as wav:
+            channels, sample_width, sample_rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            # Streamed WAVs often carry a placeholder data size: trust the file size over it
+            frames = min(wav.getnframes(), os.path.getsize(path) // (channels * sample_width))
+    except (wave.Error, EOFError, OSError):
+        return None  # Not a WAV, or a WAV the wave module cannot read (float, extensible)
+    
+    return {
+        'format': 'wav',
+        'codec': 'pcm_u8' if sample_width == 1 else f'pcm_s{sample_width * 8}le',
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'duration': frames / sample_rate if sample_rate else None
+    }
+
+def _probe_with_ffprobe(path):
+    if not get_ffprobe_status()['available']:
+        return None
+    
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name,sample_rate,channels:format=format_name,duration',
+        '-of', 'json', path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=AUDIO_PROBE_TIMEOUT_SECONDS, check=True)
+        probed = json.loads(result.stdout)
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        logger.warning(f"ffprobe could not read {os.path.basename(path)}: {str(e)}")
+        return None
+    
+    if not probed.get('streams'):
+        return None
+    stream, container = probed['streams'][0], probed.get('format', {})
+    duration = container.get('duration')
+    return {
+        'format': container.get('format_name'),
+        'codec': stream.get('codec_name'),
+        'sample_rate': int(stream['sample_rate']) if stream.get('sample_rate') else None,
+        'channels': stream.get('channels'),
+        'duration': float(duration) if duration not in (None, 'N/A') else None
+    }
+
+def _probe_with_ffmpeg(path):
+    """Parse the input banner ffmpeg prints before complaining that no output was given"""
+    if not get_ffmpeg_status()['available']:
+        return None
+    
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-nostdin', '-i', path],
+            capture_output=True, text=True, timeout=AUDIO_PROBE_TIMEOUT_SECONDS
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.warning(f"ffmpeg could not read {os.path.basename(path)}: {str(e)}")
+        return None
+    
+    stream = re.search(r'Stream #\S+.*?: Audio: (\w+)[^,]*, (\d+) Hz, ([^,]+)', result.stderr)
+    if stream is None:
+        return None
+    container = re.search(r"Input #0, ([^,]+(?:,[^,\s]+)*), from", result.stderr)
+    duration = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr)
+    layout = stream.group(3).strip()
+    channels = {'mono': 1, 'stereo': 2}.get(layout)
+    if channels is None:
+        count = re.match(r'(\d+) channels', layout)
+        channels = int(count.group(1)) if count else None
+    return {
+        'format': container.group(1) if container else None,
+        'codec': stream.group(1),
+        'sample_rate': int(stream.group(2)),
+        'channels': channels,
+        'duration': int(duration.group(1)) * 3600 + int(duration.group(2)) * 60 + float(duration.group(3))
+                    if duration else None
+    }
+
+def is_speech_ready_wav(info):
+    """Whether a probed file is already the 16kHz mono 16-bit PCM WAV the recognizer takes"""
+    return (
+        info is not None and info['format'] == 'wav' and info['codec'] == 'pcm_s16le'
+        and info['sample_rate'] == STREAM_SAMPLE_RATE and info['channels'] == 1
+    )
 
 def convert_audio_to_wav(input_path, output_path, optimize_for_speech=False):
     """Enhanced audio conversion with speech optimization"""
+    with STAGE_SECONDS.time('convert'):
+        return _convert_audio_to_wav(input_path, output_path, optimize_for_speech)
+
+def _convert_audio_to_wav(input_path, output_path, optimize_for_speech):
     try:
         logger.info(f"Converting {input_path} to WAV format...")
         
         # Try ffmpeg first for better performance and format support
         try:
-            import subprocess
-            
             # Base ffmpeg command
             cmd = [
                 'ffmpeg', '-y',  # Overwrite output file
@@ -218,7 +2993,7 @@ def convert_audio_to_wav(input_path, output_path, optimize_for_speech=False):
                 cmd.extend([
                     '-ar', '16000',  # 16kHz sample rate (optimal for speech)
                     '-ac', '1',      # Mono audio
-                    '-af', 'highpass=f=80,lowpass=f=8000,loudnorm=I=-16:LRA=11:TP=-1.5'  # Audio filters for speech
+                    '-af', SPEECH_FILTER_CHAIN  # Audio filters for speech
                 ])
             else:
                 cmd.extend([
@@ -246,26 +3021,29 @@ def convert_audio_to_wav(input_path, output_path, optimize_for_speech=False):
                 
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
             logger.warning(f"FFmpeg failed: {str(e)}, falling back to pydub")
+            CONVERSION_FALLBACKS.inc()
             
-            # Fallback to pydub
-            audio = AudioSegment.from_file(input_path)
+            # Fallback: pydub decodes, the rest runs on the samples with audio_dsp
+            samples, sample_rate = load_pcm_samples(input_path)
             
             # Apply speech optimization if requested
             if optimize_for_speech:
-                # Convert to mono and set sample rate for speech recognition
-                audio = audio.set_channels(1).set_frame_rate(16000)
+                # Resample to 16kHz for speech recognition
+                samples = audio_dsp.resample(samples, sample_rate, 16000)
+                sample_rate = 16000
                 
                 # Normalize audio levels
-                audio = normalize_audio_levels(audio)
+                samples = normalize_audio_levels(samples)
                 
                 # Apply basic noise reduction (simple high-pass filter)
-                audio = audio.high_pass_filter(80)  # Remove low frequency noise
+                samples = audio_dsp.high_pass(samples, sample_rate, 80)  # Remove low frequency noise
                 
             else:
-                audio = audio.set_channels(1).set_frame_rate(44100)
+                samples = audio_dsp.resample(samples, sample_rate, 44100)
+                sample_rate = 44100
             
             # Export as WAV
-            audio.export(output_path, format="wav")
+            write_wav(output_path, samples, sample_rate)
             logger.info("Pydub conversion successful")
             return True
             
@@ -273,98 +3051,190 @@ def convert_audio_to_wav(input_path, output_path, optimize_for_speech=False):
         logger.error(f"Audio conversion failed: {str(e)}")
         return False
 
-def normalize_audio_levels(audio):
-    """Normalize audio levels for better speech recognition"""
-    try:
-        # Target level: -20dBFS (good for speech recognition)
-        target_dBFS = -20.0
-        
-        # Calculate gain adjustment needed
-        change_in_dBFS = target_dBFS - audio.dBFS
+def load_pcm_samples(path):
+    """Decode an audio file with pydub into 16-bit mono samples. Returns (samples, sample_rate)."""
+    audio = pydub.AudioSegment.from_file(path).set_sample_width(2)
+    return audio_dsp.downmix(audio_dsp.as_samples(audio.raw_data), audio.channels), audio.frame_rate
+
+def write_wav(dest, samples, sample_rate):
+    """Write 16-bit mono samples (array or PCM bytes) as a WAV file to a path or file object"""
+    with wave.open(dest, 'wb') as wav_writer:
+        wav_writer.setnchannels(1)
+        wav_writer.setsampwidth(2)
+        wav_writer.setframerate(sample_rate)
+        wav_writer.writeframes(samples)
+
+class MappedWav:
+    """Read-only memory map of a 16-bit mono PCM WAV file.
+    
+    samples is an int16 array over the mapped data chunk, so slicing it copies
+    nothing and pages come from the page cache only as they are touched. The
+    process never holds its own copy of the recording, however long it is.
+    Raises ValueError for anything other than 16-bit mono PCM.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self.sample_rate, self._data_offset, data_size = self._read_layout(self._file)
+            data_size = min(data_size, os.fstat(self._file.fileno()).st_size - self._data_offset) // 2 * 2
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._map, 'madvise'):
+                self._map.madvise(mmap.MADV_SEQUENTIAL)  # Read ahead while scanning for speech
+            self.samples = np.frombuffer(self._map, dtype='<i2', count=data_size // 2, offset=self._data_offset)
+        except Exception:
+            self._file.close()
+            raise
+
+    @staticmethod
+    def _read_layout(f):
+        """(sample_rate, data_offset, data_size) from the RIFF chunk headers"""
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError('Not a WAV file')
         
-        # Apply gain (but limit to prevent distortion)
-        if change_in_dBFS > 20:  # Limit boost to 20dB
-            change_in_dBFS = 20
-        elif change_in_dBFS < -20:  # Limit reduction to 20dB
-            change_in_dBFS = -20
+        sample_rate = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError('WAV file has no data chunk')
+            chunk_id, size = chunk_header[:4], struct.unpack('<I', chunk_header[4:])[0]
+            
+            if chunk_id == b'data':
+                if sample_rate is None:
+                    raise ValueError('WAV data chunk comes before its format')
+                return sample_rate, f.tell(), size
             
-        normalized_audio = audio.apply_gain(change_in_dBFS)
-        return normalized_audio
+            if chunk_id == b'fmt ':
+                fmt = f.read(size)
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if format_tag not in (1, 0xFFFE) or channels != 1 or bits != 16:
+                    raise ValueError('Only 16-bit mono PCM WAV can be mapped')
+                size -= len(fmt)
+            f.seek(size + (size & 1), os.SEEK_CUR)  # Chunks are padded to an even length
+
+    def release(self, start, end):
+        """Drop samples [start, end) from this process's resident memory (the page cache keeps them)"""
+        if not hasattr(self._map, 'madvise'):
+            return
+        first = (self._data_offset + start * 2) // mmap.PAGESIZE * mmap.PAGESIZE
+        last = self._data_offset + end * 2
+        try:
+            self._map.madvise(mmap.MADV_DONTNEED, first, last - first)
+        except (ValueError, OSError):
+            pass  # Already closed, or a range past the end of the file
+
+    def close(self):
+        self.samples = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Chunks still in flight hold views: the mapping goes away with the last one
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_wav_samples(wav_path):
+    """(MappedWav or None, int16 samples, sample rate): mapped when it is 16-bit mono PCM, loaded otherwise"""
+    try:
+        wav = MappedWav(wav_path)
+    except ValueError as e:
+        logger.info(f"Loading {os.path.basename(wav_path)} into memory: {str(e)}")
+        samples, sample_rate = load_pcm_samples(wav_path)
+        return None, samples, sample_rate
+    return wav, wav.samples, wav.sample_rate
+
+def pcm_window(samples, start, end):
+    """samples[start:end] as a byte memoryview (no copy)"""
+    return memoryview(samples[start:end]).cast('B')
+
+def normalize_audio_levels(samples):
+    """Normalize 16-bit mono samples for better speech recognition"""
+    try:
+        started = time.perf_counter()
+        
+        # Target level: -20dBFS (good for speech recognition), limited to +/-20dB to prevent distortion
+        normalized = audio_dsp.normalize(samples, target_dbfs=-20.0, max_change_db=20.0)
+        STAGE_SECONDS.observe(time.perf_counter() - started, 'normalize')
+        return normalized
         
     except Exception as e:
         logger.warning(f"Audio normalization failed: {str(e)}, using original audio")
-        return audio
+        return samples
 
-def process_speech_recognition(wav_path, language='en-US', file_size_mb=0):
-    """Enhanced speech recognition with improved settings and error handling"""
+def normalize_pcm_levels(pcm, target_dBFS=-20.0):
+    """Normalize a chunk of 16-bit PCM to the target level (same limits as normalize_audio_levels)"""
+    return audio_dsp.normalize(audio_dsp.as_samples(pcm), target_dbfs=target_dBFS, max_change_db=20.0).tobytes()
+
+def process_speech_recognition(wav_path, language='en-US'):
+    """Recognize a recording that fits in one request.
+    
+    All of the audio is sent. Whether it holds speech at all is decided from one
+    vectorized pass over its frame energies, with the same percentile-based
+    noise floor as chunking. adjust_for_ambient_noise consumed the opening of
+    the recording instead, so those words never reached the recognizer.
+    """
     try:
-        recognizer = sr.Recognizer()
-        
-        # Optimize recognizer settings based on file size and language
-        if file_size_mb < 5:  # Small files - more sensitive settings
-            recognizer.energy_threshold = 200
-            recognizer.dynamic_energy_threshold = True
-            recognizer.dynamic_energy_adjustment_ratio = 2.0
-            recognizer.pause_threshold = 0.5
-        else:  # Larger files - more conservative settings
-            recognizer.energy_threshold = 300
-            recognizer.dynamic_energy_threshold = True
-            recognizer.dynamic_energy_adjustment_ratio = 1.5
-            recognizer.pause_threshold = 0.8
-        
-        with sr.AudioFile(wav_path) as source:
-            logger.info("Reading audio data...")
-            
-            # Adjust for ambient noise with longer sample for better accuracy
-            recognizer.adjust_for_ambient_noise(source, duration=min(1.0, file_size_mb * 0.1))
-            
-            # Record the entire audio file
-            audio_data = recognizer.record(source)
-            
-            logger.info(f"Sending to Google Speech Recognition API (language: {language})...")
-            
-            # Multiple recognition attempts with different services
-            recognition_attempts = [
-                ('google', lambda: recognizer.recognize_google(audio_data, language=language)),
-                ('google_cloud', lambda: recognizer.recognize_google_cloud(audio_data, language=language) if hasattr(recognizer, 'recognize_google_cloud') else None),
-                # Add more services as needed
-            ]
+        wav, samples, sample_rate = open_wav_samples(wav_path)
+        audio_data = None
+        try:
+            audio_duration = len(samples) / sample_rate
             
-            last_error = None
-            for service_name, recognition_func in recognition_attempts:
-                try:
-                    text = recognition_func()
-                    if text and text.strip():
-                        logger.info(f"Recognition successful using {service_name}: {len(text)} characters")
-                        
-                        # Post-process text
-                        processed_text = post_process_text(text, language)
-                        
-                        return jsonify({
-                            'text': processed_text,
-                            'language': language,
-                            'service': service_name,
-                            'word_count': len(processed_text.split()),
-                            'confidence': 'high'  # Could be enhanced with actual confidence scores
-                        }), 200
-                        
-                except sr.UnknownValueError:
-                    last_error = 'No speech could be detected'
-                    logger.warning(f"{service_name} could not understand audio")
-                    continue
-                    
-                except sr.RequestError as e:
-                    last_error = f'Recognition service error: {str(e)}'
-                    logger.error(f"{service_name} service error: {str(e)}")
-                    continue
-                    
-                except Exception as e:
-                    last_error = f'Unexpected error: {str(e)}'
-                    logger.error(f"{service_name} unexpected error: {str(e)}")
-                    continue
+            # Silence never reaches the recognition service; any frame above the threshold
+            # is enough, however short (a one-word answer must still be recognized)
+            frame_length = max(1, sample_rate * VAD_FRAME_MS // 1000)
+            energies = compute_frame_energies(samples, frame_length)
+            if not (energies > estimate_speech_threshold(energies)).any():
+                logger.warning("No frames above the noise floor, audio not sent for recognition")
+                return jsonify({'error': 'No speech could be detected'}), 400
+            
+            audio_data = flac_audio_data(pcm_window(samples, 0, len(samples)), sample_rate)
             
-            # If all recognition attempts failed
-            return jsonify({'error': last_error or 'No speech could be detected in this audio'}), 400
+            logger.info(f"Sending to speech recognition (language: {language})...")
+            
+            try:
+                text, service_name = recognize_with_hedging(audio_data, language)
+                
+            except sr.UnknownValueError:
+                logger.warning("Recognition could not understand audio")
+                return jsonify({'error': 'No speech could be detected'}), 400
+                
+            except TimeoutError as e:
+                logger.error(f"Recognition timed out: {str(e)}")
+                return jsonify({'error': 'Recognition service timed out'}), 504
+                
+            except sr.RequestError as e:
+                logger.error(f"Recognition service error: {str(e)}")
+                return jsonify({'error': f'Recognition service error: {str(e)}'}), 400
+                
+            except Exception as e:
+                logger.error(f"Recognition unexpected error: {str(e)}")
+                return jsonify({'error': f'Unexpected error: {str(e)}'}), 400
+        finally:
+            audio_data = samples = None  # Drop views into the map before closing it
+            if wav is not None:
+                wav.close()
+        
+        if not text or not text.strip():
+            return jsonify({'error': 'No speech could be detected in this audio'}), 400
+        
+        logger.info(f"Recognition successful using {service_name}: {len(text)} characters")
+        
+        # Post-process text
+        processed_text = post_process_text(text, language)
+        
+        return jsonify({
+            'text': processed_text,
+            'language': language,
+            'service': service_name,
+            'word_count': len(processed_text.split()),
+            'duration': f"{audio_duration:.1f}s",
+            'confidence': 'high'  # Could be enhanced with actual confidence scores
+        }), 200
                     
     except Exception as e:
         logger.error(f"Speech recognition error: {str(e)}")
@@ -400,147 +3270,666 @@ def post_process_text(text, language):
     
     return text
 
-def process_large_audio_enhanced(wav_path, language='en-US', temp_dir=None):
+def process_large_audio_enhanced(wav_path, language='en-US', temp_dir=None, progress_callback=None, cancel_event=None,
+                                 chunk_callback=None):
     """Enhanced large audio processing with better chunk management and error recovery"""
     try:
         logger.info("Processing large audio file with enhanced chunking...")
         
-        # Load and prepare audio
-        audio = AudioSegment.from_file(wav_path)
-        audio_duration = len(audio) / 1000  # Duration in seconds
+        # Map the WAV rather than loading it: chunks are sent as windows into the file
+        wav, samples, sample_rate = open_wav_samples(wav_path)
+        
+        try:
+            audio_duration = len(samples) / sample_rate  # Duration in seconds
+            
+            logger.info(f"Audio duration: {audio_duration:.1f} seconds")
+            
+            # Dynamic chunk sizing based on audio length
+            if audio_duration <= 120:  # 2 minutes or less
+                chunk_length_ms = 30000  # 30 second chunks
+            elif audio_duration <= 600:  # 10 minutes or less
+                chunk_length_ms = 45000  # 45 second chunks
+            else:
+                chunk_length_ms = RECOGNITION_MAX_CHUNK_MS
+            
+            # One pass over the audio gives the frame energies for VAD and the overall level
+            with STAGE_SECONDS.time('chunk'):
+                frame_length = max(1, sample_rate * VAD_FRAME_MS // 1000)
+                energies = compute_frame_energies(
+                    samples, frame_length, after_block=wav.release if wav is not None else None
+                )
+            
+            # Normalize levels without rewriting the samples: VAD works on scaled energies and
+            # each chunk gets the gain on its way to the recognizer
+            with STAGE_SECONDS.time('normalize'):
+                mean_square = float(np.dot(energies.astype(np.float64), energies)) * frame_length / max(1, len(samples))
+                level_dbfs = audio_dsp.rms_to_dbfs(mean_square ** 0.5)
+                gain_db = audio_dsp.normalize_gain_db(level_dbfs, target_dbfs=-20.0, max_change_db=20.0)
+                energies *= 10 ** (gain_db / 20)
+            
+            # Split on silence and drop chunks without speech before they hit the network
+            with STAGE_SECONDS.time('chunk'):
+                chunk_bounds = create_speech_chunks(samples, sample_rate, chunk_length_ms, energies=energies)
+            
+            if not chunk_bounds:
+                return jsonify({'error': 'No speech could be detected in this audio file'}), 400
+            
+            speech_seconds = sum(end - start for start, end in chunk_bounds) / sample_rate
+            logger.info(f"Audio split into {len(chunk_bounds)} speech chunks ({speech_seconds:.1f}s of {audio_duration:.1f}s sent for recognition)")
+            
+            # Hand zero-copy PCM windows to the recognition pool
+            chunk_sources = (
+                (pcm_window(samples, start, end), sample_rate)
+                for start, end in chunk_bounds
+            )
+            report_chunk = with_chunk_offsets(chunk_callback, chunk_bounds, sample_rate)
+            
+            def chunk_done(i, text):
+                if wav is not None:
+                    wav.release(*chunk_bounds[i])  # Sent: its pages are not needed again
+                if report_chunk is not None:
+                    report_chunk(i, text)
+            
+            outcome = recognize_chunks(
+                chunk_sources, language, progress_callback, cancel_event,
+                chunk_callback=chunk_done, gain_db=gain_db
+            )
+        finally:
+            samples = None
+            if wav is not None:
+                wav.close()
+        
+        return build_chunked_response(outcome, language, audio_duration, speech_seconds)
+        
+    except Exception as e:
+        logger.error(f"Enhanced large file processing error: {str(e)}")
+        return jsonify({'error': f'Error processing large audio file: {str(e)}'}), 500
+
+def process_large_audio_streaming(input_path, language='en-US', progress_callback=None, cancel_event=None,
+                                  chunk_callback=None):
+    """Large audio processing that starts recognition while ffmpeg is still decoding"""
+    try:
+        logger.info("Processing large audio file with streaming decode...")
         
-        logger.info(f"Audio duration: {audio_duration:.1f} seconds")
+        decoder = StreamingDecoder(input_path)
+        chunk_bounds = []  # Filled as the decoder produces chunks
         
-        # Normalize audio for consistent processing
-        audio = normalize_audio_levels(audio)
+        def decoded_chunks():
+            for start, end, pcm in decoder:
+                chunk_bounds.append((start, end))
+                yield pcm, decoder.sample_rate
         
-        # Dynamic chunk sizing based on audio length
-        if audio_duration <= 120:  # 2 minutes or less
-            chunk_length_ms = 30000  # 30 second chunks
-        elif audio_duration <= 600:  # 10 minutes or less
-            chunk_length_ms = 45000  # 45 second chunks
-        else:
-            chunk_length_ms = 60000  # 60 second chunks
+        outcome = recognize_chunks(
+            decoded_chunks(), language, progress_callback, cancel_event,
+            chunk_callback=with_chunk_offsets(chunk_callback, chunk_bounds, decoder.sample_rate)
+        )
         
-        # Create overlapping chunks for better continuity
-        overlap_ms = 2000  # 2 second overlap
-        chunks = create_overlapping_chunks(audio, chunk_length_ms, overlap_ms)
+        audio_duration = decoder.samples_decoded / decoder.sample_rate
+        speech_seconds = decoder.speech_samples / decoder.sample_rate
+        logger.info(f"Streamed {audio_duration:.1f}s of audio ({speech_seconds:.1f}s sent for recognition)")
         
-        logger.info(f"Audio split into {len(chunks)} chunks of {chunk_length_ms/1000}s each")
+        return build_chunked_response(outcome, language, audio_duration, speech_seconds)
         
-        # Process chunks with improved error handling
-        all_text_segments = []
-        recognizer = sr.Recognizer()
+    except Exception as e:
+        logger.error(f"Streaming large file processing error: {str(e)}")
+        return jsonify({'error': f'Error processing large audio file: {str(e)}'}), 500
+
+def recognize_chunks(chunk_sources, language, progress_callback=None, cancel_event=None, chunk_callback=None,
+                     gain_db=0.0):
+    """Recognize (pcm, sample_rate) chunks concurrently on the shared pool.
+    
+    Chunks are submitted as soon as the iterable produces them. Returns a dict
+    with the transcripts in chunk order, the chunk counts and, when too many
+    chunks failed or the caller cancelled, an (error message, status code) pair.
+    
+    progress_callback, if given, is called as (chunks_done, chunks_failed,
+    chunks_total, total_known) whenever a chunk is submitted or finishes.
+    chunk_callback, if given, is called as (chunk_index, text) as each chunk
+    finishes, in completion order; text is None when the chunk failed.
+    gain_db is applied to every chunk by the worker that recognizes it.
+    """
+    executor = get_recognition_executor()
+    stop_event = threading.Event()  # Tells workers to drop outstanding chunks
+    cancel_event = cancel_event or threading.Event()  # Set by the caller to abandon the run
+    completed = queue.Queue()
+    futures = []
+    progress = {'done': 0, 'failed': 0, 'total': 0, 'total_known': False}
+    progress_lock = threading.Lock()
+    
+    def report_progress(**changes):
+        if progress_callback is None:
+            return
+        with progress_lock:
+            for name, value in changes.items():
+                progress[name] = progress[name] + value if name in ('done', 'failed') else value
+            snapshot = (progress['done'], progress['failed'], progress['total'], progress['total_known'])
+        progress_callback(*snapshot)
+    
+    def on_chunk_done(i, future):
+        completed.put((i, future))
+        if future.cancelled():
+            return
+        text = future.result() if future.exception() is None else None
+        if text:
+            report_progress(done=1)
+        else:
+            report_progress(failed=1)
+        if chunk_callback is not None:
+            chunk_callback(i, text.strip() if text else None)
+    
+    try:
+        for i, (pcm, sample_rate) in enumerate(chunk_sources):
+            if cancel_event.is_set():
+                break
+            # Chunk index as priority: concurrent files take turns on the pool
+            future = executor.submit(recognize_chunk, pcm, sample_rate, language, stop_event, gain_db=gain_db, priority=i)
+            future.add_done_callback(lambda f, i=i: on_chunk_done(i, f))
+            futures.append(future)
+            report_progress(total=len(futures))
         
-        # Configure recognizer for large file processing
-        recognizer.energy_threshold = 250
-        recognizer.dynamic_energy_threshold = True
-        recognizer.dynamic_energy_adjustment_ratio = 1.8
+        if cancel_event.is_set():
+            return {
+                'segments': [],
+                'total_chunks': len(futures),
+                'failed_chunks': 0,
+                'error': ('Transcription was cancelled', 409)
+            }
         
+        # The failure budget is only known once every chunk has been produced
+        total_chunks = len(futures)
+        report_progress(total=total_chunks, total_known=True)
+        max_failed_chunks = max(1, total_chunks // 4)  # Allow up to 25% failed chunks
         failed_chunks = 0
-        max_failed_chunks = max(1, len(chunks) // 4)  # Allow up to 25% failed chunks
+        chunk_texts = [None] * total_chunks
+        error = None
         
-        for i, chunk in enumerate(chunks):
+        for _ in range(total_chunks):
+            # Wake up periodically so a cancellation does not wait for the next chunk
+            while True:
+                try:
+                    i, future = completed.get(timeout=0.5)
+                    break
+                except queue.Empty:
+                    if cancel_event.is_set():
+                        break
+            
+            if cancel_event.is_set():
+                error = ('Transcription was cancelled', 409)
+                break
+            
             try:
-                # Export chunk to temporary WAV file
-                chunk_name = f"chunk_{i:03d}.wav"
-                chunk_path = os.path.join(temp_dir, chunk_name)
-                chunk.export(chunk_path, format="wav")
-                
-                # Process chunk with retries
-                chunk_text = process_chunk_with_retries(
-                    chunk_path, recognizer, language, max_retries=2
-                )
+                chunk_text = future.result()
                 
                 if chunk_text:
-                    all_text_segments.append(chunk_text.strip())
-                    logger.info(f"Chunk {i+1}/{len(chunks)} processed successfully")
+                    chunk_texts[i] = chunk_text.strip()
+                    logger.info(f"Chunk {i+1}/{total_chunks} processed successfully")
                 else:
                     failed_chunks += 1
-                    logger.warning(f"Chunk {i+1}/{len(chunks)} - No speech detected")
+                    logger.warning(f"Chunk {i+1}/{total_chunks} - No speech detected")
                     
                     if failed_chunks > max_failed_chunks:
                         logger.error("Too many chunks failed processing")
-                        return jsonify({'error': 'Too many audio segments could not be processed'}), 400
-                
-                # Progressive delay to avoid rate limiting
-                if i < len(chunks) - 1:
-                    delay = min(0.5 + (i * 0.1), 2.0)  # Increasing delay, max 2s
-                    time.sleep(delay)
+                        error = ('Too many audio segments could not be processed', 400)
+                        break
                     
             except Exception as e:
                 failed_chunks += 1
                 logger.error(f"Error processing chunk {i+1}: {str(e)}")
                 
                 if failed_chunks > max_failed_chunks:
-                    return jsonify({'error': 'Audio processing failed due to too many errors'}), 500
+                    error = ('Audio processing failed due to too many errors', 500)
+                    break
+        
+        return {
+            'segments': [text for text in chunk_texts if text],
+            'total_chunks': total_chunks,
+            'failed_chunks': failed_chunks,
+            'error': error
+        }
+        
+    finally:
+        # Stop outstanding work early if we bailed out
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        
+        # Stop the decoder (and its ffmpeg process) if we left before it finished
+        if hasattr(chunk_sources, 'close'):
+            chunk_sources.close()
+
+def with_chunk_offsets(chunk_callback, chunk_bounds, sample_rate):
+    """Adapt a (chunk_index, start_seconds, end_seconds, text) callback for recognize_chunks"""
+    if chunk_callback is None:
+        return None
+    
+    def report(i, text):
+        start, end = chunk_bounds[i]
+        chunk_callback(i, start / sample_rate, end / sample_rate, text)
+    return report
+
+def build_chunked_response(outcome, language, audio_duration, speech_seconds):
+    """Combine chunk transcripts into the large-file API response"""
+    if outcome['error']:
+        message, status = outcome['error']
+        return jsonify({'error': message}), status
+    
+    # Combine and post-process results
+    all_text_segments = outcome['segments']
+    if not all_text_segments:
+        return jsonify({'error': 'No speech could be detected in this audio file'}), 400
+    
+    # Combine chunk transcripts in order
+    combined_text = smart_combine_text_segments(all_text_segments, language)
+    
+    # Final post-processing
+    final_text = post_process_text(combined_text, language)
+    
+    total_chunks = outcome['total_chunks']
+    failed_chunks = outcome['failed_chunks']
+    success_rate = ((total_chunks - failed_chunks) / total_chunks) * 100
+    
+    logger.info(f"Large file processing completed. Success rate: {success_rate:.1f}%")
+    
+    return jsonify({
+        'text': final_text,
+        'language': language,
+        'chunks_processed': total_chunks - failed_chunks,
+        'total_chunks': total_chunks,
+        'success_rate': f"{success_rate:.1f}%",
+        'duration': f"{audio_duration:.1f}s",
+        'speech_duration': f"{speech_seconds:.1f}s",
+        'word_count': len(final_text.split())
+    }), 200
+
+class PCMRingBuffer:
+    """Fixed-capacity ring buffer of int16 PCM samples"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._start = 0
+        self._size = 0
+        self.consumed = 0  # Absolute position of the read head in the stream
+    
+    def __len__(self):
+        return self._size
+    
+    def write(self, samples):
+        """Append samples, wrapping around the end of the buffer"""
+        count = len(samples)
+        if count > self.capacity - self._size:
+            raise ValueError("PCM ring buffer overflow")
         
-        # Combine and post-process results
-        if not all_text_segments:
-            return jsonify({'error': 'No speech could be detected in this audio file'}), 400
+        end = (self._start + self._size) % self.capacity
+        first = min(count, self.capacity - end)
+        self._buffer[end:end + first] = samples[:first]
+        self._buffer[:count - first] = samples[first:]
+        self._size += count
+    
+    def view(self):
+        """Buffered samples in stream order (zero-copy unless the data wraps)"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._buffer[self._start:end]
+        return np.concatenate((self._buffer[self._start:], self._buffer[:end - self.capacity]))
+    
+    def consume(self, count):
+        """Drop samples from the front of the buffer"""
+        count = min(count, self._size)
+        self._start = (self._start + count) % self.capacity
+        self._size -= count
+        self.consumed += count
+
+class SpeechSegmenter:
+    """Incrementally split a PCM stream into speech chunks through a ring buffer.
+    
+    feed() and flush() return the chunks completed so far as (start_sample,
+    end_sample, pcm_bytes) tuples, with offsets from the start of the stream.
+    By default a chunk is emitted once the buffer holds a full chunk; in eager
+    mode every speech region is emitted as soon as a pause follows it.
+    """
+    
+    def __init__(self, sample_rate, max_chunk_ms=RECOGNITION_MAX_CHUNK_MS, eager=False, block_samples=None):
+        self.sample_rate = sample_rate
+        self.max_chunk_ms = min(max_chunk_ms, RECOGNITION_MAX_CHUNK_MS)
+        self.max_chunk_samples = sample_rate * self.max_chunk_ms // 1000
+        self.block_samples = block_samples or sample_rate // 2
+        self.eager = eager
+        self.frame_length = max(1, sample_rate * VAD_FRAME_MS // 1000)
+        self.ring = PCMRingBuffer(self.max_chunk_samples + self.block_samples)
+        self.recent_noise_floors = deque(maxlen=20)
+        self.speech_samples = 0
+    
+    def feed(self, samples):
+        chunks = []
         
-        # Smart text combination (remove overlaps and join properly)
-        combined_text = smart_combine_text_segments(all_text_segments, language)
+        # Write block by block so emitting always frees enough room in the ring
+        for offset in range(0, len(samples), self.block_samples):
+            self.ring.write(samples[offset:offset + self.block_samples])
+            if len(self.ring) >= self.max_chunk_samples:
+                chunks.extend(self._emit(finished=False))
         
-        # Final post-processing
-        final_text = post_process_text(combined_text, language)
+        if self.eager and len(self.ring) >= self.block_samples:
+            chunks.extend(self._emit(finished=False))
+        return chunks
+    
+    def flush(self):
+        if not len(self.ring):
+            return []
+        return self._emit(finished=True)
+    
+    def _emit(self, finished):
+        """Return the complete chunks in the buffer and drop them from it"""
+        window = self.ring.view()
+        started = time.perf_counter()
+        energies = compute_frame_energies(window, self.frame_length)
         
-        success_rate = ((len(chunks) - failed_chunks) / len(chunks)) * 100
+        # Track the noise floor across windows so a window of pure speech or pure silence is judged fairly
+        self.recent_noise_floors.append(estimate_noise_floor(energies))
+        noise_floor = min(self.recent_noise_floors)
         
-        logger.info(f"Large file processing completed. Success rate: {success_rate:.1f}%")
+        chunk_bounds = create_speech_chunks(
+            window, self.sample_rate, self.max_chunk_ms,
+            noise_floor=noise_floor, pack=not self.eager, energies=energies
+        )
+        STAGE_SECONDS.observe(time.perf_counter() - started, 'chunk')
+        window_full = len(window) >= self.max_chunk_samples
+        pad_samples = self.sample_rate * VAD_SPEECH_PAD_MS // 1000
         
-        return jsonify({
-            'text': final_text,
-            'language': language,
-            'chunks_processed': len(chunks) - failed_chunks,
-            'total_chunks': len(chunks),
-            'success_rate': f"{success_rate:.1f}%",
-            'duration': f"{audio_duration:.1f}s",
-            'word_count': len(final_text.split())
-        }), 200
+        if finished:
+            keep_from = len(window)
+        elif self.eager and not window_full:
+            # Only regions followed by a real pause are complete
+            pause_samples = self.sample_rate * VAD_MIN_SILENCE_MS // 1000
+            complete = [
+                (start, end) for start, end in chunk_bounds
+                if len(window) - (end - pad_samples) >= pause_samples
+            ]
+            if len(complete) < len(chunk_bounds):
+                keep_from = chunk_bounds[len(complete)][0]  # Speech still in progress
+            elif complete:
+                keep_from = complete[-1][1]
+            else:
+                # Undecided audio (e.g. speech before any pause set the noise floor) waits for a full window
+                keep_from = 0
+            chunk_bounds = complete
+        elif chunk_bounds and chunk_bounds[-1][0] >= self.block_samples:
+            # The last chunk may continue past the window - keep it for the next round
+            keep_from = chunk_bounds[-1][0]
+            chunk_bounds = chunk_bounds[:-1]
+        elif not chunk_bounds:
+            # Silence only - keep a little audio in case speech starts at the edge
+            keep_from = len(window) - pad_samples
+        else:
+            keep_from = len(window)
         
-    except Exception as e:
-        logger.error(f"Enhanced large file processing error: {str(e)}")
-        return jsonify({'error': f'Error processing large audio file: {str(e)}'}), 500
+        chunks = []
+        for start, end in chunk_bounds:
+            self.speech_samples += end - start
+            chunks.append((self.ring.consumed + start, self.ring.consumed + end, window[start:end].tobytes()))
+        
+        self.ring.consume(keep_from)
+        return chunks
+
+class StreamingDecoder:
+    """Decode audio through an ffmpeg pipe and yield speech chunks as they fill.
+    
+    Iterating yields (start_sample, end_sample, pcm_bytes) with offsets measured
+    from the start of the recording. Each chunk is level-normalized on its own
+    since the decode runs without loudnorm. Nothing is written to disk.
+    
+    Instead of a file, the input can be an iterable of byte strings
+    (input_chunks) that is piped into ffmpeg as it produces them, so decoding
+    can start before the whole recording exists.
+    """
+    
+    sample_rate = STREAM_SAMPLE_RATE
+    read_block_samples = STREAM_SAMPLE_RATE // 2  # 0.5s per pipe read
+    
+    def __init__(self, input_path=None, max_chunk_ms=RECOGNITION_MAX_CHUNK_MS, input_chunks=None):
+        self.input_path = input_path
+        self.input_chunks = input_chunks
+        self.input_error = None
+        self.max_chunk_ms = max_chunk_ms
+        self.samples_decoded = 0
+        self.segmenter = None
+    
+    @property
+    def speech_samples(self):
+        return self.segmenter.speech_samples if self.segmenter else 0
+    
+    def __iter__(self):
+        piped = self.input_chunks is not None
+        cmd = [
+            'ffmpeg', '-loglevel', 'error',
+            *(['-i', 'pipe:0'] if piped else ['-nostdin', '-i', self.input_path]),
+            '-vn',
+            '-ac', '1',
+            '-ar', str(self.sample_rate),
+            '-af', STREAM_FILTER_CHAIN,
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            'pipe:1'
+        ]
+        self.segmenter = SpeechSegmenter(self.sample_rate, self.max_chunk_ms, block_samples=self.read_block_samples)
+        # stderr goes to a file: a damaged input can log more than a pipe holds, and ffmpeg
+        # would block on it while we block on stdout
+        stderr = tempfile.TemporaryFile()
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE if piped else None, stdout=subprocess.PIPE, stderr=stderr
+        )
+        if piped:
+            feeder = threading.Thread(target=self._feed_input, args=(process,), name='decode-input', daemon=True)
+            feeder.start()
+        
+        try:
+            while True:
+                data = process.stdout.read(self.read_block_samples * 2)
+                if not data:
+                    break
+                
+                samples = np.frombuffer(data, dtype=np.int16)
+                self.samples_decoded += len(samples)
+                for start, end, pcm in self.segmenter.feed(samples):
+                    yield start, end, normalize_pcm_levels(pcm)
+            
+            if piped:
+                feeder.join()
+                if self.input_error is not None:
+                    raise self.input_error  # The input broke off: the decoded audio is incomplete
+            
+            for start, end, pcm in self.segmenter.flush():
+                yield start, end, normalize_pcm_levels(pcm)
+            
+            if process.wait(timeout=300) != 0:
+                stderr.seek(0)
+                error_output = stderr.read().decode(errors='replace').strip()
+                raise RuntimeError(f"FFmpeg decode failed: {error_output}")
+            
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr.close()
+    
+    def _feed_input(self, process):
+        """Pipe input_chunks into ffmpeg (runs on its own thread)"""
+        try:
+            for data in self.input_chunks:
+                process.stdin.write(data)
+        except BrokenPipeError:
+            pass  # ffmpeg stopped reading; its exit status says why
+        except Exception as e:
+            self.input_error = e
+            process.kill()
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+def compute_frame_energies(samples, frame_length, block_frames=4096, after_block=None):
+    """Vectorized RMS energy per frame, computed block by block to bound memory.
+    
+    after_block, if given, is called with each block's (start, end) sample range
+    once it has been read (a memory-mapped source can then let those pages go).
+    """
+    n_frames = -(-len(samples) // frame_length)  # Include a trailing partial frame
+    energies = np.empty(n_frames, dtype=np.float32)
+    
+    for first in range(0, n_frames, block_frames):
+        last = min(first + block_frames, n_frames)
+        block = samples[first * frame_length:last * frame_length].astype(np.float32)
+        
+        # Pad the trailing partial frame so the block reshapes cleanly
+        if len(block) < (last - first) * frame_length:
+            block = np.pad(block, (0, (last - first) * frame_length - len(block)))
+        
+        block = block.reshape(-1, frame_length)
+        energies[first:last] = np.sqrt(np.mean(block * block, axis=1))
+        if after_block is not None:
+            after_block(first * frame_length, min(last * frame_length, len(samples)))
+    
+    return energies
+
+def estimate_noise_floor(energies):
+    """Noise floor as the 10th percentile of frame energies"""
+    if len(energies) == 0:
+        return 0.0
+    return float(np.percentile(energies, 10))
+
+def estimate_speech_threshold(energies):
+    """Speech energy threshold for a whole recording from one percentile pass over its frame energies.
+    
+    The threshold sits VAD_THRESHOLD_RATIO above the noise floor (10th
+    percentile), capped that far below the loud speech level (90th percentile),
+    so recordings without pauses are not treated as silence.
+    """
+    if len(energies) == 0:
+        return VAD_MIN_ENERGY
+    noise_floor, speech_level = np.percentile(energies, [10, 90])
+    return max(VAD_MIN_ENERGY, min(noise_floor * VAD_THRESHOLD_RATIO, speech_level / VAD_THRESHOLD_RATIO))
+
+def detect_speech_regions(energies, frame_ms=VAD_FRAME_MS, noise_floor=None):
+    """Find speech regions (as frame index pairs) from per-frame energies.
+    
+    Without a known noise floor the threshold is estimated from the energies
+    themselves (estimate_speech_threshold).
+    """
+    if len(energies) == 0:
+        return []
+    
+    if noise_floor is None:
+        threshold = estimate_speech_threshold(energies)
+    else:
+        threshold = max(VAD_MIN_ENERGY, noise_floor * VAD_THRESHOLD_RATIO)
+    
+    is_speech = energies > threshold
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    
+    if len(starts) == 0:
+        return []
+    
+    # Merge regions separated by pauses shorter than the minimum silence
+    min_silence_frames = max(1, VAD_MIN_SILENCE_MS // frame_ms)
+    keep_split = (starts[1:] - ends[:-1]) >= min_silence_frames
+    starts = np.concatenate((starts[:1], starts[1:][keep_split]))
+    ends = np.concatenate((ends[:-1][keep_split], ends[-1:]))
+    
+    # Skip regions that do not hold enough speech to be worth recognizing
+    speech_totals = np.concatenate(([0], np.cumsum(is_speech)))
+    speech_counts = speech_totals[ends] - speech_totals[starts]
+    keep = speech_counts * frame_ms >= VAD_MIN_SPEECH_MS
+    starts, ends = starts[keep], ends[keep]
+    
+    # Pad regions so word onsets and endings are not clipped
+    pad_frames = VAD_SPEECH_PAD_MS // frame_ms
+    starts = np.maximum(starts - pad_frames, 0)
+    ends = np.minimum(ends + pad_frames, len(energies))
+    
+    return list(zip(starts.tolist(), ends.tolist()))
 
-def create_overlapping_chunks(audio, chunk_length_ms, overlap_ms):
-    """Create overlapping audio chunks for better continuity"""
-    chunks = []
-    start = 0
+def create_speech_chunks(samples, sample_rate, max_chunk_ms=RECOGNITION_MAX_CHUNK_MS,
+                         noise_floor=None, pack=True, energies=None):
+    """Split PCM samples on silence into chunks (sample index pairs) no longer than max_chunk_ms.
     
-    while start < len(audio):
-        end = min(start + chunk_length_ms, len(audio))
-        chunk = audio[start:end]
+    With pack=True neighbouring speech regions are merged up to the cap to keep
+    the number of recognizer requests low; otherwise every region is its own chunk.
+    """
+    frame_length = max(1, sample_rate * VAD_FRAME_MS // 1000)
+    if energies is None:
+        energies = compute_frame_energies(samples, frame_length)
+    regions = detect_speech_regions(energies, noise_floor=noise_floor)
+    
+    max_frames = max(1, min(max_chunk_ms, RECOGNITION_MAX_CHUNK_MS) // VAD_FRAME_MS)
+    chunk_frames = []
+    current = None
+    
+    for start, end in regions:
+        # Extend the current chunk while the result still fits under the cap
+        if pack and current is not None and end - current[0] <= max_frames:
+            current = (current[0], end)
+            continue
         
-        # Only add chunk if it's substantial enough (at least 5 seconds)
-        if len(chunk) >= 5000:
-            chunks.append(chunk)
+        if current is not None:
+            chunk_frames.append(current)
         
-        # Move start position (with overlap)
-        start += chunk_length_ms - overlap_ms
+        # Regions longer than the cap are cut at their quietest frame
+        while end - start > max_frames:
+            search_from = start + max_frames // 2
+            cut = search_from + int(np.argmin(energies[search_from:start + max_frames]))
+            chunk_frames.append((start, cut))
+            start = cut
         
-        # Prevent infinite loop
-        if start >= len(audio):
-            break
-            
-    return chunks
+        current = (start, end)
+    
+    if current is not None:
+        chunk_frames.append(current)
+    
+    return [
+        (start * frame_length, min(end * frame_length, len(samples)))
+        for start, end in chunk_frames
+    ]
+
+def recognize_chunk(pcm, sample_rate, language, cancel_event=None, gain_db=0.0):
+    """Recognize a single chunk of 16-bit mono PCM (runs on the shared recognition pool).
+    
+    pcm can be any bytes-like object, including a memoryview into a mapped
+    file; it is only copied when gain_db asks for a level change.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    
+    if gain_db:
+        pcm = memoryview(audio_dsp.apply_gain(audio_dsp.as_samples(pcm), gain_db)).cast('B')
+    # Recognizers take the raw PCM as AudioData: no WAV container is written, and
+    # the FLAC payload is encoded in-process once for all attempts
+    audio_data = flac_audio_data(pcm, sample_rate)
+    
+    with STAGE_SECONDS.time('recognize_chunk'):
+        text = process_chunk_with_retries(audio_data, language, max_retries=2, cancel_event=cancel_event)
+    
+    if cancel_event is None or not cancel_event.is_set():
+        CHUNKS_TOTAL.inc('ok' if text else 'failed')
+    return text
 
-def process_chunk_with_retries(chunk_path, recognizer, language, max_retries=2):
-    """Process a single chunk with retry logic"""
+def process_chunk_with_retries(audio_data, language, max_retries=2, cancel_event=None):
+    """Recognize a chunk's AudioData with retry logic"""
     for attempt in range(max_retries + 1):
+        # Wait for our turn with the recognition service
+        if not recognition_rate_limiter.acquire(cancel_event):
+            return None
+        
         try:
-            with sr.AudioFile(chunk_path) as source:
-                # Adjust noise threshold for each chunk
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio_data = recognizer.record(source)
-                
-                # Try recognition
-                text = recognizer.recognize_google(audio_data, language=language)
-                
-                if text and text.strip():
-                    return text.strip()
-                else:
-                    return None
+            # Try recognition
+            text, _ = recognize_with_hedging(audio_data, language)
+            
+            if text and text.strip():
+                return text.strip()
+            else:
+                return None
                     
         except sr.UnknownValueError:
             # No speech detected - not an error, just empty result
@@ -549,8 +3938,13 @@ def process_chunk_with_retries(chunk_path, recognizer, language, max_retries=2):
         except (sr.RequestError, ConnectionError, OSError) as e:
             if attempt < max_retries:
                 wait_time = (attempt + 1) * 1.5  # Progressive backoff
+                RECOGNITION_RETRIES.inc()
                 logger.warning(f"Chunk processing attempt {attempt + 1} failed: {str(e)}, retrying in {wait_time}s")
-                time.sleep(wait_time)
+                if cancel_event is not None:
+                    if cancel_event.wait(wait_time):
+                        return None
+                else:
+                    time.sleep(wait_time)
             else:
                 logger.error(f"All retry attempts failed for chunk: {str(e)}")
                 return None
@@ -562,46 +3956,14 @@ def process_chunk_with_retries(chunk_path, recognizer, language, max_retries=2):
     return None
 
 def smart_combine_text_segments(segments, language):
-    """Intelligently combine text segments, removing overlaps and ensuring proper flow"""
+    """Combine text segments from consecutive, non-overlapping chunks"""
     if not segments:
         return ""
     
-    if len(segments) == 1:
-        return segments[0]
-    
-    # For now, simple joining - could be enhanced with overlap detection
-    combined = []
-    
-    for i, segment in enumerate(segments):
-        if not segment:
-            continue
-            
-        # Clean up segment
-        segment = segment.strip()
-        
-        if i == 0:
-            combined.append(segment)
-        else:
-            # Check for potential overlap with previous segment
-            prev_words = combined[-1].split()[-3:] if combined else []
-            curr_words = segment.split()[:3]
-            
-            # Simple overlap detection (check if last 3 words match first 3 words)
-            overlap_detected = False
-            if len(prev_words) >= 2 and len(curr_words) >= 2:
-                if ' '.join(prev_words[-2:]).lower() == ' '.join(curr_words[:2]).lower():
-                    # Remove overlap from current segment
-                    segment = ' '.join(segment.split()[2:])
-                    overlap_detected = True
-            
-            if segment.strip():  # Only add if there's content left
-                combined.append(segment)
-    
-    # Join with appropriate spacing
-    result = ' '.join(combined)
+    # Chunks are cut on silence, so segments can simply be joined in order
+    result = ' '.join(segment.strip() for segment in segments if segment and segment.strip())
     
     # Clean up multiple spaces
-    import re
     result = re.sub(r'\s+', ' ', result).strip()
     
     return result
@@ -618,22 +3980,17 @@ def image_to_text():
     
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         
         try:
-            file.save(filepath)
+            # The image never touches disk: the upload was spooled in memory and is decoded from there
+            image_bytes = read_upload(file)
             
             # Get file size for logging
-            file_size_mb = os.path.getsize(filepath) / (1024 * 1024)
+            file_size_mb = len(image_bytes) / (1024 * 1024)
             log_request('/api/image-to-text', filename, file_size_mb)
             
-            # Check if Tesseract is available
-            try:
-                # Test Tesseract installation
-                test_text = pytesseract.get_tesseract_version()
-                logger.info(f"Tesseract version: {test_text}")
-            except Exception as tesseract_error:
-                logger.error(f"Tesseract not available: {tesseract_error}")
+            # Check if Tesseract is available (probed once per process)
+            if not get_ocr_engine_status()['available']:
                 return jsonify({
                     'error': 'OCR service unavailable. Tesseract is not installed or configured properly.',
                     'details': 'Please install Tesseract OCR: https://github.com/UB-Mannheim/tesseract/wiki'
@@ -641,118 +3998,21 @@ def image_to_text():
             
             # Process image with enhanced error handling
             try:
-                image = Image.open(filepath)
-                
-                # Convert to RGB if necessary (for better OCR)
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                # Multiple OCR configurations for better results
-                ocr_configs = [
-                    r'--oem 3 --psm 6',  # Default config
-                    r'--oem 3 --psm 3',  # Fully automatic page segmentation
-                    r'--oem 3 --psm 7',  # Single text line
-                    r'--oem 3 --psm 8',  # Single word
-                    r'--oem 3 --psm 11', # Sparse text
-                    r'--oem 3 --psm 13'  # Raw line
-                ]
-                
-                text = ""
-                best_config = None
-                
-                for config in ocr_configs:
-                    try:
-                        extracted_text = pytesseract.image_to_string(image, config=config, lang='eng')
-                        extracted_text = extracted_text.strip()
-                        
-                        if extracted_text and len(extracted_text) > len(text):
-                            text = extracted_text
-                            best_config = config
-                            
-                        # If we got decent text, break early
-                        if len(text) > 20:
-                            break
-                            
-                    except Exception as ocr_error:
-                        logger.warning(f"OCR config {config} failed: {ocr_error}")
-                        continue
+                with STAGE_SECONDS.time('ocr_decode'):
+                    gray = decode_image_for_ocr(image_bytes)
+                del image_bytes  # Only the decoded buffer is needed from here on
                 
-                # If no text found with multiple configs, try image preprocessing
-                if not text:
-                    try:
-                        import cv2
-                        import numpy as np
-                        
-                        # Convert PIL to OpenCV format
-                        img_array = np.array(image)
-                        
-                        # Apply image preprocessing
-                        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                        
-                        # Apply different preprocessing techniques
-                        preprocessing_techniques = [
-                            lambda img: cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1],
-                            lambda img: cv2.medianBlur(img, 3),
-                            lambda img: cv2.GaussianBlur(img, (1, 1), 0),
-                        ]
-                        
-                        for technique in preprocessing_techniques:
-                            try:
-                                processed_img = technique(gray)
-                                processed_text = pytesseract.image_to_string(processed_img, config=r'--oem 3 --psm 6')
-                                processed_text = processed_text.strip()
-                                
-                                if processed_text and len(processed_text) > len(text):
-                                    text = processed_text
-                                    best_config = "Preprocessed image"
-                                    
-                                if len(text) > 20:
-                                    break
-                                    
-                            except Exception as preprocessing_error:
-                                logger.warning(f"Preprocessing technique failed: {preprocessing_error}")
-                                continue
-                                
-                    except ImportError:
-                        logger.info("OpenCV not available for image preprocessing")
-                    except Exception as preprocessing_error:
-                        logger.warning(f"Image preprocessing failed: {preprocessing_error}")
+                # Run every OCR configuration concurrently and keep the most confident one
+                with STAGE_SECONDS.time('ocr'):
+                    text, best_config, mean_confidence = run_ocr_search(gray)
                 
-                # Final text processing
-                if text:
-                    # Clean up the extracted text
-                    import re
-                    text = re.sub(r'\n+', '\n', text)  # Remove excessive newlines
-                    text = re.sub(r' +', ' ', text)    # Remove excessive spaces
-                    text = text.strip()
-                    
-                    # Calculate confidence based on text length and quality
-                    confidence = 'low'
-                    if len(text) > 50 and len(text.split()) > 10:
-                        confidence = 'high'
-                    elif len(text) > 20 and len(text.split()) > 5:
-                        confidence = 'medium'
-                    
-                    logger.info(f"Image OCR successful: {len(text)} characters extracted using {best_config}")
-                    
-                    return jsonify({
-                        'text': text,
-                        'character_count': len(text),
-                        'word_count': len(text.split()),
-                        'confidence': confidence,
-                        'processing_method': best_config or 'Standard OCR'
-                    }), 200
-                else:
-                    return jsonify({
-                        'error': 'No text could be detected in this image',
-                        'suggestions': [
-                            'Ensure the image contains clear, readable text',
-                            'Try a higher resolution image',
-                            'Make sure the text is not too small or blurry',
-                            'Check that the image is not rotated or skewed'
-                        ]
-                    }), 400
+                payload, status = build_ocr_response(text, best_config, mean_confidence)
+                if status == 200:
+                    logger.info(f"Image OCR successful: {payload['character_count']} characters extracted using {best_config} (mean confidence {mean_confidence:.1f})")
+                return jsonify(payload), status
                     
+            except ImageTooLargeError as size_error:
+                return jsonify({'error': str(size_error)}), 413
             except Exception as image_error:
                 logger.error(f"Image processing error: {str(image_error)}")
                 return jsonify({
@@ -763,10 +4023,6 @@ def image_to_text():
         except Exception as e:
             logger.error(f"Image processing error: {str(e)}")
             return jsonify({'error': 'Error processing image'}), 500
-        finally:
-            # Clean up file
-            if os.path.exists(filepath):
-                os.remove(filepath)
     
     return jsonify({
         'error': 'Unsupported file type',
@@ -774,19 +4030,553 @@ def image_to_text():
         'details': 'Please upload an image file in one of the supported formats'
     }), 400
 
+_ocr_executor = None
+_ocr_executor_lock = threading.Lock()
+_ocr_worker_api = None  # Per-process Tesseract handle, set by init_ocr_worker
+
+def init_ocr_worker():
+    """Pool initializer: load the Tesseract model once per worker process"""
+    global _ocr_worker_api
+    if tesserocr.available():
+        _ocr_worker_api = tesserocr.PyTessBaseAPI(lang='eng')
+
+def ping_ocr_worker():
+    """No-op task used to start the pool's processes ahead of the first request"""
+    time.sleep(0.1)  # Keep each worker busy long enough for the pool to spawn the next
+    return os.getpid()
+
+def get_ocr_executor():
+    """Process pool for OCR candidates, sized to the machine's cores (created on first use)"""
+    global _ocr_executor
+    with _ocr_executor_lock:
+        if _ocr_executor is None:
+            # Spawn rather than fork: the server process is multi-threaded
+            _ocr_executor = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_ocr_worker
+            )
+        return _ocr_executor
+
+def warm_ocr_workers():
+    """Start every OCR worker now so the first requests don't pay for process start-up and model loading"""
+    if not get_ocr_engine_status()['available']:
+        return
+    
+    try:
+        start_time = time.time()
+        executor = get_ocr_executor()
+        pids = {future.result() for future in [executor.submit(ping_ocr_worker) for _ in range(OCR_WORKERS)]}
+        logger.info(f"Warmed {len(pids)} OCR workers in {time.time() - start_time:.2f}s")
+    except Exception as e:
+        logger.error(f"OCR worker warm-up failed: {str(e)}")
+
+def get_ocr_engine_status():
+    """Probe the OCR engine once and cache the result for the life of the process"""
+    return probe_capability('tesseract', _probe_ocr_engine)
+
+def _probe_ocr_engine():
+    in_process = tesserocr.available()
+    engine = 'tesserocr' if in_process else 'pytesseract'
+    try:
+        if in_process:
+            version = tesserocr.tesseract_version().splitlines()[0]
+        else:
+            version = str(pytesseract.get_tesseract_version())
+        logger.info(f"Tesseract version: {version} ({engine})")
+        if not in_process:
+            logger.warning("tesserocr not installed: every OCR call starts the tesseract binary "
+                           "(pip install -r requirements-ocr.txt keeps the model loaded in each worker)")
+        return {'available': True, 'engine': engine, 'version': version}
+    except Exception as tesseract_error:
+        logger.error(f"Tesseract not available: {tesseract_error}")
+        return {'available': False, 'engine': engine, 'version': None}
+
+class ImageTooLargeError(ValueError):
+    """Raised when an upload's pixel dimensions exceed OCR_MAX_SOURCE_PIXELS"""
+
+def decode_image_for_ocr(image_bytes):
+    """Decode an uploaded image straight into one 8-bit grayscale array for OCR.
+    
+    The header is checked first, so oversized images are rejected before any
+    pixels are allocated. Large images are then downscaled to OCR_MAX_PIXELS.
+    Peak memory per request is the upload bytes plus one grayscale frame at
+    source resolution (at most OCR_MAX_SOURCE_PIXELS bytes). JPEGs are
+    decoded at reduced scale, so their frame is smaller. The array that is
+    kept is at most OCR_MAX_PIXELS bytes, about 12MB.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as probe:  # Reads the header only
+        width, height = probe.size
+    pixels = width * height
+    if pixels > OCR_MAX_SOURCE_PIXELS:
+        raise ImageTooLargeError(f'Image is too large ({width}x{height}). Maximum is {OCR_MAX_SOURCE_PIXELS // 1_000_000} megapixels.')
+    
+    if cv2.available():
+        # Let the decoder skip detail we'd throw away anyway (a real win for JPEG)
+        reduction = 1
+        while reduction < 8 and pixels / (reduction * 2) ** 2 >= OCR_MAX_PIXELS:
+            reduction *= 2
+        flags = {
+            1: cv2.IMREAD_GRAYSCALE,
+            2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+            4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+            8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+        }[reduction]
+        gray = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), flags)
+        if gray is None:
+            raise ValueError('Unsupported or corrupted image data')
+    else:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            gray = np.asarray(image.convert('L'))
+    
+    return downscale_for_ocr(gray)
+
+def downscale_for_ocr(gray):
+    """Shrink a grayscale array to at most OCR_MAX_PIXELS pixels"""
+    height, width = gray.shape
+    if height * width > OCR_MAX_PIXELS:
+        scale = (OCR_MAX_PIXELS / (height * width)) ** 0.5
+        new_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if cv2.available():
+            gray = cv2.resize(gray, new_size, interpolation=cv2.INTER_AREA)
+        else:
+            gray = np.asarray(Image.fromarray(gray).resize(new_size, Image.LANCZOS))
+    
+    return np.ascontiguousarray(gray)
+
+def preprocess_for_ocr(gray, technique):
+    """Apply one of the OCR_PREPROCESSING techniques to a grayscale array"""
+    if technique == 'otsu_threshold':
+        return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    if technique == 'median_blur':
+        return cv2.medianBlur(gray, 3)
+    if technique == 'gaussian_blur':
+        return cv2.GaussianBlur(gray, (1, 1), 0)
+    raise ValueError(f"Unknown preprocessing technique: {technique}")
+
+def run_ocr_candidate(gray, config, technique=None):
+    """OCR one configuration (runs in a pool process).
+    
+    Uses image_to_data so the text and Tesseract's per-word confidences come
+    from a single run. Returns the text with its line structure, the mean word
+    confidence and a label for the processing method.
+    """
+    started = time.perf_counter()
+    if technique is not None:
+        gray = preprocess_for_ocr(gray, technique)
+    method = f"Preprocessed image ({technique.replace('_', ' ')})" if technique else config
+    
+    if _ocr_worker_api is not None:
+        # Warm in-process engine: only the page segmentation mode changes between candidates
+        _ocr_worker_api.SetPageSegMode(int(config.split('--psm')[1].split()[0]))
+        _ocr_worker_api.SetImage(Image.fromarray(gray))
+        confidences = [c for c in _ocr_worker_api.AllWordConfidences() if c >= 0]
+        return {
+            'text': _ocr_worker_api.GetUTF8Text().strip(),
+            'mean_confidence': float(np.mean(confidences)) if confidences else 0.0,
+            'method': method,
+            'seconds': time.perf_counter() - started
+        }
+    
+    data = pytesseract.image_to_data(gray, config=config, lang='eng', output_type=pytesseract.Output.DICT)
+    
+    lines = OrderedDict()
+    confidences = []
+    for i, word in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not word.strip():
+            continue  # Layout rows carry no word
+        
+        line_key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(line_key, []).append(word.strip())
+        confidences.append(confidence)
+    
+    return {
+        'text': '\n'.join(' '.join(words) for words in lines.values()),
+        'mean_confidence': float(np.mean(confidences)) if confidences else 0.0,
+        'method': method,
+        'seconds': time.perf_counter() - started  # Reported back to the parent's metrics
+    }
+
+def get_ocr_candidates():
+    """(config, preprocessing) pairs tried for every image, plain configurations first"""
+    candidates = [(config, None) for config in OCR_CONFIGS]
+    candidates.extend((r'--oem 3 --psm 6', technique) for technique in OCR_PREPROCESSING)
+    return candidates
+
+def is_better_ocr_result(result, best):
+    """Prefer higher mean word confidence, then more text"""
+    return best is None or (result['mean_confidence'], len(result['text'])) > (best['mean_confidence'], len(best['text']))
+
+def is_ocr_result_accepted(result):
+    """True once a candidate is good enough to stop trying the others"""
+    return result['mean_confidence'] >= OCR_ACCEPT_CONFIDENCE and len(result['text']) > OCR_ACCEPT_MIN_CHARS
+
+def run_ocr_search(gray):
+    """Run all OCR candidates concurrently and return (text, method, mean_confidence).
+    
+    The winner is the candidate with the highest mean word confidence. As soon
+    as one candidate passes the acceptance threshold the queued ones are cancelled.
+    """
+    executor = get_ocr_executor()
+    futures = {
+        executor.submit(run_ocr_candidate, gray, config, technique): (config, technique)
+        for config, technique in get_ocr_candidates()
+    }
+    
+    best = None
+    try:
+        for future in as_completed(futures):
+            config, technique = futures[future]
+            try:
+                result = future.result()
+            except ImportError:
+                logger.info("OpenCV not available for image preprocessing")
+                continue
+            except Exception as ocr_error:
+                logger.warning(f"OCR candidate {technique or config} failed: {ocr_error}")
+                continue
+            
+            OCR_CANDIDATE_SECONDS.observe(result['seconds'], result['method'])
+            if not result['text'].strip():
+                continue
+            
+            if is_better_ocr_result(result, best):
+                best = result
+            
+            # Good enough - stop waiting for the slower candidates
+            if is_ocr_result_accepted(best):
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    
+    if best is None:
+        return "", None, 0.0
+    return best['text'], best['method'], best['mean_confidence']
+
+def run_ocr_page(gray):
+    """OCR one page inside a single pool process, trying candidates in order (batch mode).
+    
+    Batches parallelise across pages rather than across candidates, so each
+    worker walks the candidate list itself and stops at the first accepted one.
+    Returns the same tuple as run_ocr_search plus [(method, seconds), ...] for
+    the candidates tried, for the parent's metrics.
+    """
+    best = None
+    timings = []
+    for config, technique in get_ocr_candidates():
+        try:
+            result = run_ocr_candidate(gray, config, technique)
+        except ImportError:
+            continue  # OpenCV not available for preprocessing
+        
+        timings.append((result['method'], result['seconds']))
+        if not result['text'].strip():
+            continue
+        
+        if is_better_ocr_result(result, best):
+            best = result
+        if is_ocr_result_accepted(best):
+            break
+    
+    if best is None:
+        return "", None, 0.0, timings
+    return best['text'], best['method'], best['mean_confidence'], timings
+
+def build_ocr_response(text, best_config, mean_confidence):
+    """Shape an OCR result as the (payload, status) pair returned by /api/image-to-text"""
+    if not text:
+        return {
+            'error': 'No text could be detected in this image',
+            'suggestions': [
+                'Ensure the image contains clear, readable text',
+                'Try a higher resolution image',
+                'Make sure the text is not too small or blurry',
+                'Check that the image is not rotated or skewed'
+            ]
+        }, 400
+    
+    # Clean up the extracted text
+    text = re.sub(r'\n+', '\n', text)  # Remove excessive newlines
+    text = re.sub(r' +', ' ', text)    # Remove excessive spaces
+    text = text.strip()
+    
+    # Calculate confidence based on text length and quality
+    confidence = 'low'
+    if len(text) > 50 and len(text.split()) > 10:
+        confidence = 'high'
+    elif len(text) > 20 and len(text.split()) > 5:
+        confidence = 'medium'
+    
+    return {
+        'text': text,
+        'character_count': len(text),
+        'word_count': len(text.split()),
+        'confidence': confidence,
+        'mean_word_confidence': round(mean_confidence, 1),
+        'processing_method': best_config or 'Standard OCR'
+    }, 200
+
+def iter_batch_pages(uploads):
+    """Yield (source, page_number, gray_or_error) for every page in a batch upload.
+    
+    uploads is a list of (filename, bytes). Accepts plain images, multi-page TIFFs
+    and ZIP archives of either. Pages are decoded lazily, one at a time, so memory
+    follows the number of pages in flight rather than the size of the batch.
+    """
+    def unreadable(name, error):
+        logger.warning(f"Batch OCR could not decode {name}: {error}")
+        return ValueError('The image file may be corrupted or in an unsupported format')
+    
+    def expand(name, data):
+        extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+        if extension in ('tif', 'tiff'):
+            try:
+                with Image.open(io.BytesIO(data)) as tiff:
+                    for page_number, frame in enumerate(ImageSequence.Iterator(tiff), start=1):
+                        width, height = frame.size
+                        if width * height > OCR_MAX_SOURCE_PIXELS:
+                            yield name, page_number, ImageTooLargeError(f'Page is too large ({width}x{height})')
+                        else:
+                            yield name, page_number, downscale_for_ocr(np.asarray(frame.convert('L')))
+            except Exception as e:
+                yield name, 1, unreadable(name, e)
+        elif extension in OCR_IMAGE_EXTENSIONS:
+            try:
+                yield name, 1, decode_image_for_ocr(data)
+            except ImageTooLargeError as e:
+                yield name, 1, e
+            except Exception as e:
+                yield name, 1, unreadable(name, e)
+        else:
+            yield name, 1, ValueError('Unsupported file type')
+    
+    for filename, data in uploads:
+        if filename.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile as e:
+                yield filename, 1, unreadable(filename, e)
+                continue
+            
+            with archive:
+                for entry in sorted(archive.infolist(), key=lambda info: info.filename):
+                    entry_name = entry.filename.rsplit('/', 1)[-1]
+                    if entry.is_dir() or entry_name.startswith('.'):
+                        continue
+                    if entry.file_size > OCR_BATCH_MAX_ENTRY_MB * 1024 * 1024:
+                        yield f"{filename}/{entry.filename}", 1, ImageTooLargeError(f'Entry is larger than {OCR_BATCH_MAX_ENTRY_MB}MB')
+                        continue
+                    yield from expand(f"{filename}/{entry.filename}", archive.read(entry))
+        else:
+            yield from expand(filename, data)
+
+@app.route('/api/image-to-text/batch', methods=['POST'])
+def image_to_text_batch():
+    """OCR many images, multi-page TIFFs or ZIP archives, streaming one NDJSON line per page"""
+    files = [file for file in request.files.getlist('images') if file.filename]
+    if not files:
+        return jsonify({'error': 'No image files provided'}), 400
+    
+    log_request('/api/image-to-text/batch', ', '.join(file.filename for file in files), request.content_length / (1024 * 1024) if request.content_length else 0)
+    
+    if not get_ocr_engine_status()['available']:
+        return jsonify({
+            'error': 'OCR service unavailable. Tesseract is not installed or configured properly.',
+            'details': 'Please install Tesseract OCR: https://github.com/UB-Mannheim/tesseract/wiki'
+        }), 503
+    
+    # Upload streams are closed once the view returns, so take the bytes now
+    # (bounded by MAX_CONTENT_LENGTH)
+    uploads = [(secure_filename(file.filename), read_upload(file)) for file in files]
+    
+    def generate():
+        start_time = time.time()
+        executor = get_ocr_executor()
+        pages = iter_batch_pages(uploads)
+        pending = {}
+        page_index = 0
+        succeeded = failed = 0
+        exhausted = False
+        
+        def line(payload):
+            return json.dumps(payload) + '\n'
+        
+        try:
+            while True:
+                # Keep every worker busy without decoding the whole batch up front
+                while not exhausted and len(pending) < OCR_WORKERS * 2:
+                    try:
+                        source, page_number, page = next(pages)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    
+                    page_index += 1
+                    meta = {'page': page_index, 'source': source, 'source_page': page_number}
+                    if page_index > OCR_BATCH_MAX_PAGES:
+                        exhausted = True
+                        failed += 1
+                        yield line({**meta, 'status': 413, 'error': f'Batch exceeds {OCR_BATCH_MAX_PAGES} pages; remaining pages skipped'})
+                        break
+                    if isinstance(page, Exception):
+                        failed += 1
+                        status = 413 if isinstance(page, ImageTooLargeError) else 400
+                        yield line({**meta, 'status': status, 'error': str(page)})
+                        continue
+                    pending[executor.submit(run_ocr_page, page)] = meta
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    meta = pending.pop(future)
+                    try:
+                        text, best_config, mean_confidence, timings = future.result()
+                        for method, seconds in timings:
+                            OCR_CANDIDATE_SECONDS.observe(seconds, method)
+                        payload, status = build_ocr_response(text, best_config, mean_confidence)
+                    except Exception as ocr_error:
+                        logger.error(f"Batch OCR error on {meta['source']}: {str(ocr_error)}")
+                        payload, status = {'error': 'Error processing image'}, 500
+                    
+                    if status == 200:
+                        succeeded += 1
+                    else:
+                        failed += 1
+                    yield line({**meta, 'status': status, **payload})
+            
+            elapsed = time.time() - start_time
+            logger.info(f"Batch OCR finished: {succeeded} pages succeeded, {failed} failed in {elapsed:.2f}s")
+            yield line({'summary': {
+                'pages': succeeded + failed,
+                'succeeded': succeeded,
+                'failed': failed,
+                'processing_time': round(elapsed, 2)
+            }})
+        finally:
+            # Client went away: drop pages that haven't started
+            for future in pending:
+                future.cancel()
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+_capability_probes = {}
+_capability_probes_lock = threading.Lock()
+
+def probe_capability(name, probe):
+    """Run probe() once per process and cache its result under name"""
+    with _capability_probes_lock:
+        if name not in _capability_probes:
+            _capability_probes[name] = probe()
+        return _capability_probes[name]
+
+def get_ffmpeg_status():
+    """Whether ffmpeg can be run, probed once and cached for the life of the process"""
+    return probe_capability('ffmpeg', _probe_ffmpeg)
+
+def _probe_ffmpeg():
+    ffmpeg_path = shutil.which('ffmpeg')
+    try:
+        if ffmpeg_path is None:
+            raise FileNotFoundError('ffmpeg is not on PATH')
+        result = subprocess.run([ffmpeg_path, '-version'], capture_output=True, text=True, timeout=10, check=True)
+        match = re.match(r'ffmpeg version (\S+)', result.stdout)
+        version = match.group(1) if match else 'unknown'
+        logger.info(f"ffmpeg version: {version}")
+        return {'available': True, 'version': version}
+    except (subprocess.SubprocessError, OSError) as ffmpeg_error:
+        logger.warning(f"ffmpeg not available ({ffmpeg_error}), audio conversion falls back to pydub")
+        return {'available': False, 'version': None}
+
+def get_ffprobe_status():
+    """Whether ffprobe can be run (used to read audio headers), probed once per process"""
+    return probe_capability('ffprobe', _probe_ffprobe)
+
+def _probe_ffprobe():
+    ffprobe_path = shutil.which('ffprobe')
+    try:
+        if ffprobe_path is None:
+            raise FileNotFoundError('ffprobe is not on PATH')
+        result = subprocess.run([ffprobe_path, '-version'], capture_output=True, text=True, timeout=10, check=True)
+        match = re.match(r'ffprobe version (\S+)', result.stdout)
+        return {'available': True, 'version': match.group(1) if match else 'unknown'}
+    except (subprocess.SubprocessError, OSError) as ffprobe_error:
+        logger.info(f"ffprobe not available ({ffprobe_error}), audio headers are read from ffmpeg's banner")
+        return {'available': False, 'version': None}
+
+def get_opencv_status():
+    """Whether OpenCV is installed, probed once and cached for the life of the process"""
+    return probe_capability('opencv', _probe_opencv)
+
+def _probe_opencv():
+    if cv2.available():
+        return {'available': True, 'version': cv2.__version__}
+    logger.warning("OpenCV not installed, OCR decodes and resizes images with PIL")
+    return {'available': False, 'version': None}
+
+def get_capabilities():
+    """Cached availability of ffmpeg, ffprobe, Tesseract and OpenCV"""
+    return {
+        'ffmpeg': get_ffmpeg_status(),
+        'ffprobe': get_ffprobe_status(),
+        'tesseract': get_ocr_engine_status(),
+        'opencv': get_opencv_status()
+    }
+
+def warm_up():
+    """Import every engine and probe ffmpeg, ffprobe, Tesseract and OpenCV now rather than on first use.
+    
+    Pre-fork servers call this in the master process (see wsgi.py) so workers
+    inherit the loaded modules and probe results. OCR worker processes are
+    started separately, after the fork (warm_ocr_workers).
+    """
+    started = time.perf_counter()
+    for module in LAZY_MODULES:
+        module.available()
+    flac_encoder.encode(np.zeros(flac_encoder.BLOCK_SIZE, dtype=np.int16), 16000)  # Builds its CRC tables
+    capabilities = get_capabilities()
+    available = [name for name, status in capabilities.items() if status['available']]
+    logger.info(f"Warmed up in {time.perf_counter() - started:.2f}s (available: {', '.join(available) or 'none'})")
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus-style metrics for every server process"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint for monitoring"""
+    capabilities = get_capabilities()
+    if capabilities['ffmpeg']['available']:
+        audio_conversion = 'active'
+    else:
+        audio_conversion = 'degraded' if pydub.available() else 'unavailable'  # pydub alone decodes WAV only
+    
     return jsonify({
         'status': 'healthy',
         'version': '2.0',
         'services': {
-            'speech_recognition': 'active',
-            'image_processing': 'active',
-            'audio_conversion': 'active'
+            'speech_recognition': 'active' if sr.available() else 'unavailable',
+            'image_processing': 'active' if capabilities['tesseract']['available'] else 'unavailable',
+            'audio_conversion': audio_conversion
         },
+        'capabilities': capabilities,
         'supported_languages': list(SUPPORTED_LANGUAGES.keys()),
-        'max_file_size_mb': 50
+        'max_file_size_mb': 50,
+        'transcript_cache': transcript_cache.stats(),
+        'flac_encoder': flac_encoder_stats(),
+        'jobs': job_manager.stats(),
+        'resumable_uploads': resumable_uploads.stats(),
+        'live_sessions': live_sessions.count(),
+        'admission': {endpoint: limiter.stats() for endpoint, limiter in admission_limiters.items()},
+        'recognition_backends': {
+            name: backend.stats() for name, backend in recognition_backends.items()
+        },
+        'active_backends': [backend.name for backend in get_active_backends()],
+        'ocr_engine': capabilities['tesseract']
     }), 200
 
 def create_self_signed_cert(cert_file, key_file):
@@ -795,14 +4585,11 @@ def create_self_signed_cert(cert_file, key_file):
         from cryptography import x509
         from cryptography.x509.oid import NameOID
         from cryptography.hazmat.primitives import hashes, serialization
-        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.hazmat.primitives.asymmetric import ec
         import datetime
         
-        # Generate private key
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-        )
+        # Generate private key (P-256: generated in milliseconds, unlike large RSA keys)
+        private_key = ec.generate_private_key(ec.SECP256R1())
         
         # Create certificate
         subject = issuer = x509.Name([
@@ -872,7 +4659,7 @@ if __name__ == '__main__':
             try:
                 # Create self-signed certificate using OpenSSL (if available)
                 subprocess.run([
-                    'openssl', 'req', '-x509', '-newkey', 'rsa:4096', '-nodes', 
+                    'openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1', '-nodes',
                     '-out', cert_file, '-keyout', key_file, '-days', '365',
                     '-subj', '/C=VN/ST=HCM/L=HoChiMinh/O=EnglishPro/CN=localhost'
                 ], check=True, capture_output=True)
@@ -896,6 +4683,9 @@ if __name__ == '__main__':
         log = logging.getLogger('werkzeug')
         log.setLevel(logging.ERROR)
         
+        warm_up()
+        warm_ocr_workers()
+        
         # Run with SSL
         app.run(
             host='0.0.0.0',
@@ -916,6 +4706,9 @@ if __name__ == '__main__':
         log = logging.getLogger('werkzeug')
         log.setLevel(logging.ERROR)
         
+        warm_up()
+        warm_ocr_workers()
+        
         # Fallback to HTTP
         app.run(
             host='0.0.0.0',
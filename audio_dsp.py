@@ -0,0 +1,177 @@
+"""Array-backed DSP on 16-bit PCM: downmixing, resampling, gain and FIR filtering.
+
+Every function takes an int16 NumPy array (interleaved for multi-channel
+audio) and returns an int16 array. Work is done in fixed-size float32 blocks
+written straight into one preallocated output, so a 20-minute recording never
+exists as a full float copy. Filters are linear-phase windowed-sinc FIRs
+applied with FFT overlap-save, which keeps them vectorized (a first-order IIR
+like pydub's high_pass_filter needs a per-sample loop).
+"""
+import numpy as np
+
+BLOCK_SAMPLES = 1 << 16  # Samples processed per block (256KB of float32 scratch)
+FILTER_FFT_MIN_SIZE = 1 << 15  # FFT length for overlap-save filtering, grown for very long filters
+BLACKMAN_TRANSITION = 5.5  # Blackman-window FIR length per (sample rate / transition width)
+RESAMPLE_CUTOFF = 0.45  # Anti-aliasing cutoff as a fraction of the target sample rate
+RESAMPLE_TRANSITION = 0.1  # ...with this transition width, also relative to the target rate
+
+INT16_MIN = -32768
+INT16_MAX = 32767
+
+
+def as_samples(pcm):
+    """View 16-bit PCM bytes as an int16 array (no copy)"""
+    return np.frombuffer(pcm, dtype=np.int16)
+
+
+def _store(values, out, start):
+    """Round, clip and write a float block into the int16 output"""
+    np.rint(values, out=values)
+    np.clip(values, INT16_MIN, INT16_MAX, out=values)
+    out[start:start + len(values)] = values
+
+
+def downmix(samples, channels):
+    """Average interleaved channels into mono (returns samples unchanged when already mono)"""
+    if channels == 1:
+        return samples
+
+    frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    out = np.empty(len(frames), dtype=np.int16)
+    for start in range(0, len(frames), BLOCK_SAMPLES):
+        block = frames[start:start + BLOCK_SAMPLES]
+        mixed = block[:, 0].astype(np.float32)
+        for channel in range(1, channels):
+            mixed += block[:, channel]
+        mixed /= channels
+        _store(mixed, out, start)
+    return out
+
+
+def rms(samples):
+    """Root mean square of the samples, accumulated blockwise in float64"""
+    if len(samples) == 0:
+        return 0.0
+
+    total = 0.0
+    for start in range(0, len(samples), BLOCK_SAMPLES):
+        block = samples[start:start + BLOCK_SAMPLES].astype(np.float64)
+        total += float(np.dot(block, block))
+    return (total / len(samples)) ** 0.5
+
+
+def dbfs(samples):
+    """Loudness relative to 16-bit full scale (-inf for digital silence), as pydub's AudioSegment.dBFS"""
+    return rms_to_dbfs(rms(samples))
+
+
+def rms_to_dbfs(level):
+    """An RMS sample level in dBFS"""
+    return 20 * np.log10(level / 32768) if level else float('-inf')
+
+
+def apply_gain(samples, gain_db, out=None):
+    """Scale samples by gain_db with clipping. out may be samples itself to work in place."""
+    if out is None:
+        out = np.empty_like(samples)
+
+    factor = np.float32(10 ** (gain_db / 20))
+    for start in range(0, len(samples), BLOCK_SAMPLES):
+        block = samples[start:start + BLOCK_SAMPLES].astype(np.float32)
+        block *= factor
+        _store(block, out, start)
+    return out
+
+
+def normalize_gain_db(level_dbfs, target_dbfs=-20.0, max_change_db=20.0):
+    """Gain that brings audio at level_dbfs to target_dbfs, within max_change_db (0.0 for digital silence)"""
+    if not np.isfinite(level_dbfs):  # Digital silence: nothing to scale
+        return 0.0
+    return float(np.clip(target_dbfs - level_dbfs, -max_change_db, max_change_db))
+
+
+def normalize(samples, target_dbfs=-20.0, max_change_db=20.0, out=None):
+    """Bring the overall level to target_dbfs, changing it by at most max_change_db either way"""
+    change_db = normalize_gain_db(dbfs(samples), target_dbfs, max_change_db)
+    if change_db == 0.0 and out is None:
+        return samples
+    return apply_gain(samples, change_db, out)
+
+
+def _filter_length(sample_rate, transition_hz):
+    """Odd Blackman-window FIR length giving roughly the requested transition width"""
+    return int(np.ceil(BLACKMAN_TRANSITION * sample_rate / transition_hz)) | 1
+
+
+def lowpass_taps(sample_rate, cutoff_hz, transition_hz):
+    """Windowed-sinc low-pass FIR with unity gain at DC"""
+    n_taps = _filter_length(sample_rate, transition_hz)
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    taps = np.sinc(2 * cutoff_hz / sample_rate * n) * np.blackman(n_taps)
+    return taps / taps.sum()
+
+
+def highpass_taps(sample_rate, cutoff_hz, transition_hz):
+    """High-pass FIR by spectral inversion of the matching low-pass"""
+    taps = -lowpass_taps(sample_rate, cutoff_hz, transition_hz)
+    taps[len(taps) // 2] += 1
+    return taps
+
+
+def fir_filter(samples, taps):
+    """Filter with a linear-phase FIR using FFT overlap-save; the output is aligned with the input"""
+    n_taps = len(taps)
+    if len(samples) == 0:
+        return samples.copy()
+
+    fft_size = FILTER_FFT_MIN_SIZE
+    while fft_size < 4 * n_taps:
+        fft_size *= 2
+    step = fft_size - n_taps + 1  # Valid outputs per FFT
+    delay = (n_taps - 1) // 2  # Group delay of a linear-phase filter, removed from the output
+    taps_spectrum = np.fft.rfft(taps, fft_size)
+
+    out = np.empty(len(samples), dtype=np.int16)
+    segment = np.empty(fft_size, dtype=np.float32)
+    for start in range(0, len(samples), step):
+        # Output [start, start + step) needs input [start + delay - (n_taps - 1), start + step + delay)
+        first = start + delay - (n_taps - 1)
+        lo, hi = max(first, 0), min(first + fft_size, len(samples))
+        segment.fill(0)
+        segment[lo - first:hi - first] = samples[lo:hi]
+
+        filtered = np.fft.irfft(np.fft.rfft(segment) * taps_spectrum, fft_size)[n_taps - 1:]
+        _store(filtered[:len(samples) - start], out, start)
+    return out
+
+
+def high_pass(samples, sample_rate, cutoff_hz, transition_hz=None):
+    """Remove content below cutoff_hz (rolling off over one cutoff width by default)"""
+    return fir_filter(samples, highpass_taps(sample_rate, cutoff_hz, transition_hz or cutoff_hz))
+
+
+def low_pass(samples, sample_rate, cutoff_hz, transition_hz=None):
+    """Remove content above cutoff_hz (rolling off over a tenth of it by default)"""
+    return fir_filter(samples, lowpass_taps(sample_rate, cutoff_hz, transition_hz or cutoff_hz * 0.1))
+
+
+def resample(samples, from_rate, to_rate):
+    """Change the sample rate of mono samples (anti-aliased when downsampling)"""
+    if from_rate == to_rate or len(samples) == 0:
+        return samples
+
+    if to_rate < from_rate:
+        samples = low_pass(samples, from_rate, RESAMPLE_CUTOFF * to_rate, RESAMPLE_TRANSITION * to_rate)
+
+    step = from_rate / to_rate
+    n_out = int(len(samples) * to_rate // from_rate)
+    last = len(samples) - 1
+    out = np.empty(n_out, dtype=np.int16)
+    for start in range(0, n_out, BLOCK_SAMPLES):
+        positions = np.arange(start, min(start + BLOCK_SAMPLES, n_out), dtype=np.float64) * step
+        index = positions.astype(np.int64)
+        fraction = (positions - index).astype(np.float32)
+        left = samples[index].astype(np.float32)
+        right = samples[np.minimum(index + 1, last)].astype(np.float32)
+        _store(left + (right - left) * fraction, out, start)
+    return out
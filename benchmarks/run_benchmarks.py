@@ -0,0 +1,431 @@
+"""Offline benchmarks for the audio and OCR pipelines.
+
+Generates a synthetic corpus (speech-like tone bursts separated by silences of
+varying length, encoded with several codecs, and rendered text images at
+several DPIs), runs each pipeline stage against it with the offline `local`
+recognizer, and reports throughput, p50/p95 latency and peak RSS per case.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json --threshold 0.15
+
+With --compare, cases whose p50 latency grew (or throughput fell) by more than
+the threshold are flagged and the script exits with status 1.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+# The app reads these at import time: offline recognizer, no artificial latency
+os.environ.setdefault('RECOGNITION_BACKENDS', 'local')
+os.environ.setdefault('LOCAL_RECOGNIZER_LATENCY', '0')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+SAMPLE_RATE = 16000
+AUDIO_CODECS = {
+    'wav': ['-acodec', 'pcm_s16le'],
+    'mp3': ['-acodec', 'libmp3lame', '-b:a', '64k'],
+    'ogg': ['-acodec', 'libvorbis', '-q:a', '3'],
+    'webm': ['-acodec', 'libopus', '-b:a', '32k'],
+}
+AUDIO_DURATIONS = {'short': 15, 'long': 360}  # Seconds per corpus file (the long one is over AUDIO_SINGLE_SHOT_MAX_SECONDS, 55s: chunked path)
+IMAGE_DPIS = [72, 150, 300]
+COMPARE_NOISE_FLOOR_SECONDS = 0.005  # Slowdowns smaller than this are timer noise, whatever the percentage
+SAMPLE_TEXT = [
+    'The quick brown fox jumps over the lazy dog.',
+    'Today we are going to practice the present perfect tense.',
+    'Please repeat after me and pay attention to the pronunciation.',
+    'Listening carefully is the first step to speaking fluently.',
+]
+
+
+def synthesize_speech(duration_seconds, seed=0):
+    """Tone bursts with a voice-like harmonic spectrum and syllable-rate envelope, separated by pauses"""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = 0
+    while total < duration_seconds * SAMPLE_RATE:
+        burst = int(rng.uniform(0.8, 6.0) * SAMPLE_RATE)
+        t = np.arange(burst) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 8))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)  # ~4 syllables/s
+        pieces.append(voice * envelope * 6000)
+
+        pause = int(rng.choice([0.15, 0.4, 0.8, 1.5, 3.0]) * SAMPLE_RATE)
+        pieces.append(rng.normal(0, 30, pause))  # Room noise, not digital silence
+        total += burst + pause
+
+    samples = np.concatenate(pieces)[:duration_seconds * SAMPLE_RATE]
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path, samples):
+    import wave
+    with wave.open(path, 'wb') as wav_writer:
+        wav_writer.setnchannels(1)
+        wav_writer.setsampwidth(2)
+        wav_writer.setframerate(SAMPLE_RATE)
+        wav_writer.writeframes(samples.tobytes())
+
+
+def build_audio_corpus(corpus_dir):
+    """{case name: path} for every duration x codec ffmpeg can encode here"""
+    corpus = {}
+    for label, seconds in AUDIO_DURATIONS.items():
+        source = os.path.join(corpus_dir, f'{label}.wav')
+        write_wav(source, synthesize_speech(seconds, seed=seconds))
+        corpus[f'{label}.wav'] = source
+
+        if not shutil.which('ffmpeg'):
+            continue
+        for codec, args in AUDIO_CODECS.items():
+            if codec == 'wav':
+                continue
+            path = os.path.join(corpus_dir, f'{label}.{codec}')
+            result = subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-i', source, *args, path],
+                                    capture_output=True)
+            if result.returncode == 0:
+                corpus[f'{label}.{codec}'] = path
+    return corpus
+
+
+def build_image_corpus(corpus_dir):
+    """{case name: PNG bytes} of rendered text at several DPIs"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    corpus = {}
+    for dpi in IMAGE_DPIS:
+        font_size = max(8, round(12 * dpi / 72))  # 12pt text
+        try:
+            font = ImageFont.truetype('DejaVuSans.ttf', font_size)
+        except OSError:
+            font = ImageFont.load_default()
+
+        width, height = round(8.5 * dpi), round(3 * dpi)
+        image = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(SAMPLE_TEXT):
+            draw.text((dpi // 2, dpi // 2 + i * font_size * 1.6), line, fill='black', font=font)
+
+        path = os.path.join(corpus_dir, f'text_{dpi}dpi.png')
+        image.save(path, dpi=(dpi, dpi))
+        corpus[f'{dpi}dpi'] = path
+    return corpus
+
+
+def audio_seconds(path):
+    import wave
+    with wave.open(path, 'rb') as wav_reader:
+        return wav_reader.getnframes() / wav_reader.getframerate()
+
+
+def prepare_app():
+    import app
+    # Benchmarks measure our pipeline, not the pacing towards the real service
+    app.recognition_rate_limiter = app.TokenBucket(1e9, 1e9)
+    return app
+
+
+def case_convert(path, work_dir):
+    """convert_audio_to_wav with speech optimisation (ffmpeg, or the pydub fallback)"""
+    app = prepare_app()
+    output = os.path.join(work_dir, 'converted.wav')
+
+    def run():
+        if not app.convert_audio_to_wav(path, output, optimize_for_speech=True):
+            raise RuntimeError('conversion failed')
+    return run
+
+
+def case_convert_fallback(path, work_dir):
+    """convert_audio_to_wav through the pydub/audio_dsp fallback, with ffmpeg out of reach"""
+    if not path.endswith('.wav'):
+        return None  # Without ffmpeg, pydub can only decode WAV
+    os.environ['PATH'] = ''  # This case has a process of its own
+    return case_convert(path, work_dir)
+
+
+def case_normalize(path, work_dir):
+    """normalize_audio_levels on a decoded file"""
+    app = prepare_app()
+    samples, _ = app.load_pcm_samples(path)
+    return lambda: app.normalize_audio_levels(samples)
+
+
+def case_chunk(path, work_dir):
+    """VAD chunking (create_speech_chunks) of a decoded file"""
+    app = prepare_app()
+    samples, sample_rate = app.load_pcm_samples(path)
+    return lambda: app.create_speech_chunks(samples, sample_rate, app.RECOGNITION_MAX_CHUNK_MS)
+
+
+def case_encode(path, work_dir):
+    """In-process FLAC encoding of the recognizer payloads (one per VAD chunk)"""
+    if not path.endswith('.wav'):
+        return None  # Only the decoded PCM matters, not the codec it came from
+    app = prepare_app()
+    samples, sample_rate = app.load_pcm_samples(path)
+    chunks = [samples[start:end] for start, end in app.create_speech_chunks(samples, sample_rate, app.RECOGNITION_MAX_CHUNK_MS)]
+    return lambda: [app.flac_encoder.encode(chunk, sample_rate) for chunk in chunks]
+
+
+def case_streaming_decode(path, work_dir):
+    """StreamingDecoder: ffmpeg decode plus incremental VAD, without recognition"""
+    if not shutil.which('ffmpeg'):
+        return None
+    app = prepare_app()
+    return lambda: sum(1 for _ in app.StreamingDecoder(path))
+
+
+def case_transcribe(path, work_dir):
+    """transcribe_audio_file end to end with the stubbed recognizer"""
+    app = prepare_app()
+    file_size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    def run():
+        with app.app.app_context():
+            _, status = app.transcribe_audio_file(path, 'en-US', file_size_mb, work_dir)
+        if status != 200:
+            raise RuntimeError(f'transcription returned {status}')
+    return run
+
+
+def case_ocr_decode(path, work_dir):
+    """decode_image_for_ocr from the uploaded bytes"""
+    app = prepare_app()
+    with open(path, 'rb') as f:
+        data = f.read()
+    return lambda: app.decode_image_for_ocr(data)
+
+
+def case_ocr(path, work_dir):
+    """Full OCR config search (needs the tesseract binary)"""
+    app = prepare_app()
+    if not app.get_ocr_engine_status()['available']:
+        return None
+    with open(path, 'rb') as f:
+        gray = app.decode_image_for_ocr(f.read())
+    app.warm_ocr_workers()
+    return lambda: app.run_ocr_search(gray)
+
+
+AUDIO_CASES = {
+    'convert': case_convert,
+    'convert_fallback': case_convert_fallback,
+    'normalize': case_normalize,
+    'chunk': case_chunk,
+    'encode': case_encode,
+    'streaming_decode': case_streaming_decode,
+    'transcribe': case_transcribe,
+}
+IMAGE_CASES = {
+    'ocr_decode': case_ocr_decode,
+    'ocr': case_ocr,
+}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process.
+    
+    VmHWM starts afresh with the new address space of the spawned process;
+    ru_maxrss does not (Linux carries it over from the parent across exec).
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # Bytes on macOS, KB elsewhere
+
+
+def run_case(stage, factory, path, repeat, units, result_queue):
+    """Time one case in a fresh process so its peak RSS is its own"""
+    import logging
+    logging.disable(logging.WARNING)  # Keep the app's per-request logging out of the report
+
+    work_dir = tempfile.mkdtemp(prefix='bench-')
+    try:
+        run = factory(path, work_dir)
+        if run is None:
+            result_queue.put({'skipped': 'not available for this input in this environment'})
+            return
+
+        run()  # Warm-up: imports, caches, worker start-up
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - started)
+
+        p50 = float(np.percentile(latencies, 50))
+        result_queue.put({
+            'iterations': repeat,
+            'p50_seconds': round(p50, 6),
+            'p95_seconds': round(float(np.percentile(latencies, 95)), 6),
+            'mean_seconds': round(float(np.mean(latencies)), 6),
+            'throughput': round(units[0] / p50, 3) if p50 > 0 else None,
+            'throughput_unit': units[1],
+            'peak_rss_mb': peak_rss_mb(),
+        })
+    except Exception as e:
+        result_queue.put({'error': f'{type(e).__name__}: {e}'})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutdown_app_pools()
+
+
+def shutdown_app_pools():
+    """Stop the OCR process pool before this process exits.
+    
+    multiprocessing joins child processes at exit before concurrent.futures
+    has told its workers to stop, so a live pool would hang the case process.
+    """
+    app = sys.modules.get('app')
+    if app is not None and app._ocr_executor is not None:
+        app._ocr_executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_isolated(stage, factory, path, repeat, units):
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=run_case, args=(stage, factory, path, repeat, units, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def run_benchmarks(repeat, only=None):
+    corpus_dir = tempfile.mkdtemp(prefix='bench-corpus-')
+    try:
+        audio_corpus = build_audio_corpus(corpus_dir)
+        image_corpus = build_image_corpus(corpus_dir)
+
+        cases = []
+        for name, path in audio_corpus.items():
+            seconds = audio_seconds(audio_corpus[name.split('.')[0] + '.wav'])
+            for stage, factory in AUDIO_CASES.items():
+                cases.append((f'audio/{stage}/{name}', stage, factory, path, (seconds, 'audio_seconds_per_second')))
+        for name, path in image_corpus.items():
+            for stage, factory in IMAGE_CASES.items():
+                cases.append((f'image/{stage}/{name}', stage, factory, path, (1, 'images_per_second')))
+
+        results = {}
+        for case_name, stage, factory, path, units in cases:
+            if only and not any(pattern in case_name for pattern in only):
+                continue
+            result = run_isolated(stage, factory, path, repeat, units)
+            results[case_name] = result
+            print(format_result(case_name, result), flush=True)
+        return results
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+def format_result(case_name, result):
+    if 'skipped' in result:
+        return f'{case_name:<40} skipped ({result["skipped"]})'
+    if 'error' in result:
+        return f'{case_name:<40} ERROR {result["error"]}'
+    return (f'{case_name:<40} p50 {result["p50_seconds"] * 1000:9.1f}ms  p95 {result["p95_seconds"] * 1000:9.1f}ms  '
+            f'{result["throughput"]:>10} {result["throughput_unit"]}  rss {result["peak_rss_mb"]}MB')
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': bool(shutil.which('ffmpeg')),
+    }
+
+
+def compare(current, baseline, threshold):
+    """Cases whose p50 latency grew, or whose throughput fell, by more than threshold (a fraction).
+
+    Returns (case name, description, relative change) tuples.
+    """
+    regressions = []
+    for case_name, result in current.items():
+        before = baseline.get(case_name)
+        if not before or 'p50_seconds' not in before or 'p50_seconds' not in result:
+            continue
+
+        delta = result['p50_seconds'] - before['p50_seconds']
+        if delta <= COMPARE_NOISE_FLOOR_SECONDS:
+            continue
+
+        change = delta / before['p50_seconds']
+        if change > threshold:
+            regressions.append((
+                case_name, f"p50 {before['p50_seconds'] * 1000:.1f}ms -> {result['p50_seconds'] * 1000:.1f}ms", change
+            ))
+            continue
+
+        # Throughput also depends on the input size, which changes when the corpus does
+        if (before.get('throughput') and result.get('throughput') is not None
+                and before.get('throughput_unit') == result.get('throughput_unit')):
+            change = result['throughput'] / before['throughput'] - 1
+            if -change > threshold:
+                regressions.append((
+                    case_name,
+                    f"throughput {before['throughput']} -> {result['throughput']} {result['throughput_unit']}",
+                    change
+                ))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the audio and OCR pipelines on a synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='timed iterations per case (default 5)')
+    parser.add_argument('--only', nargs='*', help='run only cases whose name contains one of these strings')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='flag cases whose p50 grew, or throughput fell, by more than this fraction (default 0.10)')
+    args = parser.parse_args()
+
+    report = {'environment': environment_info(), 'results': run_benchmarks(args.repeat, args.only)}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline['results'], args.threshold)
+        if regressions:
+            print(f'\nRegressions against {args.compare} (threshold {args.threshold:.0%}):')
+            for case_name, description, change in regressions:
+                print(f'  {case_name:<40} {description} ({change:+.0%})')
+            sys.exit(1)
+        print(f'\nNo regressions against {args.compare} (threshold {args.threshold:.0%})')
+
+
+if __name__ == '__main__':
+    main()
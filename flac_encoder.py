@@ -0,0 +1,243 @@
+"""In-process FLAC encoding of 16-bit mono PCM, for recognizer payloads.
+
+speech_recognition's AudioData.get_flac_data pipes a WAV through the flac
+binary on every call. This encoder is plain NumPy and roughly matches flac -0:
+each block is coded with the best of FLAC's fixed polynomial predictors
+(orders 0-4) and one Rice parameter, or stored constant or verbatim when that
+is smaller. Frames are encoded a group at a time: predictors are chosen for
+the whole group at once, variable-length codes are packed straight into 64-bit
+words, and every frame's CRC-16 comes from one gather over per-position tables.
+"""
+import hashlib
+import threading
+
+import numpy as np
+
+BLOCK_SIZE = 1152  # Samples per frame, as libFLAC's fastest preset
+GROUP_FRAMES = 64  # Frames encoded per pass, which bounds scratch memory to a few MB
+MAX_FIXED_ORDER = 4
+MAX_RICE_PARAMETER = 14  # 15 is the escape code of a 4-bit Rice parameter
+
+# Frame header sample rate codes; other rates are read from STREAMINFO (code 0)
+SAMPLE_RATE_CODES = {
+    88200: 1, 176400: 2, 192000: 3, 8000: 4, 16000: 5, 22050: 6,
+    24000: 7, 32000: 8, 44100: 9, 48000: 10, 96000: 11
+}
+BLOCK_SIZE_CODE = 3  # 576 * 2 ** (3 - 2) = 1152
+BLOCK_SIZE_CODE_EXPLICIT = 7  # Block size - 1 follows the frame number as 16 bits
+
+SUBFRAME_CONSTANT = 0
+SUBFRAME_VERBATIM = 1
+SUBFRAME_FIXED = 8  # Plus the predictor order
+
+
+def _crc_table(polynomial, width):
+    """Byte-at-a-time table for an MSB-first CRC"""
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial if crc & top else crc << 1) & mask
+        table.append(crc)
+    return table
+
+
+CRC8_TABLE = _crc_table(0x07, 8)
+CRC16_TABLE = np.array(_crc_table(0x8005, 16), dtype=np.uint16)
+
+_crc16_positional = None
+_crc16_lock = threading.Lock()
+
+
+def _crc16_by_position():
+    """[d, b]: CRC-16 contribution of byte b followed by d more bytes in the frame.
+
+    The CRC (initial value 0) is linear in the message, so a frame's CRC is the
+    XOR of these entries over its bytes. Built once; frames never exceed a
+    verbatim frame, so BLOCK_SIZE bounds the table (about 1.2MB).
+    """
+    global _crc16_positional
+    with _crc16_lock:
+        if _crc16_positional is None:
+            table = np.empty((2 * BLOCK_SIZE + 32, 256), dtype=np.uint16)
+            table[0] = CRC16_TABLE
+            for distance in range(1, len(table)):
+                previous = table[distance - 1]
+                table[distance] = (previous << 8) ^ CRC16_TABLE[previous >> 8]
+            _crc16_positional = table
+        return _crc16_positional
+
+
+def encode(samples, sample_rate):
+    """FLAC stream for int16 mono samples (a bytes-like PCM buffer is viewed in place)"""
+    samples = np.frombuffer(samples, dtype=np.int16) if not isinstance(samples, np.ndarray) else samples
+    block_size = min(BLOCK_SIZE, max(len(samples), 16))
+    rate_code = SAMPLE_RATE_CODES.get(sample_rate, 0)
+
+    parts = [_stream_header(samples, sample_rate, block_size)]
+    group_samples = block_size * GROUP_FRAMES
+    for first in range(0, len(samples), group_samples):
+        group = samples[first:first + group_samples]
+        parts.append(_encode_group(group, first // block_size, block_size, rate_code))
+    return b''.join(parts)
+
+
+def _stream_header(samples, sample_rate, block_size):
+    """fLaC marker and the STREAMINFO block (frame sizes left unknown)"""
+    info = (
+        (block_size << 16 | block_size).to_bytes(4, 'big')
+        + bytes(6)
+        + (sample_rate << 44 | 0 << 41 | 15 << 36 | len(samples)).to_bytes(8, 'big')
+        + hashlib.md5(samples.astype('<i2', copy=False).tobytes()).digest()
+    )
+    return b'fLaC' + bytes([0x80]) + len(info).to_bytes(3, 'big') + info
+
+
+def _frame_header(number, block_size, rate_code):
+    """Fixed-blocksize mono 16-bit frame header, ending in its CRC-8"""
+    block_code = BLOCK_SIZE_CODE if block_size == BLOCK_SIZE else BLOCK_SIZE_CODE_EXPLICIT
+    header = bytearray(b'\xff\xf8')
+    header.append(block_code << 4 | rate_code)
+    header.append(0x08)  # Mono, 16 bits per sample
+    header += chr(number).encode('utf-8', 'surrogatepass')  # FLAC's UTF-8-style frame number
+    if block_code == BLOCK_SIZE_CODE_EXPLICIT:
+        header += (block_size - 1).to_bytes(2, 'big')
+
+    crc = 0
+    for byte in header:
+        crc = CRC8_TABLE[crc ^ byte]
+    header.append(crc)
+    return header
+
+
+def _encode_group(group, first_number, block_size, rate_code):
+    """Encode up to GROUP_FRAMES consecutive frames; returns their bytes"""
+    n_full = len(group) // block_size
+    blocks = []
+    if n_full:
+        blocks.append(group[:n_full * block_size].reshape(n_full, block_size))
+    if len(group) > n_full * block_size:
+        blocks.append(group[n_full * block_size:].reshape(1, -1))
+
+    values, widths, frame_bits = [], [], []
+    number = first_number
+    for matrix in blocks:
+        for subframe_values, subframe_widths, bits in _encode_subframes(matrix):
+            header = _frame_header(number, matrix.shape[1], rate_code)
+            bits += 8 * len(header)
+            padding = -bits % 8
+            values += [np.frombuffer(header, dtype=np.uint8), subframe_values, [0, 0]]
+            widths += [np.full(len(header), 8), subframe_widths, [padding, 16]]  # Zero padding, CRC-16 placeholder
+            frame_bits.append(bits + padding + 16)
+            number += 1
+
+    data = _pack_bits(
+        np.concatenate(values).astype(np.uint64),
+        np.concatenate(widths).astype(np.int64)
+    )
+    _fill_crc16(data, np.array(frame_bits) // 8)
+    return data.tobytes()
+
+
+def _encode_subframes(matrix):
+    """Yield (values, widths, bits) of the cheapest subframe for each row of equal-length blocks"""
+    rows, length = matrix.shape
+    max_order = min(MAX_FIXED_ORDER, length - 1)
+
+    # Fixed predictor of order o = o-th difference; estimate each order's cost from its mean residual
+    residuals = [matrix.astype(np.int32)]
+    for _ in range(max_order):
+        residuals.append(np.diff(residuals[-1], axis=1))
+    estimates = np.empty((max_order + 1, rows))
+    parameters = np.empty((max_order + 1, rows), dtype=np.int64)
+    for order, residual in enumerate(residuals):
+        count = length - order
+        total = 2 * np.abs(residual).sum(axis=1, dtype=np.int64)  # Sum of zigzag-coded residuals, near enough
+        parameter = np.clip(np.floor(np.log2(np.maximum(total / count, 1))), 0, MAX_RICE_PARAMETER).astype(np.int64)
+        parameters[order] = parameter
+        estimates[order] = 16 * order + count * (parameter + 1) + (total >> parameter)
+    orders = estimates.argmin(axis=0)
+
+    # Exact Rice codes for the chosen order of each row
+    coded = [None] * rows
+    for order in np.unique(orders):
+        selected = np.flatnonzero(orders == order)
+        residual = residuals[order][selected].astype(np.int64)
+        zigzag = (residual << 1) ^ (residual >> 63)
+        parameter = _best_rice_parameter(zigzag, parameters[order][selected])[:, None]
+        code_widths = (zigzag >> parameter) + 1 + parameter  # Unary quotient, stop bit, remainder
+        code_values = (1 << parameter) | (zigzag & ((1 << parameter) - 1))
+        bits = code_widths.sum(axis=1)
+        for i, row in enumerate(selected):
+            coded[row] = (int(order), int(parameter[i, 0]), code_values[i], code_widths[i], int(bits[i]))
+
+    is_constant = matrix.min(axis=1) == matrix.max(axis=1)
+    for row in range(rows):
+        samples = matrix[row]
+        order, parameter, code_values, code_widths, bits = coded[row]
+        fixed_bits = 8 + 16 * order + 10 + bits
+        if is_constant[row]:
+            yield [SUBFRAME_CONSTANT << 1, int(samples[0]) & 0xFFFF], [8, 16], 24
+        elif fixed_bits >= 8 + 16 * length:
+            yield (
+                np.concatenate(([SUBFRAME_VERBATIM << 1], samples.astype(np.int64) & 0xFFFF)),
+                np.concatenate(([8], np.full(length, 16))),
+                8 + 16 * length
+            )
+        else:
+            # Subframe header, warm-up samples, Rice method 0 with partition order 0 and one parameter
+            header = [(SUBFRAME_FIXED + order) << 1] + [int(x) & 0xFFFF for x in samples[:order]] + [parameter]
+            header_widths = [8] + [16] * order + [10]
+            yield (
+                np.concatenate((header, code_values)),
+                np.concatenate((header_widths, code_widths)),
+                fixed_bits
+            )
+
+
+def _best_rice_parameter(zigzag, estimate):
+    """Cheapest Rice parameter per row among the estimate and its neighbours"""
+    candidates = np.clip(estimate[:, None] + np.array([-1, 0, 1]), 0, MAX_RICE_PARAMETER)
+    costs = np.stack([
+        (zigzag >> candidates[:, [i]]).sum(axis=1) + zigzag.shape[1] * (candidates[:, i] + 1)
+        for i in range(candidates.shape[1])
+    ], axis=1)
+    return candidates[np.arange(len(candidates)), costs.argmin(axis=1)]
+
+
+def _pack_bits(values, widths):
+    """Concatenate MSB-first bit fields into bytes; each value must fit its width.
+
+    A field's bits land in the 64-bit word holding its last bit, and in the word
+    before when it straddles a boundary. Fields are disjoint, so each word is the
+    OR of its fields' parts.
+    """
+    ends = np.cumsum(widths)
+    total_bits = int(ends[-1])
+    last = np.maximum(ends - 1, 0)
+    word = last >> 6
+    shift = (63 - (last & 63)).astype(np.uint64)
+    low = values << shift
+    high = (values >> np.uint64(1)) >> (np.uint64(63) - shift)  # values >> (64 - shift), without shifting by 64
+
+    words = np.zeros((total_bits + 63) // 64, dtype=np.uint64)
+    starts = np.flatnonzero(np.diff(word, prepend=-1))
+    words[word[starts]] = np.bitwise_or.reduceat(low, starts)
+    straddling = np.flatnonzero(high)
+    words[word[straddling] - 1] |= high[straddling]
+    return words.byteswap().view(np.uint8)[:total_bits // 8]
+
+
+def _fill_crc16(data, frame_lengths):
+    """Write each frame's CRC-16 into its last two bytes (zero until now)"""
+    ends = np.cumsum(frame_lengths)
+    crc_at = ends - 2
+    # Distance of every byte to the end of its frame's CRC-covered part; the zero
+    # placeholders clip to 0 and contribute nothing
+    distance = np.repeat(crc_at - 1, frame_lengths) - np.arange(len(data))
+    contributions = _crc16_by_position()[np.maximum(distance, 0), data]
+    crcs = np.bitwise_xor.reduceat(contributions, ends - frame_lengths)
+    data[crc_at] = crcs >> 8
+    data[crc_at + 1] = crcs & 0xFF
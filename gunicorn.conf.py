@@ -0,0 +1,65 @@
+"""Gunicorn settings for running EnglishPro with several worker processes.
+
+Start with:  gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden through the environment variables below.
+"""
+import multiprocessing
+import os
+import tempfile
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# Pre-forked processes sidestep the GIL for pydub/NumPy/OpenCV work; threads
+# cover the time requests spend waiting on ffmpeg and the recognition service
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count))
+threads = int(os.environ.get('WEB_THREADS', 4))
+
+# Import the app (speech_recognition, pydub, NumPy, PIL, OpenCV) once in the
+# master so workers start fast and share those pages copy-on-write
+preload_app = True
+
+# Recycle workers to cap memory growth; jitter keeps them from restarting together
+max_requests = int(os.environ.get('MAX_REQUESTS', 500))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', 50))
+
+# Long uploads and transcriptions: no worker is killed mid-request, and a
+# stopping worker gets this long to finish in-flight requests and jobs
+timeout = int(os.environ.get('WORKER_TIMEOUT', 300))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 120))
+
+# Optional TLS termination (browsers only allow the microphone over HTTPS)
+certfile = os.environ.get('SSL_CERTFILE')
+keyfile = os.environ.get('SSL_KEYFILE')
+
+# Each worker has its own OCR process pool: split the cores between them
+os.environ.setdefault('OCR_WORKERS', str(max(1, cpu_count // workers)))
+# ...and admission control sizes each worker's concurrency limits from its share
+os.environ.setdefault('ADMISSION_CORES', str(max(1, cpu_count // workers)))
+
+# Background jobs live in the process that accepted them; snapshots in a
+# shared directory let any worker answer polls and cancellations
+os.environ.setdefault('JOB_STATE_DIR', os.path.join(tempfile.gettempdir(), 'englishpro-jobs'))
+
+# Each worker publishes its metrics here so /api/metrics reports the whole server
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'englishpro-metrics'))
+
+accesslog = os.environ.get('ACCESS_LOG')  # e.g. '-' for stdout
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Start this worker's OCR processes before it takes requests"""
+    from app import warm_ocr_workers
+    warm_ocr_workers()
+
+
+def worker_exit(server, worker):
+    """Let background transcription jobs finish before the worker goes away"""
+    from app import job_manager
+    unfinished = job_manager.drain(timeout=graceful_timeout)
+    if unfinished:
+        server.log.warning(f"Worker {worker.pid} exiting with {unfinished} unfinished transcription jobs")
@@ -26,6 +26,12 @@ document.addEventListener('DOMContentLoaded', function() {
     // Store transcribed text globally for access across functions
     let transcribedText = '';
     let processingAbortController = null;
+    
+    // Large files go through the resumable upload API: parts that fail are resent
+    // from the server's offset instead of restarting the whole upload. Their
+    // transcript is streamed back chunk by chunk.
+    const RESUMABLE_UPLOAD_MIN_BYTES = 10 * 1024 * 1024;
+    const UPLOAD_RETRY_DELAYS_MS = [1000, 2000, 5000, 10000, 20000, 30000];
 
     // Performance optimization: Debounced file validation
     let fileValidationTimeout;
@@ -216,9 +222,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         processingAbortController = new AbortController();
         
-        const formData = new FormData();
-        formData.append('audio', file);
-        
         // Reset previous results
         transcribedText = '';
         
@@ -235,23 +238,17 @@ document.addEventListener('DOMContentLoaded', function() {
         const fileSizeMB = file.size / (1024 * 1024);
         const estimatedTimeSeconds = Math.max(15, Math.min(300, fileSizeMB * 4));
         
-        console.log("📤 Sending request to /api/audio-to-text");
+        const signal = processingAbortController.signal;
+        let transcription;
+        if (file.size <= RESUMABLE_UPLOAD_MIN_BYTES) {
+            transcription = createTranscriptionJob(file, signal).then(job => pollTranscriptionJob(job, signal));
+        } else if (window.crypto && crypto.subtle) {
+            transcription = uploadResumable(file, signal);
+        } else {
+            transcription = streamTranscription(file, signal);  // No hashing outside secure contexts: one upload
+        }
         
-        // Send to server with enhanced error handling
-        fetch('/api/audio-to-text', {
-            method: 'POST',
-            body: formData,
-            signal: processingAbortController.signal
-        })
-        .then(response => {
-            console.log("📥 Server response status:", response.status);
-            
-            if (!response.ok) {
-                throw new Error(`Server error ${response.status}: ${response.statusText}`);
-            }
-            
-            return response.json();
-        })
+        transcription
         .then(data => {
             console.log("✅ Response data received");
             handleSuccessfulTranscription(data);
@@ -274,6 +271,258 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function createTranscriptionJob(file, signal) {
+        console.log("📤 Creating transcription job");
+        
+        const formData = new FormData();
+        formData.append('audio', file);
+        
+        // Start a background job; the caller polls it for progress
+        return fetch('/api/jobs', {
+            method: 'POST',
+            body: formData,
+            signal
+        }).then(response => {
+            console.log("📥 Server response status:", response.status);
+            return readJsonResponse(response);
+        });
+    }
+
+    function readJsonResponse(response) {
+        if (!response.ok) {
+            return response.json()
+                .catch(() => ({}))
+                .then(data => {
+                    throw new Error(data.error || `Server error ${response.status}: ${response.statusText}`);
+                });
+        }
+        return response.json();
+    }
+
+    async function uploadResumable(file, signal) {
+        console.log("📤 Starting resumable upload");
+        const upload = await fetch('/api/uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size }),
+            signal
+        }).then(readJsonResponse);
+        
+        // Drop the server-side upload if the user starts another one
+        signal.addEventListener('abort', () => {
+            fetch(upload.upload_url, { method: 'DELETE' }).catch(() => {});
+        }, { once: true });
+        
+        let offset = upload.offset;
+        let failures = 0;
+        while (offset < file.size) {
+            updateUploadProgress(offset, file.size);
+            const part = file.slice(offset, offset + upload.max_part_bytes);
+            
+            let response = null;
+            try {
+                response = await fetch(upload.upload_url, {
+                    method: 'PATCH',
+                    headers: {
+                        'Content-Type': 'application/offset+octet-stream',
+                        'Upload-Offset': String(offset),
+                        'Upload-Checksum': `sha256 ${await sha256Base64(part)}`
+                    },
+                    body: part,
+                    signal
+                });
+            } catch (error) {
+                if (error.name === 'AbortError') {
+                    throw error;
+                }
+                console.warn('⚠️ Upload part failed:', error.message);  // Connection dropped: retry below
+            }
+            
+            if (response && (response.ok || response.status === 409)) {
+                // 409: the server holds a different offset (e.g. a part we saw fail did land) - continue from there
+                offset = (await response.json()).offset;
+                failures = 0;
+                continue;
+            }
+            if (response && response.status !== 422 && response.status !== 429 && response.status < 500) {
+                return readJsonResponse(response);  // Not worth retrying: surface the error
+            }
+            
+            if (failures >= UPLOAD_RETRY_DELAYS_MS.length) {
+                throw new Error('Upload failed after several retries. Please check your connection.');
+            }
+            progressStatus.textContent = 'Connection problem - resuming upload...';
+            await new Promise(resolve => setTimeout(resolve, UPLOAD_RETRY_DELAYS_MS[failures++]));
+            
+            // Ask the server where to resume
+            const status = await fetch(upload.upload_url, { signal })
+                .then(response => response.ok ? response.json() : null)
+                .catch(error => {
+                    if (error.name === 'AbortError') {
+                        throw error;
+                    }
+                    return null;
+                });
+            if (status) {
+                offset = status.offset;
+            }
+        }
+        
+        // Long recordings were already being recognized while they uploaded
+        progressFill.style.width = '90%';
+        progressStatus.textContent = 'Finishing transcription...';
+        return fetch(`${upload.finalize_url}?stream=ndjson`, { method: 'POST', signal }).then(readTranscriptionStream);
+    }
+
+    function streamTranscription(file, signal) {
+        console.log("📤 Uploading for a streamed transcription");
+        const formData = new FormData();
+        formData.append('audio', file);
+        
+        progressFill.style.width = '5%';
+        progressStatus.textContent = 'Uploading...';
+        return fetch('/api/audio-to-text?stream=ndjson', {
+            method: 'POST',
+            body: formData,
+            signal
+        }).then(readTranscriptionStream);
+    }
+
+    async function readTranscriptionStream(response) {
+        // Errors found before transcription starts come back as plain JSON
+        if (!response.ok || !(response.headers.get('Content-Type') || '').includes('ndjson')) {
+            return readJsonResponse(response);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const partials = [];
+        let buffered = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+            
+            const lines = buffered.split('\n');
+            buffered = lines.pop();  // Keep an incomplete last line for the next read
+            for (const line of lines.filter(line => line.trim())) {
+                const event = JSON.parse(line);
+                if (event.event === 'progress') {
+                    updateJobProgress({ status: 'running', progress: event });
+                } else if (event.event === 'chunk') {
+                    renderPartialTranscript(partials, event);
+                } else if (event.event === 'result') {
+                    if (event.status !== 200) {
+                        throw new Error(event.error || `Server error ${event.status}`);
+                    }
+                    return event;
+                }
+            }
+            
+            if (done) {
+                throw new Error('Connection closed before the transcription finished');
+            }
+        }
+    }
+
+    function renderPartialTranscript(partials, chunk) {
+        if (!chunk.text) {
+            return;
+        }
+        
+        // Chunks finish out of order: keep them sorted by their position in the recording
+        partials[chunk.index] = chunk.text;
+        const partialText = partials.filter(text => text).join(' ');
+        
+        textResult.innerHTML = `
+            <div class="result-content live-transcript">
+                <div class="result-header">
+                    <h4>⏳ Partial Transcript (${partials.filter(text => text).length} segments so far)</h4>
+                </div>
+                <div class="transcription-text">${formatTextWithParagraphs(partialText)}</div>
+            </div>
+        `;
+    }
+
+    async function sha256Base64(blob) {
+        const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+        return btoa(String.fromCharCode(...new Uint8Array(digest)));
+    }
+
+    function updateUploadProgress(offset, size) {
+        const percent = (offset / size) * 100;
+        progressFill.style.width = `${5 + percent * 0.85}%`;
+        progressStatus.textContent = `Uploading... ${Math.round(percent)}%`;
+    }
+
+    function pollTranscriptionJob(job, signal) {
+        const statusUrl = job.status_url || `/api/jobs/${job.job_id}`;
+        let pollDelay = 1000;
+        
+        // Cancel the server-side job if the user starts another upload
+        signal.addEventListener('abort', () => {
+            fetch(statusUrl, { method: 'DELETE' }).catch(() => {});
+        }, { once: true });
+        
+        return new Promise((resolve, reject) => {
+            function handleJobState(state) {
+                updateJobProgress(state);
+                
+                if (state.status === 'completed') {
+                    resolve(state.result);
+                } else if (state.status === 'failed') {
+                    reject(new Error(state.error || 'Transcription failed'));
+                } else if (state.status === 'cancelled') {
+                    reject(new DOMException('Job was cancelled', 'AbortError'));
+                } else {
+                    // Back off gradually for long recordings
+                    setTimeout(poll, pollDelay);
+                    pollDelay = Math.min(pollDelay * 1.25, 3000);
+                }
+            }
+            
+            function poll() {
+                if (signal.aborted) {
+                    reject(new DOMException('Request was cancelled', 'AbortError'));
+                    return;
+                }
+                
+                fetch(statusUrl, { signal })
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error(`Server error ${response.status}: ${response.statusText}`);
+                        }
+                        return response.json();
+                    })
+                    .then(handleJobState)
+                    .catch(reject);
+            }
+            
+            handleJobState(job);
+        });
+    }
+
+    function updateJobProgress(state) {
+        const progress = state.progress || {};
+        const finishedChunks = (progress.chunks_done || 0) + (progress.chunks_failed || 0);
+        
+        if (state.status === 'queued') {
+            progressFill.style.width = '5%';
+            progressStatus.textContent = 'Waiting for a free worker...';
+        } else if (state.status === 'running' && progress.chunks_total) {
+            // Keep some room at the end for merging and post-processing
+            const percent = progress.chunks_total_known
+                ? 10 + (finishedChunks / progress.chunks_total) * 85
+                : 10 + Math.min(40, finishedChunks * 5);
+            const totalLabel = progress.chunks_total_known ? progress.chunks_total : `${progress.chunks_total}+`;
+            progressFill.style.width = `${percent}%`;
+            progressStatus.textContent = `Recognizing speech... ${finishedChunks}/${totalLabel} segments`;
+        } else if (state.status === 'running') {
+            progressFill.style.width = '10%';
+            progressStatus.textContent = 'Processing audio data...';
+        }
+    }
+
     function showEnhancedProcessingState(file) {
         conversionProgress.classList.add('show');
         progressFill.style.width = '0%';
@@ -290,37 +539,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 </div>
             </div>
         `;
-        
-        // Enhanced progress simulation with realistic stages
-        simulateEnhancedProgress();
-    }
 
-    function simulateEnhancedProgress() {
-        const stages = [
-            { progress: 10, text: 'Uploading audio file...', duration: 1000 },
-            { progress: 25, text: 'Analyzing audio format...', duration: 1500 },
-            { progress: 40, text: 'Processing audio data...', duration: 2000 },
-            { progress: 60, text: 'Running speech recognition...', duration: 3000 },
-            { progress: 80, text: 'Optimizing transcription...', duration: 2000 },
-            { progress: 95, text: 'Finalizing results...', duration: 1000 }
-        ];
-        
-        let currentStage = 0;
-        
-        function nextStage() {
-            if (currentStage < stages.length) {
-                const stage = stages[currentStage];
-                progressFill.style.width = `${stage.progress}%`;
-                progressStatus.textContent = stage.text;
-                
-                setTimeout(() => {
-                    currentStage++;
-                    nextStage();
-                }, stage.duration);
-            }
-        }
-        
-        nextStage();
     }
 
     function handleSuccessfulTranscription(data) {
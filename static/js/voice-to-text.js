@@ -31,6 +31,13 @@ document.addEventListener('DOMContentLoaded', function() {
     let recognitionRetries = 0;
     let maxRetries = 3;
     
+    // Live transcription state (timeslices are streamed while recording)
+    let liveSessionPromise = null;
+    let liveUploadQueue = Promise.resolve();
+    let liveSegmentIndex = 0;
+    let liveFailed = false;
+    let livePartials = [];
+    
     // Visual Elements
     let canvas;
     let canvasContext;
@@ -581,6 +588,9 @@ document.addEventListener('DOMContentLoaded', function() {
             // Setup audio visualization
             setupAudioVisualization(stream);
             
+            // Open a live transcription session so segments can be sent while recording
+            startLiveSession();
+            
             // Start recording
             mediaRecorder.start(1000); // Collect data every second
             startTime = Date.now();
@@ -704,6 +714,7 @@ document.addEventListener('DOMContentLoaded', function() {
         if (event.data.size > 0) {
             console.log(`Received audio chunk: ${event.data.size} bytes`);
             audioChunks.push(event.data);
+            queueLiveSegment(event.data);
         }
     }
 
@@ -711,7 +722,132 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log('MediaRecorder stopped, processing audio...');
         stopVisualization();
         clearInterval(timerInterval);
-        processAudio();
+        
+        if (liveSessionPromise && !liveFailed) {
+            finishLiveTranscription();
+        } else {
+            processAudio();
+        }
+    }
+
+    function startLiveSession() {
+        liveUploadQueue = Promise.resolve();
+        liveSegmentIndex = 0;
+        liveFailed = false;
+        livePartials = [];
+        
+        const formData = new FormData();
+        formData.append('language', document.getElementById('recognitionLanguage')?.value || 'en-US');
+        formData.append('mime_type', mimeType);
+        
+        liveSessionPromise = fetch('/api/voice-to-text/stream', {
+            method: 'POST',
+            body: formData
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Live transcription unavailable (${response.status})`);
+            }
+            return response.json();
+        })
+        .catch(error => {
+            // The full recording is still uploaded when recording stops
+            console.warn('Live transcription disabled:', error.message);
+            liveFailed = true;
+            return null;
+        });
+    }
+
+    function queueLiveSegment(blob) {
+        if (!liveSessionPromise || liveFailed) {
+            return;
+        }
+        
+        // Segments must arrive in order, so uploads are chained
+        const index = liveSegmentIndex++;
+        liveUploadQueue = liveUploadQueue
+            .then(() => liveSessionPromise)
+            .then(session => {
+                if (!session || liveFailed) {
+                    return;
+                }
+                
+                return fetch(session.segments_url, {
+                    method: 'POST',
+                    headers: { 'X-Segment-Index': String(index) },
+                    body: blob
+                })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`Segment upload failed (${response.status})`);
+                    }
+                    return response.json();
+                })
+                .then(data => renderLivePartials(data.partials));
+            })
+            .catch(error => {
+                console.warn('Live transcription stopped:', error.message);
+                liveFailed = true;
+            });
+    }
+
+    function renderLivePartials(partials) {
+        if (!partials || partials.length === 0) {
+            return;
+        }
+        
+        livePartials.push(...partials.filter(partial => partial.text));
+        const liveText = livePartials.map(partial => partial.text).join(' ');
+        if (!liveText) {
+            return;
+        }
+        
+        textResult.innerHTML = `
+            <div class="result-content live-transcript">
+                <div class="result-header">
+                    <h4>🔴 Live Transcript</h4>
+                </div>
+                <div class="transcription-text">${formatTranscriptionResult(liveText)}</div>
+            </div>
+        `;
+    }
+
+    function finishLiveTranscription() {
+        showProcessingUI();
+        
+        liveUploadQueue
+            .then(() => liveSessionPromise)
+            .then(session => {
+                if (!session || liveFailed) {
+                    throw new Error('Live transcription was interrupted');
+                }
+                
+                return fetch(session.finish_url, { method: 'POST' })
+                    .then(response => {
+                        if (response.status === 400) {
+                            // Nothing recognizable - uploading the same audio again would not help
+                            return { text: '' };
+                        }
+                        if (!response.ok) {
+                            return response.json()
+                                .catch(() => ({}))
+                                .then(data => {
+                                    throw new Error(data.error || `Server error (${response.status})`);
+                                });
+                        }
+                        return response.json();
+                    });
+            })
+            .then(data => {
+                displayResult(data.text);
+                showStatus(`Transcription completed in ${formatTime(recordingDuration)}`, 'success');
+            })
+            .catch(error => {
+                // Fall back to uploading the whole recording
+                console.warn('Live transcription failed, uploading full recording:', error.message);
+                liveFailed = true;
+                processAudio();
+            });
     }
 
     function handleRecordingError(e) {
@@ -948,6 +1084,9 @@ document.addEventListener('DOMContentLoaded', function() {
                     throw new Error('Audio format not supported or audio quality too low');
                 } else if (response.status === 413) {
                     throw new Error('Audio file too large. Please record shorter segments.');
+                } else if (response.status === 429) {
+                    const retryAfter = response.headers.get('Retry-After') || 'a few';
+                    throw new Error(`Server is busy. Please try again in ${retryAfter} seconds.`);
                 } else {
                     throw new Error(`Server error (${response.status}): ${response.statusText}`);
                 }
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The app reads these at import time: offline recognizer, no artificial latency
+os.environ.setdefault('RECOGNITION_BACKENDS', 'local')
+os.environ.setdefault('LOCAL_RECOGNIZER_LATENCY', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from app import AdmissionLimiter
+
+
+def test_admission_admits_up_to_concurrency():
+    limiter = AdmissionLimiter(concurrency=2, max_queue=0)
+    assert limiter.acquire()
+    assert limiter.acquire()
+    assert not limiter.acquire()  # No queue: refused straight away
+    assert limiter.stats() == {'concurrency': 2, 'max_queue': 0, 'running': 2, 'queued': 0, 'rejected': 1}
+
+
+def test_admission_refuses_after_max_wait():
+    limiter = AdmissionLimiter(concurrency=1, max_queue=1, max_wait=0.05)
+    assert limiter.acquire()
+
+    started = time.monotonic()
+    assert not limiter.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert limiter.stats()['rejected'] == 1
+    assert limiter.queued() == 0
+
+
+def test_admission_release_admits_a_waiter():
+    limiter = AdmissionLimiter(concurrency=1, max_queue=1, max_wait=5)
+    assert limiter.acquire()
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+    waiter.start()
+    while limiter.queued() == 0:
+        time.sleep(0.005)
+
+    assert not limiter.acquire()  # The queue is full
+    limiter.release(held_seconds=2.0)
+    waiter.join(1)
+    assert results == [True]
+    assert limiter.stats()['running'] == 1
+
+
+def test_admission_retry_after_follows_hold_times():
+    limiter = AdmissionLimiter(concurrency=1, max_queue=0)
+    limiter.acquire()
+    limiter.release(held_seconds=4.0)
+    limiter.acquire()
+    assert limiter.retry_after() == 8  # One running plus this request, 4s each
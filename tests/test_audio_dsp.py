@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import audio_dsp
+
+SAMPLE_RATE = 16000
+
+
+def tone(frequency, seconds, sample_rate=SAMPLE_RATE, amplitude=8000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def peak_frequency(samples, sample_rate):
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return np.argmax(spectrum) * sample_rate / len(samples)
+
+
+def level(samples):
+    middle = samples[len(samples) // 4:-len(samples) // 4]  # Away from the filter's edges
+    return audio_dsp.rms(middle)
+
+
+def test_resample_keeps_length_and_pitch():
+    for from_rate, to_rate in [(48000, 16000), (44100, 16000), (8000, 16000)]:
+        resampled = audio_dsp.resample(tone(440, 1, from_rate), from_rate, to_rate)
+        assert resampled.dtype == np.int16
+        assert len(resampled) == to_rate
+        assert abs(peak_frequency(resampled, to_rate) - 440) < 2
+        assert level(resampled) == pytest.approx(level(tone(440, 1, to_rate)), rel=0.02)
+
+
+def test_resample_removes_content_that_would_alias():
+    # 10kHz is above the new Nyquist frequency and would fold down to 6kHz
+    resampled = audio_dsp.resample(tone(10000, 1, 48000), 48000, 16000)
+    assert level(resampled) < 0.01 * level(tone(10000, 1, 48000))
+
+
+def test_resample_same_rate_is_a_no_op():
+    samples = tone(440, 0.1)
+    assert audio_dsp.resample(samples, SAMPLE_RATE, SAMPLE_RATE) is samples
+
+
+def test_high_pass_removes_rumble_and_keeps_speech():
+    rumble, voice = tone(30, 2), tone(1000, 2)
+    assert level(audio_dsp.high_pass(rumble, SAMPLE_RATE, 100)) < 0.05 * level(rumble)
+    assert level(audio_dsp.high_pass(voice, SAMPLE_RATE, 100)) == pytest.approx(level(voice), rel=0.01)
+
+
+def test_low_pass_removes_hiss_and_keeps_speech():
+    hiss, voice = tone(6000, 2), tone(1000, 2)
+    assert level(audio_dsp.low_pass(hiss, SAMPLE_RATE, 4000)) < 0.01 * level(hiss)
+    assert level(audio_dsp.low_pass(voice, SAMPLE_RATE, 4000)) == pytest.approx(level(voice), rel=0.01)
+
+
+def test_fir_output_is_aligned_with_its_input():
+    # Longer than one FFT segment, so overlap-save joins several blocks
+    voice = tone(1000, 5)
+    filtered = audio_dsp.high_pass(voice, SAMPLE_RATE, 100)
+    middle = slice(SAMPLE_RATE, 4 * SAMPLE_RATE)
+    assert len(filtered) == len(voice)
+    assert np.max(np.abs(filtered[middle].astype(np.int32) - voice[middle])) < 100
+
+
+def test_fir_filter_of_nothing():
+    assert len(audio_dsp.fir_filter(np.array([], dtype=np.int16), audio_dsp.lowpass_taps(SAMPLE_RATE, 1000, 100))) == 0
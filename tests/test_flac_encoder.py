@@ -0,0 +1,150 @@
+import hashlib
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+import flac_encoder
+
+SAMPLE_RATE = 16000
+
+
+def tone(frequency, seconds, sample_rate=SAMPLE_RATE, amplitude=8000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def speech_like(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return (tone(220, seconds) // 2 + tone(1300, seconds) // 4 + rng.normal(0, 50, int(seconds * SAMPLE_RATE))).astype(np.int16)
+
+
+def crc(data, polynomial, width):
+    """Bitwise MSB-first CRC, independent of the encoder's tables"""
+    top, mask, value = 1 << (width - 1), (1 << width) - 1, 0
+    for byte in data:
+        value ^= byte << (width - 8)
+        for _ in range(8):
+            value = ((value << 1) ^ polynomial if value & top else value << 1) & mask
+    return value
+
+
+class BitReader:
+    def __init__(self, data):
+        self.bits = ''.join(f'{byte:08b}' for byte in data)
+        self.position = 0
+
+    def read(self, count):
+        value = int(self.bits[self.position:self.position + count] or '0', 2)
+        self.position += count
+        return value
+
+    def signed(self, count):
+        value = self.read(count)
+        return value - (1 << count) if value >> (count - 1) else value
+
+    def unary(self):
+        end = self.bits.index('1', self.position)
+        count = end - self.position
+        self.position = end + 1
+        return count
+
+
+FIXED_PREDICTORS = {0: [], 1: [1], 2: [2, -1], 3: [3, -3, 1], 4: [4, -6, 4, -1]}
+
+
+def decode(data):
+    """(sample rate, total samples, md5, samples) from the subset of FLAC the encoder writes"""
+    assert data[:4] == b'fLaC' and data[4] == 0x80
+    info = BitReader(data[8:8 + 34])
+    min_block, max_block = info.read(16), info.read(16)
+    info.read(48)  # Frame sizes, unknown
+    sample_rate, channels, bits_per_sample = info.read(20), info.read(3) + 1, info.read(5) + 1
+    total, md5 = info.read(36), data[26:42]
+    assert min_block == max_block and (channels, bits_per_sample) == (1, 16)
+
+    reader = BitReader(data[42:])
+    samples = []
+    while reader.position < len(reader.bits):
+        frame_start = reader.position
+        assert reader.read(16) == 0xFFF8
+        block_code, rate_code = reader.read(4), reader.read(4)
+        assert reader.read(8) == 0x08
+        lead = reader.bits.index('0', reader.position) - reader.position
+        number = reader.read(8) & (0xFF >> (lead + 1))
+        for _ in range(max(lead - 1, 0)):
+            number = number << 6 | reader.read(8) & 0x3F
+        assert number * max_block == len(samples)
+        block_size = reader.read(16) + 1 if block_code == 7 else 1152
+        assert block_code in (3, 7)
+        assert rate_code == flac_encoder.SAMPLE_RATE_CODES.get(sample_rate, 0)
+        header = bytes(int(reader.bits[i:i + 8], 2) for i in range(frame_start, reader.position, 8))
+        assert reader.read(8) == crc(header, 0x07, 8)
+
+        assert reader.read(1) == 0
+        kind = reader.read(6)
+        assert reader.read(1) == 0  # No wasted bits
+        if kind == flac_encoder.SUBFRAME_CONSTANT:
+            block = [reader.signed(16)] * block_size
+        elif kind == flac_encoder.SUBFRAME_VERBATIM:
+            block = [reader.signed(16) for _ in range(block_size)]
+        else:
+            order = kind - flac_encoder.SUBFRAME_FIXED
+            block = [reader.signed(16) for _ in range(order)]
+            assert reader.read(2) == 0 and reader.read(4) == 0  # Rice, one partition
+            parameter = reader.read(4)
+            for _ in range(block_size - order):
+                zigzag = reader.unary() << parameter | reader.read(parameter)
+                residual = zigzag >> 1 ^ -(zigzag & 1)
+                prediction = sum(c * block[-1 - i] for i, c in enumerate(FIXED_PREDICTORS[order]))
+                block.append(prediction + residual)
+        samples += block
+
+        reader.position += -reader.position % 8
+        frame = bytes(int(reader.bits[i:i + 8], 2) for i in range(frame_start, reader.position, 8))
+        assert reader.read(16) == crc(frame, 0x8005, 16)
+    return sample_rate, total, md5, np.array(samples, dtype=np.int16)
+
+
+@pytest.mark.parametrize('samples', [
+    speech_like(2),
+    np.zeros(3000, dtype=np.int16),  # Constant subframes
+    np.random.default_rng(1).integers(-32768, 32768, 3000).astype(np.int16),  # Verbatim subframes
+    np.array([0, 32767, -32768, 1, -1] * 200, dtype=np.int16),  # Extreme residuals
+    speech_like(0.01),  # Shorter than one block: explicit block size
+], ids=['speech', 'silence', 'noise', 'extremes', 'short'])
+def test_flac_round_trip(samples):
+    sample_rate, total, md5, decoded = decode(flac_encoder.encode(samples, SAMPLE_RATE))
+    assert (sample_rate, total) == (SAMPLE_RATE, len(samples))
+    assert md5 == hashlib.md5(samples.tobytes()).digest()
+    assert np.array_equal(decoded, samples)
+
+
+def test_flac_round_trip_across_frame_groups():
+    samples = speech_like(6)  # More than GROUP_FRAMES blocks
+    assert len(samples) > flac_encoder.BLOCK_SIZE * flac_encoder.GROUP_FRAMES
+    assert np.array_equal(decode(flac_encoder.encode(samples, SAMPLE_RATE))[3], samples)
+
+
+def test_flac_accepts_pcm_bytes_and_uncommon_rates():
+    samples = speech_like(0.5)
+    data = flac_encoder.encode(memoryview(samples.tobytes()), 11025)
+    sample_rate, _, _, decoded = decode(data)
+    assert sample_rate == 11025
+    assert np.array_equal(decoded, samples)
+
+
+def test_flac_compresses_speech():
+    samples = speech_like(2)
+    assert len(flac_encoder.encode(samples, SAMPLE_RATE)) < 0.7 * samples.nbytes
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_flac_decodes_with_ffmpeg():
+    samples = speech_like(3)
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-f', 'flac', '-i', 'pipe:', '-f', 's16le', '-'],
+        input=flac_encoder.encode(samples, SAMPLE_RATE), capture_output=True, check=True
+    )
+    assert result.stdout == samples.tobytes()
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+import pytest
+
+import app
+from app import JobManager
+
+
+class FakeTranscriber:
+    """Stands in for transcribe_audio_file: holds every job until released or cancelled"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    def __call__(self, filepath, language, size, temp_dir, progress_callback=None, cancel_event=None,
+                 chunk_callback=None):
+        self.started.append(temp_dir)
+        while not self.release.is_set() and not cancel_event.is_set():
+            progress_callback(0, 0, 1, True)  # Publishes, which picks up cancellations from other processes
+            time.sleep(0.01)
+        return app.jsonify({'text': 'Hello.'}), 200
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    fake = FakeTranscriber()
+    monkeypatch.setattr(app, 'transcribe_audio_file', fake)
+    yield fake
+    fake.release.set()
+
+
+def submit(manager, tmp_path, name):
+    temp_dir = tmp_path / name
+    temp_dir.mkdir()
+    (temp_dir / 'upload.wav').write_bytes(b'')
+    return manager.submit(str(temp_dir / 'upload.wav'), 'upload.wav', 'en-US', 0.1, str(temp_dir)), str(temp_dir)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_completed_job_keeps_its_result_and_removes_its_upload(tmp_path, transcriber):
+    manager = JobManager(1, 60, 10)
+    job, temp_dir = submit(manager, tmp_path, 'a')
+    transcriber.release.set()
+    job.future.result(5)
+
+    assert job.status == 'completed'
+    assert job.to_dict()['result'] == {'text': 'Hello.', 'cached': False}
+    assert not os.path.exists(temp_dir)
+
+
+def test_cancel_queued_job_removes_its_upload(tmp_path, transcriber):
+    manager = JobManager(1, 60, 10)
+    running, running_dir = submit(manager, tmp_path, 'running')
+    queued, queued_dir = submit(manager, tmp_path, 'queued')
+    wait_until(lambda: transcriber.started)
+
+    assert manager.cancel(queued.id)['status'] == 'cancelled'
+    assert queued.finished_at is not None
+    assert not os.path.exists(queued_dir)
+    assert os.path.exists(running_dir)
+
+    transcriber.release.set()
+    running.future.result(5)
+    assert transcriber.started == [running_dir]  # The cancelled job never ran
+
+
+def test_cancel_running_job(tmp_path, transcriber):
+    manager = JobManager(1, 60, 10)
+    job, temp_dir = submit(manager, tmp_path, 'a')
+    wait_until(lambda: transcriber.started)
+
+    manager.cancel(job.id)
+    job.future.result(5)
+    assert job.status == 'cancelled'
+    assert 'result' not in job.to_dict()
+    assert not os.path.exists(temp_dir)
+
+
+def test_cancel_unknown_or_finished_job(tmp_path, transcriber):
+    manager = JobManager(1, 60, 10)
+    assert manager.cancel('0' * 32) is None
+
+    job, _ = submit(manager, tmp_path, 'a')
+    transcriber.release.set()
+    job.future.result(5)
+    assert manager.cancel(job.id)['status'] == 'completed'
+
+
+def test_drain_cancels_queued_jobs_and_lets_running_ones_finish(tmp_path, transcriber):
+    manager = JobManager(1, 60, 10)
+    running, running_dir = submit(manager, tmp_path, 'running')
+    queued = [submit(manager, tmp_path, f'queued{i}') for i in range(2)]
+    wait_until(lambda: transcriber.started)
+
+    assert manager.drain(0.1) == 1  # Only the running job is left
+    assert [job.status for job, _ in queued] == ['cancelled', 'cancelled']
+    assert not any(os.path.exists(temp_dir) for _, temp_dir in queued)
+    assert running.status == 'running'
+
+    transcriber.release.set()
+    running.future.result(5)
+    assert running.status == 'completed'
+    assert manager.drain(0.1) == 0
+
+
+def test_cancel_reaches_a_job_owned_by_another_process(tmp_path, transcriber):
+    state_dir = str(tmp_path / 'state')
+    owner, other = JobManager(1, 60, 10, state_dir), JobManager(1, 60, 10, state_dir)
+    job, temp_dir = submit(owner, tmp_path, 'a')
+    wait_until(lambda: transcriber.started)
+
+    assert other.snapshot(job.id)['status'] == 'running'
+    other.cancel(job.id)
+    job.future.result(5)
+    assert job.status == 'cancelled'
+    assert other.snapshot(job.id)['status'] == 'cancelled'
+    assert not os.path.exists(temp_dir)
+
+
+def test_finished_jobs_are_pruned(tmp_path, transcriber):
+    manager = JobManager(2, 60, max_finished=2)
+    transcriber.release.set()
+    jobs = [submit(manager, tmp_path, f'job{i}')[0] for i in range(3)]
+    for job in jobs:
+        job.future.result(5)
+
+    submit(manager, tmp_path, 'next')[0].future.result(5)
+    assert manager.get(jobs[0].id) is None and manager.get(jobs[1].id) is None
+    assert manager.get(jobs[2].id) is jobs[2]
+    assert manager.stats() == {'completed': 2}
+
+
+def test_queued_job_cancelled_through_another_process_never_runs(tmp_path, transcriber):
+    state_dir = str(tmp_path / 'state')
+    owner, other = JobManager(1, 60, 10, state_dir), JobManager(1, 60, 10, state_dir)
+    running, running_dir = submit(owner, tmp_path, 'running')
+    queued, queued_dir = submit(owner, tmp_path, 'queued')
+    wait_until(lambda: transcriber.started)
+
+    assert other.cancel(queued.id)['status'] == 'queued'
+    transcriber.release.set()
+    running.future.result(5)
+    queued.future.result(5)
+
+    assert queued.status == 'cancelled'
+    assert transcriber.started == [running_dir]
+    assert not os.path.exists(queued_dir)
@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from app import CHUNK_RECOGNITION_WORKERS, PriorityThreadPool, TokenBucket, recognize_chunks
+
+
+def test_token_bucket_starts_full_and_empties():
+    bucket = TokenBucket(rate=0.001, capacity=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    started = time.monotonic()
+    assert bucket.acquire()
+    assert 0.01 <= time.monotonic() - started < 1
+
+
+def test_token_bucket_refill_is_capped_at_capacity():
+    bucket = TokenBucket(rate=1000, capacity=2)
+    time.sleep(0.05)
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_token_bucket_paces_concurrent_callers():
+    bucket = TokenBucket(rate=100, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2)
+    assert time.monotonic() - started >= 0.045  # One token up front, five at 100 per second
+
+
+def test_token_bucket_acquire_returns_false_when_cancelled():
+    bucket = TokenBucket(rate=0.001, capacity=1)
+    bucket.acquire()
+    cancel_event = threading.Event()
+    threading.Timer(0.05, cancel_event.set).start()
+
+    started = time.monotonic()
+    assert not bucket.acquire(cancel_event)
+    assert time.monotonic() - started < 1
+
+
+class FakeRecognizer:
+    """Stands in for recognize_chunk: the transcript is the chunk's PCM, later chunks finish first"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, pcm, sample_rate, language, cancel_event=None, gain_db=0.0):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            index = int(pcm)
+            time.sleep(0.05 / (index + 1))
+            return None if index in self.fail else f' chunk {index} '
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    def install(**kwargs):
+        fake = FakeRecognizer(**kwargs)
+        monkeypatch.setattr(app, 'recognize_chunk', fake)
+        return fake
+    return install
+
+
+def chunks(count):
+    return ((str(i).encode(), 16000) for i in range(count))
+
+
+def test_chunks_are_recognized_concurrently_and_returned_in_order(recognizer):
+    fake = recognizer()
+    progress = []
+    finished = []
+    result = recognize_chunks(chunks(8), 'en-US', progress_callback=lambda *p: progress.append(p),
+                              chunk_callback=lambda i, text: finished.append(i))
+
+    assert result['segments'] == [f'chunk {i}' for i in range(8)]
+    assert (result['total_chunks'], result['failed_chunks'], result['error']) == (8, 0, None)
+    assert 1 < fake.max_running <= CHUNK_RECOGNITION_WORKERS
+    assert sorted(finished) == list(range(8))
+    assert progress[-1] == (8, 0, 8, True)
+
+
+def test_failed_chunks_within_the_budget_are_skipped(recognizer):
+    recognizer(fail={3, 5})
+    result = recognize_chunks(chunks(8), 'en-US')
+    assert result['failed_chunks'] == 2
+    assert result['error'] is None
+    assert 'chunk 3' not in result['segments'] and len(result['segments']) == 6
+
+
+def test_too_many_failed_chunks_is_an_error(recognizer):
+    recognizer(fail={0, 1, 2})
+    assert recognize_chunks(chunks(8), 'en-US')['error'] == ('Too many audio segments could not be processed', 400)
+
+
+def test_cancelled_run_is_an_error(recognizer):
+    recognizer()
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert recognize_chunks(chunks(4), 'en-US', cancel_event=cancel_event)['error'] == ('Transcription was cancelled', 409)
+
+
+def test_pool_runs_the_lowest_priority_first():
+    pool = PriorityThreadPool(max_workers=1, thread_name_prefix='test-pool')
+    gate = threading.Event()
+    order = []
+    pool.submit(gate.wait)  # Holds the only worker while the rest queue up
+    futures = [pool.submit(order.append, priority, priority=priority) for priority in (3, 1, 2, 0)]
+    gate.set()
+    for future in futures:
+        future.result(2)
+    assert order == [0, 1, 2, 3]
+
+
+class StalledBackend(app.RecognitionBackend):
+    """Never answers until released; hedges almost immediately"""
+
+    name = 'stalled'
+
+    def __init__(self, timeout):
+        super().__init__(timeout)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def hedge_delay(self):
+        return 0.01
+
+    def _recognize(self, audio_data, language):
+        self.calls += 1
+        self.release.wait(5)
+        return 'too late'
+
+
+def test_hedging_times_out_and_cancels_queued_requests(monkeypatch):
+    backend = StalledBackend(timeout=0.2)
+    pool = ThreadPoolExecutor(max_workers=1)  # The hedge queues behind the stalled request
+    monkeypatch.setattr(app, 'get_active_backends', lambda: [backend])
+    monkeypatch.setattr(app, 'get_hedge_executor', lambda: pool)
+    monkeypatch.setattr(app, 'recognition_rate_limiter', TokenBucket(rate=1, capacity=5))
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        app.recognize_with_hedging(None, 'en-US')
+    assert time.monotonic() - started < 1
+
+    backend.release.set()
+    pool.shutdown(wait=True)
+    assert backend.calls == 1  # The queued hedge never ran
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app import PCMRingBuffer, SpeechSegmenter
+
+from test_vad import SAMPLE_RATE, recording
+
+
+def test_ring_buffer_keeps_stream_order_across_the_wrap():
+    ring = PCMRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.consume(4)
+    ring.write(np.arange(6, 11, dtype=np.int16))  # Wraps around the end
+
+    assert len(ring) == 7
+    assert ring.view().tolist() == [4, 5, 6, 7, 8, 9, 10]
+    assert ring.consumed == 4
+
+
+def test_ring_buffer_view_is_zero_copy_until_it_wraps():
+    ring = PCMRingBuffer(8)
+    ring.write(np.arange(5, dtype=np.int16))
+    assert np.shares_memory(ring.view(), ring._buffer)
+
+
+def test_ring_buffer_consume_is_clamped_to_its_size():
+    ring = PCMRingBuffer(4)
+    ring.write(np.ones(3, dtype=np.int16))
+    ring.consume(10)
+    assert len(ring) == 0
+    assert ring.consumed == 3
+
+
+def test_ring_buffer_overflow():
+    ring = PCMRingBuffer(4)
+    ring.write(np.ones(3, dtype=np.int16))
+    with pytest.raises(ValueError):
+        ring.write(np.ones(2, dtype=np.int16))
+
+
+def segment(samples, piece, **kwargs):
+    """Feed samples in pieces of the given length; returns the chunks of the whole stream"""
+    segmenter = SpeechSegmenter(SAMPLE_RATE, **kwargs)
+    chunks = []
+    for offset in range(0, len(samples), piece):
+        chunks.extend(segmenter.feed(samples[offset:offset + piece]))
+    return chunks + segmenter.flush()
+
+
+def covered(chunks, start, end):
+    return any(first <= start * SAMPLE_RATE and last >= end * SAMPLE_RATE for first, last, _ in chunks)
+
+
+@pytest.mark.parametrize('piece', [1000, 4096, SAMPLE_RATE * 7])
+def test_segmenter_chunks_are_windows_of_the_stream(piece):
+    bursts = [(1, 4), (6, 9), (12, 20), (24, 26)]
+    samples = recording(bursts, seconds=30)
+    chunks = segment(samples, piece, max_chunk_ms=10000)
+
+    assert chunks
+    for start, end, pcm in chunks:
+        assert pcm == samples[start:end].tobytes()
+        assert end - start <= 10 * SAMPLE_RATE
+    assert all(chunks[i][1] <= chunks[i + 1][0] for i in range(len(chunks) - 1))
+    assert all(covered(chunks, start, end) for start, end in bursts)
+
+
+def test_segmenter_ignores_silence():
+    assert segment(recording([], seconds=20), 4096) == []
+
+
+def test_eager_segmenter_emits_a_region_once_a_pause_follows_it():
+    segmenter = SpeechSegmenter(SAMPLE_RATE, eager=True)
+    samples = recording([(1, 2), (5, 6)], seconds=8)
+
+    # Audio up to well into the pause after the first region
+    chunks = []
+    for offset in range(0, 4 * SAMPLE_RATE, 4096):
+        chunks.extend(segmenter.feed(samples[offset:offset + 4096]))
+    assert len(chunks) == 1
+    assert covered(chunks, 1, 2)
+
+    for offset in range(4 * SAMPLE_RATE, len(samples), 4096):
+        chunks.extend(segmenter.feed(samples[offset:offset + 4096]))
+    chunks.extend(segmenter.flush())
+    assert len(chunks) == 2
+    assert covered(chunks[1:], 5, 6)
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import queue
+
+import pytest
+
+import app
+from app import ResumableUploadStore, UploadOffsetError
+
+if app.fcntl is not None:
+    import fcntl
+
+PART = bytes(range(256)) * 4096  # 1MB
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumableUploadStore(str(tmp_path), ttl_seconds=3600, max_early_decodes=1)
+
+
+def test_parts_are_appended_at_their_offsets(store):
+    upload = store.create('talk.wav', 2 * len(PART), 'en-US')
+    assert store.append(upload, 0, PART) == len(PART)
+    assert store.append(upload, len(PART), PART) == 2 * len(PART)
+    assert store.get(upload['id'])['offset'] == 2 * len(PART)
+
+
+def test_part_at_the_wrong_offset_is_refused(store):
+    upload = store.create('talk.wav', 2 * len(PART), 'en-US')
+    store.append(upload, 0, PART)
+    with pytest.raises(UploadOffsetError) as error:
+        store.append(upload, 0, PART)
+    assert error.value.offset == len(PART)
+
+
+def test_part_for_a_claimed_upload_is_not_written(store, tmp_path):
+    upload = store.create('talk.wav', 2 * len(PART), 'en-US')
+    assert store.claim(upload['id'], str(tmp_path / 'claimed.wav'))
+    with pytest.raises(OSError):
+        store.append(upload, 0, PART)
+
+
+def append_part(directory, upload, start, results):
+    # A separate process with its own store, like another gunicorn worker
+    store = ResumableUploadStore(directory, ttl_seconds=3600, max_early_decodes=1)
+    start.wait()
+    try:
+        store.append(upload, 0, PART)
+        results.put('appended')
+    except UploadOffsetError:
+        results.put('refused')
+
+
+@pytest.mark.skipif(app.fcntl is None, reason='no fcntl on this platform')
+def test_part_waits_for_another_process_holding_the_upload(store, tmp_path):
+    upload = store.create('talk.wav', 2 * len(PART), 'en-US')
+    context = multiprocessing.get_context('fork')
+    start, results = context.Event(), context.Queue()
+    worker = context.Process(target=append_part, args=(str(tmp_path), upload, start, results))
+    worker.start()  # Before the lock is taken, so the worker does not inherit it
+
+    # Stand in for another process that is between its offset check and its write
+    with open(store.data_path(upload['id']), 'r+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        start.set()
+        with pytest.raises(queue.Empty):
+            results.get(timeout=0.3)
+        f.write(PART)
+    worker.join(5)
+
+    assert results.get(timeout=1) == 'refused'
+    assert os.path.getsize(store.data_path(upload['id'])) == len(PART)
@@ -0,0 +1,133 @@
+import wave
+
+import numpy as np
+import pytest
+
+import app
+from app import VAD_FRAME_MS, VAD_SPEECH_PAD_MS, create_speech_chunks, detect_speech_regions
+
+SAMPLE_RATE = 16000
+PAD_FRAMES = VAD_SPEECH_PAD_MS // VAD_FRAME_MS
+
+
+def energies_with(regions, n_frames=200, noise=10.0, speech=1000.0):
+    energies = np.full(n_frames, noise, dtype=np.float32)
+    for start, end in regions:
+        energies[start:end] = speech
+    return energies
+
+
+def recording(bursts, seconds, seed=0):
+    """Quiet noise with 440Hz tone bursts at the given (start, end) times in seconds"""
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 20, int(seconds * SAMPLE_RATE))
+    t = np.arange(len(samples)) / SAMPLE_RATE
+    for start, end in bursts:
+        burst = slice(int(start * SAMPLE_RATE), int(end * SAMPLE_RATE))
+        samples[burst] += 8000 * np.sin(2 * np.pi * 440 * t[burst])
+    return samples.astype(np.int16)
+
+
+def test_no_regions_in_silence():
+    assert detect_speech_regions(np.zeros(100, dtype=np.float32)) == []
+    assert detect_speech_regions(np.array([], dtype=np.float32)) == []
+
+
+def test_region_is_padded():
+    energies = energies_with([(40, 60)])
+    assert detect_speech_regions(energies, noise_floor=10) == [(40 - PAD_FRAMES, 60 + PAD_FRAMES)]
+
+
+def test_padding_is_clipped_to_the_recording():
+    energies = energies_with([(0, 20), (180, 200)])
+    assert detect_speech_regions(energies, noise_floor=10) == [(0, 20 + PAD_FRAMES), (180 - PAD_FRAMES, 200)]
+
+
+def test_short_pauses_stay_inside_a_region():
+    energies = energies_with([(40, 60), (65, 90)])  # 150ms pause
+    assert detect_speech_regions(energies, noise_floor=10) == [(40 - PAD_FRAMES, 90 + PAD_FRAMES)]
+
+
+def test_long_pauses_split_regions():
+    energies = energies_with([(40, 60), (100, 120)])  # 1.2s pause
+    assert len(detect_speech_regions(energies, noise_floor=10)) == 2
+
+
+def test_short_utterance_is_not_a_region():
+    # 150ms of speech is below VAD_MIN_SPEECH_MS, so chunking skips it
+    energies = energies_with([(40, 45)])
+    assert detect_speech_regions(energies, noise_floor=10) == []
+
+
+def test_threshold_is_estimated_without_a_noise_floor():
+    energies = energies_with([(40, 60)])
+    assert detect_speech_regions(energies) == detect_speech_regions(energies, noise_floor=10)
+
+
+def test_chunks_cover_speech_in_sample_offsets():
+    samples = recording([(1.0, 3.0)], seconds=5)
+    chunks = create_speech_chunks(samples, SAMPLE_RATE)
+    assert len(chunks) == 1
+    start, end = chunks[0]
+    assert start <= 1.0 * SAMPLE_RATE and end >= 3.0 * SAMPLE_RATE
+    assert end <= len(samples)
+
+
+def test_chunks_are_capped_at_max_chunk_ms():
+    samples = recording([(0.5, 19.5)], seconds=20)
+    chunks = create_speech_chunks(samples, SAMPLE_RATE, max_chunk_ms=5000)
+    assert len(chunks) >= 4
+    assert all(end - start <= 5 * SAMPLE_RATE for start, end in chunks)
+    # Cut points are shared, so no audio between the chunks is lost
+    assert all(chunks[i][1] == chunks[i + 1][0] for i in range(len(chunks) - 1))
+
+
+def test_pack_merges_regions_under_the_cap():
+    samples = recording([(1, 2), (4, 5), (7, 8)], seconds=10)
+    assert len(create_speech_chunks(samples, SAMPLE_RATE, pack=False)) == 3
+    assert len(create_speech_chunks(samples, SAMPLE_RATE, pack=True)) == 1
+    assert len(create_speech_chunks(samples, SAMPLE_RATE, max_chunk_ms=5000, pack=True)) == 2
+
+
+def test_silent_recording_has_no_chunks():
+    assert create_speech_chunks(recording([], seconds=3), SAMPLE_RATE) == []
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+    return str(path)
+
+
+@pytest.fixture
+def recognized(monkeypatch):
+    """Audio payloads sent for recognition by process_speech_recognition"""
+    sent = []
+
+    def recognize(audio_data, language):
+        sent.append(audio_data)
+        return 'yes', 'local'
+
+    monkeypatch.setattr(app, 'recognize_with_hedging', recognize)
+    return sent
+
+
+def test_short_utterance_is_still_recognized(tmp_path, recognized):
+    samples = recording([(1.0, 1.2)], seconds=3)  # A 200ms "yes"
+    assert create_speech_chunks(samples, SAMPLE_RATE) == []
+
+    with app.app.app_context():
+        response, status = app.process_speech_recognition(write_wav(tmp_path / 'yes.wav', samples))
+    assert status == 200
+    assert response.get_json()['text'] == 'Yes.'
+    assert len(recognized) == 1
+
+
+def test_silence_is_not_sent_for_recognition(tmp_path, recognized):
+    with app.app.app_context():
+        _, status = app.process_speech_recognition(write_wav(tmp_path / 'quiet.wav', recording([], seconds=3)))
+    assert status == 400
+    assert recognized == []
@@ -0,0 +1,6 @@
+"""WSGI entry point for production servers: gunicorn -c gunicorn.conf.py wsgi:app"""
+from app import app, warm_up
+
+# Load the engines (speech_recognition, pydub, PIL, pytesseract, OpenCV) and probe
+# ffmpeg/Tesseract here, in the master, so forked workers share those pages and results
+warm_up()